@@ -1,14 +1,30 @@
 import cv2
 import numpy as np
 import argparse
-import pickle
+import hashlib
+import json
 import os
 import sys
 from datetime import datetime
+from multiprocessing import Pool
+
+# src/core/face_recognition.py would shadow the face_recognition library
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path = [p for p in sys.path if os.path.abspath(p or '.') != script_dir]
+import face_recognition
 
 # Add the project root directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from src.core.encoding_store import EncodingStore, migrate_pickle
+from src.core.face_index import open_index
+
+DB_PATH = os.path.join('src', 'data', 'known_faces.enc')
+OLD_DB_PATH = os.path.join('src', 'data', 'known_faces.pkl')
+MANIFEST_PATH = os.path.join('src', 'data', 'import_manifest.jsonl')
+INDEX_PATH = os.path.join('src', 'data', 'known_faces_index.db')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
 def load_face_cascade():
     """Load the face detection cascade classifier"""
     cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
@@ -51,6 +67,39 @@ def validate_face_image(image, face_rect):
     
     return True, "Image quality is good"
 
+def encode_face(image, face_rect=None):
+    """
+    Return the 128-d encoding of a face in a BGR image
+
+    The face rectangle (x, y, w, h) found by the cascade is passed to
+    face_recognition as a known location, so dlib does not search for the
+    face again; without one the whole image is taken as the face.
+    """
+    if face_rect is None:
+        face_rect = (0, 0, image.shape[1], image.shape[0])
+    x, y, w, h = face_rect
+    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    return face_recognition.face_encodings(rgb, known_face_locations=[(int(y), int(x + w), int(y + h), int(x))])[0]
+
+def open_store():
+    """Open the known-face store, converting an old known_faces.pkl first"""
+    store = EncodingStore(DB_PATH)
+    if os.path.exists(OLD_DB_PATH):
+        migrate_pickle(OLD_DB_PATH, store, encode_face, 'known_faces')
+    return store
+
+def enrolled_names():
+    """Enrolled name of every stored face image, by image path"""
+    store = open_store()
+    if not store.exists():
+        return {}
+    names, paths, _ = store.load()
+    return dict(zip(paths, names))
+
+def get_index():
+    """Open the index of the saved face images (built from known_faces/ the first time)"""
+    return open_index(INDEX_PATH, '.', 'known_faces', enrolled_names)
+
 def create_face_directory(name):
     """Create a directory for a person's faces"""
     # Create a sanitized directory name
@@ -60,9 +109,8 @@ def create_face_directory(name):
     # Create directory path
     person_dir = os.path.join('known_faces', safe_name)
     
-    # Create directory if it doesn't exist
-    if not os.path.exists(person_dir):
-        os.makedirs(person_dir)
+    # Create directory if it doesn't exist (bulk import workers may race here)
+    os.makedirs(person_dir, exist_ok=True)
     
     return person_dir
 
@@ -109,6 +157,7 @@ def add_face_from_image(image_path, name):
         
         # Extract face region
         face_roi = image[y:y+h, x:x+w]
+        encoding = encode_face(image, (x, y, w, h))
         
         # Create directory for this person
         person_dir = create_face_directory(name)
@@ -119,27 +168,9 @@ def add_face_from_image(image_path, name):
         face_path = os.path.join(person_dir, face_filename)
         cv2.imwrite(face_path, face_roi)
         
-        # Load existing database if it exists
-        known_faces = []
-        known_names = []
-        db_path = os.path.join('src', 'data', 'known_faces.pkl')
-        if os.path.exists(db_path):
-            with open(db_path, 'rb') as f:
-                data = pickle.load(f)
-                known_faces = data['faces']
-                known_names = data['names']
-        
-        # Add new face
-        known_faces.append(face_roi)
-        known_names.append(name)
-        
-        # Save updated database
-        data = {
-            'faces': known_faces,
-            'names': known_names
-        }
-        with open(db_path, 'wb') as f:
-            pickle.dump(data, f)
+        # Append the new face to the database (existing records are not rewritten)
+        open_store().append(name, face_path, encoding)
+        get_index().add(name, face_path)
         
         print(f"Successfully added face: {name}")
         print(f"Face image saved to: {face_path}")
@@ -148,35 +179,255 @@ def add_face_from_image(image_path, name):
         print(f"Error: Found {len(faces)} faces in the image. Please provide an image with exactly one face.")
         return False
 
+def find_images(root_dir):
+    """List (name, path) for every image in a root_dir/<person>/ tree"""
+    images = []
+    for person_dir in sorted(os.listdir(root_dir)):
+        person_path = os.path.join(root_dir, person_dir)
+        if not os.path.isdir(person_path):
+            continue
+        name = person_dir.replace('_', ' ')
+        for dirpath, _, filenames in os.walk(person_path):
+            for filename in sorted(filenames):
+                if filename.lower().endswith(IMAGE_EXTENSIONS):
+                    images.append((name, os.path.join(dirpath, filename)))
+    return images
+
+def load_manifest(manifest_path=MANIFEST_PATH):
+    """Return the hashes of the files imported by earlier bulk imports"""
+    hashes = set()
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    # Rejected photos are retried: they may pass without --strict or once fixed
+                    if entry.get('status', 'ok') == 'ok':
+                        hashes.add(entry['sha256'])
+                except (ValueError, KeyError, AttributeError):
+                    pass  # incomplete last line of an interrupted run
+    return hashes
+
+def append_manifest(entries, manifest_path=MANIFEST_PATH):
+    """Record imported files so that a later run skips them"""
+    os.makedirs(os.path.dirname(manifest_path) or '.', exist_ok=True)
+    with open(manifest_path, 'a') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+# Per-process state of the bulk import workers
+worker_cascade = None
+worker_done_hashes = set()
+
+def init_worker(done_hashes):
+    """Load the cascade once per worker process"""
+    global worker_cascade, worker_done_hashes
+    worker_cascade = load_face_cascade()
+    worker_done_hashes = done_hashes
+
+def import_image(job):
+    """
+    Validate, detect, crop and encode one image of a bulk import (runs in a worker)
+
+    Returns:
+        dict with the name, source path, sha256, status ('ok', 'rejected',
+        'skipped' or 'error'), a message and, when imported, the saved face
+        image path and the encoding
+    """
+    name, path, strict = job
+    result = {'name': name, 'source': path, 'sha256': None, 'status': 'error', 'message': ''}
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        result['sha256'] = hashlib.sha256(data).hexdigest()
+        if result['sha256'] in worker_done_hashes:
+            result['status'] = 'skipped'
+            result['message'] = 'already imported'
+            return result
+
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            result['message'] = 'could not decode image'
+            return result
+
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        faces = worker_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+        if len(faces) != 1:
+            result['status'] = 'rejected'
+            result['message'] = f"found {len(faces)} faces, expected exactly one"
+            return result
+
+        (x, y, w, h) = faces[0]
+        is_valid, message = validate_face_image(image, (x, y, w, h))
+        if not is_valid:
+            result['message'] = message
+            if strict:
+                result['status'] = 'rejected'
+                return result
+
+        encoding = encode_face(image, (x, y, w, h))
+
+        # Named after the content hash, so a rerun writes the same file
+        person_dir = create_face_directory(name)
+        face_path = os.path.join(person_dir, f"face_{result['sha256'][:16]}.jpg")
+        _, jpeg = cv2.imencode('.jpg', image[y:y+h, x:x+w])
+        with open(face_path, 'wb') as f:
+            f.write(jpeg.tobytes())
+
+        result['status'] = 'ok'
+        result['image_path'] = face_path
+        result['image_sha256'] = hashlib.sha256(jpeg.tobytes()).hexdigest()
+        result['encoding'] = encoding
+    except Exception as e:
+        result['message'] = str(e)
+    return result
+
+def bulk_import(root_dir, workers=None, strict=False, manifest_path=MANIFEST_PATH):
+    """
+    Import every root_dir/<person>/*.jpg photo with a pool of worker processes
+
+    Nothing is asked interactively: quality warnings and rejected photos are
+    listed in the report at the end. All new faces are written to the store
+    in one append, then the imported files are recorded in the manifest (by
+    content hash), so running the import again only processes new photos
+    and the ones that were rejected or failed. Ctrl+C
+    stops early and still saves the faces processed so far.
+
+    Args:
+        root_dir: directory with one sub-directory of photos per person
+        workers: number of processes (default: one per CPU)
+        strict: reject photos with quality warnings instead of importing them
+        manifest_path: JSON lines file of the imported files
+
+    Returns:
+        list of per-image result dicts (see import_image)
+    """
+    images = find_images(root_dir)
+    done_hashes = load_manifest(manifest_path)
+    print(f"Found {len(images)} images of {len(set(name for name, _ in images))} people in {root_dir}")
+
+    results = []
+    try:
+        with Pool(workers, initializer=init_worker, initargs=(done_hashes,)) as pool:
+            jobs = [(name, path, strict) for name, path in images]
+            for result in pool.imap_unordered(import_image, jobs, chunksize=4):
+                results.append(result)
+                sys.stdout.write(f"\rProcessed {len(results)}/{len(images)}")
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        print("\nInterrupted, saving the faces processed so far")
+    print()
+
+    # The same photo may sit in the tree twice
+    imported = []
+    kept = {}  # sha256 -> face image of the imported copy
+    for result in results:
+        if result['status'] == 'ok':
+            if result['sha256'] in kept:
+                result['status'] = 'skipped'
+                result['message'] = 'duplicate of another photo in this import'
+                # Filed under another person: its crop is not the one being kept
+                if result['image_path'] != kept[result['sha256']] and os.path.exists(result['image_path']):
+                    os.remove(result['image_path'])
+                continue
+            kept[result['sha256']] = result['image_path']
+            imported.append(result)
+    if imported:
+        open_store().append_many([(r['name'], r['image_path'], r['encoding']) for r in imported])
+        get_index().add_many([(r['name'], r['image_path'], r['image_sha256'], None, None) for r in imported])
+    append_manifest([{'sha256': r['sha256'], 'source': r['source'], 'name': r['name'],
+                      'status': r['status'], 'message': r['message']}
+                     for r in imported], manifest_path)
+
+    print_import_report(results)
+    return results
+
+def print_import_report(results):
+    """Summarize a bulk import: counts, quality warnings, rejected photos and errors"""
+    counts = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    print("\nImport report:")
+    print("-" * 50)
+    print(f"Imported: {counts.get('ok', 0)}, rejected: {counts.get('rejected', 0)}, "
+          f"errors: {counts.get('error', 0)}, already imported: {counts.get('skipped', 0)}")
+
+    warnings = [r for r in results if r['status'] == 'ok' and r['message']]
+    for title, entries in (("Imported with quality warnings", warnings),
+                           ("Rejected", [r for r in results if r['status'] == 'rejected']),
+                           ("Errors", [r for r in results if r['status'] == 'error'])):
+        if entries:
+            print(f"\n{title}:")
+            for entry in sorted(entries, key=lambda r: r['source']):
+                print(f"  {entry['source']}: {entry['message']}")
+
 def list_known_faces():
     """List all known faces in the database"""
-    if not os.path.exists('known_faces'):
-        print("No known faces directory found.")
+    people = get_index().people()
+    if not people:
+        print("No known faces found.")
         return
     
     print("\nKnown Faces Database:")
     print("-" * 50)
     
-    # List all person directories
-    for person_dir in os.listdir('known_faces'):
-        person_path = os.path.join('known_faces', person_dir)
-        if os.path.isdir(person_path):
-            # Count face images
-            face_count = len([f for f in os.listdir(person_path) if f.startswith('face_')])
-            print(f"Person: {person_dir.replace('_', ' ')}")
-            print(f"Number of face images: {face_count}")
-            print("-" * 50)
+    for person, face_count in people:
+        print(f"Person: {person}")
+        print(f"Number of face images: {face_count}")
+        print("-" * 50)
+
+def check_known_faces(verify_hashes=False):
+    """Report missing, modified and orphaned face images"""
+    index = get_index()
+    problems = index.check_integrity(verify_hashes)
+    names, paths, _ = open_store().load()
+    problems.update(index.find_orphans(paths))
+    
+    descriptions = {
+        'missing': "Indexed images that no longer exist",
+        'modified': "Images changed since they were enrolled",
+        'unreferenced': "Images without a stored face encoding",
+        'unindexed': "Stored faces whose image is not in the index"
+    }
+    total = 0
+    for key, description in descriptions.items():
+        if problems[key]:
+            total += len(problems[key])
+            print(f"\n{description} ({len(problems[key])}):")
+            for path in problems[key]:
+                print(f"  {path}")
+    if total == 0:
+        print(f"All {len(index.images())} indexed images are consistent with the {len(names)} stored faces.")
+    return problems
 
 def main():
     parser = argparse.ArgumentParser(description='Manage face recognition database')
     parser.add_argument('--name', help='Name of the person')
     parser.add_argument('--image', help='Path to the image file')
     parser.add_argument('--list', action='store_true', help='List all known faces')
+    parser.add_argument('--bulk', metavar='DIR',
+                        help='Import a folder with one sub-folder of photos per person')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes for --bulk (default: one per CPU)')
+    parser.add_argument('--strict', action='store_true',
+                        help='With --bulk, skip photos that fail the quality checks')
+    parser.add_argument('--check', action='store_true',
+                        help='Find missing, modified and orphaned face images')
+    parser.add_argument('--verify-hashes', action='store_true',
+                        help='With --check, also re-hash every image')
+    parser.add_argument('--reindex', action='store_true',
+                        help='Rebuild the image index from the known_faces folder')
     
     args = parser.parse_args()
     
     if args.list:
         list_known_faces()
+    elif args.check:
+        check_known_faces(args.verify_hashes)
+    elif args.reindex:
+        print(f"Indexed {get_index().rebuild('known_faces', enrolled_names())} face images")
+    elif args.bulk:
+        bulk_import(args.bulk, workers=args.workers, strict=args.strict)
     elif args.name and args.image:
         add_face_from_image(args.image, args.name)
     else:
@@ -184,6 +435,8 @@ def main():
         print("\nExample usage:")
         print("  Add a face: python src/core/add_face.py --name \"John Doe\" --image path/to/face.jpg")
         print("  List faces: python src/core/add_face.py --list")
+        print("  Check images: python src/core/add_face.py --check")
+        print("  Import a folder: python src/core/add_face.py --bulk photos/  (photos/<person>/*.jpg)")
         print("\nImage Guidelines:")
         print("1. Face should be clearly visible and centered")
         print("2. Good lighting (not too dark or bright)")
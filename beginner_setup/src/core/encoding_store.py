@@ -0,0 +1,239 @@
+import os
+import pickle
+import struct
+import zlib
+import cv2
+import numpy as np
+
+MAGIC = b'FENC0002'  # file type and format version
+OLD_MAGIC = b'FENC0001'  # records without trailer; upgraded on first use
+ENCODING_SIZE = 128  # numbers per face encoding (dlib's face model)
+MAX_TEXT_BYTES = 4096  # longest name or image path a record may hold
+LENGTH = struct.Struct('<I')
+TRAILER = struct.Struct('<II')  # CRC-32 of the record, record size in bytes
+
+class IncompleteRecord(Exception):
+    """The record runs past the end of the file"""
+
+class EncodingStore:
+    """
+    Append-only file of known faces: name, image path and 128-d encoding
+
+    Each face is one record: the name and the path of the saved face image
+    (both as length-prefixed UTF-8), the encoding as 128 float32 numbers
+    and a trailer with the record's CRC-32 and size (about 0.6 KB per face).
+    Adding a face appends one record to the end of the file instead of
+    rewriting the whole database, and loading reads the encodings directly
+    instead of unpickling and re-encoding face images.
+
+    The trailer lets append() check that the file ends with a complete
+    record by reading only the last record, so adding a face does not get
+    slower as the gallery grows. If the program was stopped while writing,
+    the incomplete last record is ignored when loading and cut off before
+    the next append. A damaged record anywhere else raises ValueError
+    instead, so that no good records are ever cut off.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.valid_size = None  # bytes of complete records, known after load()/append()
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def load(self):
+        """
+        Read all records
+
+        Returns:
+            (names, paths, encodings) where encodings is an N x 128 float32 array
+
+        Raises:
+            ValueError: if the file is not an encoding store or a record is damaged
+        """
+        names, paths, encodings, self.valid_size = self._read()
+        return names, paths, np.array(encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+
+    def append(self, name, image_path, encoding):
+        """Add one face to the end of the file"""
+        self.append_many([(name, image_path, encoding)])
+
+    def append_many(self, records):
+        """Add several (name, image_path, encoding) records with a single write"""
+        data = b''.join(self._pack(name, image_path, encoding) for name, image_path, encoding in records)
+        if not self.exists():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            data = MAGIC + data
+        else:
+            size = os.path.getsize(self.path)
+            if self.valid_size != size and not self._ends_with_complete_record(size):
+                self.valid_size = self._read()[3]
+                if self.valid_size < os.path.getsize(self.path):
+                    # Cut off a record left incomplete by an interrupted write
+                    with open(self.path, 'r+b') as f:
+                        f.truncate(self.valid_size)
+        with open(self.path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            self.valid_size = f.tell()
+
+    def _pack(self, name, image_path, encoding):
+        encoding = np.asarray(encoding, dtype='<f4').reshape(-1)
+        if encoding.size != ENCODING_SIZE:
+            raise ValueError(f"Expected a {ENCODING_SIZE}-d encoding, got {encoding.size} numbers")
+        name = name.encode('utf-8')
+        image_path = (image_path or '').encode('utf-8')
+        if len(name) > MAX_TEXT_BYTES or len(image_path) > MAX_TEXT_BYTES:
+            raise ValueError(f"Name and image path must be at most {MAX_TEXT_BYTES} bytes")
+        body = (LENGTH.pack(len(name)) + name + LENGTH.pack(len(image_path)) + image_path
+                + encoding.tobytes())
+        return body + TRAILER.pack(zlib.crc32(body), len(body) + TRAILER.size)
+
+    def _unpack(self, data, offset, trailer=True):
+        """
+        Parse the record starting at offset
+
+        Returns:
+            (name, image_path, encoding, offset after the record)
+
+        Raises:
+            IncompleteRecord: if the record runs past the end of data
+            ValueError: if the record is damaged
+        """
+        start = offset
+        fields = []
+        for _ in range(2):
+            if offset + LENGTH.size > len(data):
+                raise IncompleteRecord()
+            (length,) = LENGTH.unpack_from(data, offset)
+            if length > MAX_TEXT_BYTES:
+                raise ValueError(f"Damaged record at byte {start} of {self.path}")
+            offset += LENGTH.size
+            if offset + length > len(data):
+                raise IncompleteRecord()
+            fields.append(data[offset:offset + length])
+            offset += length
+        end = offset + ENCODING_SIZE * 4 + (TRAILER.size if trailer else 0)
+        if end > len(data):
+            raise IncompleteRecord()
+        if trailer:
+            crc, size = TRAILER.unpack_from(data, end - TRAILER.size)
+            if size != end - start or crc != zlib.crc32(data[start:end - TRAILER.size]):
+                raise ValueError(f"Damaged record at byte {start} of {self.path}")
+        try:
+            name, image_path = (field.decode('utf-8') for field in fields)
+        except UnicodeDecodeError:
+            raise ValueError(f"Damaged record at byte {start} of {self.path}")
+        encoding = np.frombuffer(data, dtype='<f4', count=ENCODING_SIZE, offset=offset)
+        return name, image_path, encoding, end
+
+    def _ends_with_complete_record(self, size):
+        """Check the last record through its trailer, without reading the rest of the file"""
+        if size == len(MAGIC):
+            return True
+        if size < len(MAGIC) + TRAILER.size:
+            return False
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return False  # let _read() report or upgrade it
+            f.seek(size - TRAILER.size)
+            _, record_size = TRAILER.unpack(f.read(TRAILER.size))
+            if record_size > size - len(MAGIC):
+                return False
+            f.seek(size - record_size)
+            record = f.read(record_size)
+        try:
+            return self._unpack(record, 0)[3] == record_size
+        except (IncompleteRecord, ValueError):
+            return False
+
+    def _read(self):
+        """Returns (names, paths, encodings, size of the complete records in bytes)"""
+        names, paths, encodings = [], [], []
+        if not self.exists():
+            return names, paths, encodings, 0
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        if data[:len(OLD_MAGIC)] == OLD_MAGIC:
+            return self._upgrade(data)
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a face encoding store")
+
+        offset = len(MAGIC)
+        while offset < len(data):
+            try:
+                name, image_path, encoding, end = self._unpack(data, offset)
+            except IncompleteRecord:
+                # Only an interrupted last write leaves a partial record, and then
+                # nothing follows it; a record that merely looks too long because its
+                # length was damaged is followed by the good records up to the end
+                if self._ends_with_complete_record(len(data)):
+                    raise ValueError(f"Damaged record at byte {offset} of {self.path}")
+                print(f"Warning: ignoring an incomplete last record in {self.path}")
+                break
+            names.append(name)
+            paths.append(image_path)
+            encodings.append(encoding)
+            offset = end
+        return names, paths, encodings, offset
+
+    def _upgrade(self, data):
+        """Rewrite a store of the first format (records without trailer) in the current one"""
+        records = []
+        offset = len(OLD_MAGIC)
+        while offset < len(data):
+            try:
+                name, image_path, encoding, offset = self._unpack(data, offset, trailer=False)
+            except IncompleteRecord:
+                break
+            records.append((name, image_path, encoding))
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(MAGIC + b''.join(self._pack(*record) for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(self.path, self.path + '.v1')
+        os.replace(temp_path, self.path)
+        print(f"Upgraded {self.path} to the current record format (old file kept as {self.path}.v1)")
+        names, paths, encodings = (list(column) for column in zip(*records)) if records else ([], [], [])
+        return names, paths, encodings, size
+
+def migrate_pickle(pickle_path, store, encode_face, image_dir):
+    """
+    Convert an old known_faces.pkl (face images plus names) into an EncodingStore
+
+    The face images are saved as files under image_dir/<name>/ and encoded
+    once; the pickle is renamed to <pickle_path>.migrated afterwards.
+
+    Args:
+        pickle_path: path of the old pickle database
+        store: EncodingStore to append to
+        encode_face: function(BGR image) -> 128-d encoding or None
+        image_dir: directory for the face images (e.g. known_faces)
+
+    Returns:
+        number of faces migrated
+    """
+    with open(pickle_path, 'rb') as f:
+        data = pickle.load(f)
+
+    records = []
+    for i, (face, name) in enumerate(zip(data['faces'], data['names'])):
+        encoding = encode_face(face)
+        if encoding is None:
+            print(f"Warning: could not encode stored face {i} of {name}, skipping it")
+            continue
+        safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).strip().replace(' ', '_')
+        person_dir = os.path.join(image_dir, safe_name)
+        os.makedirs(person_dir, exist_ok=True)
+        image_path = os.path.join(person_dir, f"face_migrated_{i:04d}.jpg")
+        cv2.imwrite(image_path, face)
+        records.append((name, image_path, encoding))
+
+    if records:
+        store.append_many(records)
+    os.replace(pickle_path, pickle_path + '.migrated')
+    print(f"Migrated {len(records)} of {len(data['names'])} faces from {pickle_path} to {store.path}")
+    return len(records)
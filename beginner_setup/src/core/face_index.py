@@ -0,0 +1,196 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+def file_sha256(path):
+    """SHA-256 of a file's contents, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class FaceIndex:
+    """
+    SQLite index of the saved face images in known_faces/
+
+    One row per image: person, path, content hash, size and modification
+    time. Rows are added when a face is enrolled, so listing people and
+    counting their images is one query instead of a walk over the whole
+    directory tree, and image files can be matched with the encoding store.
+
+    Paths are stored relative to base_dir, so the index still matches when
+    the program is started from another directory.
+    """
+
+    def __init__(self, db_path, base_dir):
+        self.db_path = db_path
+        self.base_dir = os.path.abspath(base_dir)
+        is_new = not os.path.exists(db_path)
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS images (
+                path TEXT PRIMARY KEY,
+                person TEXT NOT NULL,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                added_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_images_person ON images (person)")
+        self.conn.commit()
+        self.is_new = is_new
+
+    def relative_path(self, path):
+        """Path as stored in the index"""
+        return os.path.relpath(os.path.abspath(path), self.base_dir)
+
+    def absolute_path(self, path):
+        return os.path.join(self.base_dir, path)
+
+    def add(self, person, path, sha256=None, size=None, mtime=None):
+        """Index one saved face image (hash, size and mtime are read from the file if not given)"""
+        self.add_many([(person, path, sha256, size, mtime)])
+
+    def add_many(self, images):
+        """Index several (person, path, sha256, size, mtime) images in one transaction"""
+        rows = []
+        now = time.time()
+        for person, path, sha256, size, mtime in images:
+            if size is None or mtime is None:
+                stat = os.stat(path)
+                size, mtime = stat.st_size, stat.st_mtime
+            if sha256 is None:
+                sha256 = file_sha256(path)
+            rows.append((self.relative_path(path), person, sha256, size, mtime, now))
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def remove(self, paths):
+        with self.conn:
+            self.conn.executemany("DELETE FROM images WHERE path = ?",
+                                  [(self.relative_path(path),) for path in paths])
+
+    def people(self):
+        """Return [(person, image count)] sorted by name"""
+        return self.conn.execute(
+            "SELECT person, COUNT(*) FROM images GROUP BY person ORDER BY person").fetchall()
+
+    def images(self, person=None):
+        """Return [(person, absolute path, sha256, size, mtime)], optionally for one person"""
+        query = "SELECT person, path, sha256, size, mtime FROM images"
+        params = ()
+        if person is not None:
+            query += " WHERE person = ?"
+            params = (person,)
+        return [(p, self.absolute_path(path), sha256, size, mtime)
+                for p, path, sha256, size, mtime in self.conn.execute(query + " ORDER BY path", params)]
+
+    def check_integrity(self, verify_hashes=False):
+        """
+        Compare the indexed images with the files on disk
+
+        Only the indexed files are looked at (one stat each, no directory
+        walk). A file whose size or mtime changed is reported as modified;
+        with verify_hashes every file is also re-hashed.
+
+        Returns:
+            dict with lists of absolute paths: 'missing' and 'modified'
+        """
+        missing, modified = [], []
+        for _, path, sha256, size, mtime in self.images():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                missing.append(path)
+                continue
+            if stat.st_size != size or abs(stat.st_mtime - mtime) > 1e-3:
+                modified.append(path)
+            elif verify_hashes and file_sha256(path) != sha256:
+                modified.append(path)
+        return {'missing': missing, 'modified': modified}
+
+    def find_orphans(self, store_paths):
+        """
+        Match the index with the image paths of the encoding store, without touching the disk
+
+        Returns:
+            dict with 'unreferenced' (indexed images no stored face points to)
+            and 'unindexed' (stored faces whose image is not in the index)
+        """
+        referenced = set(self.relative_path(path) for path in store_paths if path)
+        indexed = set(path for (path,) in self.conn.execute("SELECT path FROM images"))
+        return {'unreferenced': sorted(self.absolute_path(path) for path in indexed - referenced),
+                'unindexed': sorted(self.absolute_path(path) for path in referenced - indexed)}
+
+    def rebuild(self, known_faces_dir, enrolled_names=None):
+        """
+        Index every image under known_faces/<person>/ (one full walk)
+
+        Used to create the index for an existing known_faces directory;
+        after that it is kept up to date on enrollment. Rows of files that
+        no longer exist are removed, unchanged files are not re-hashed.
+
+        The folder name is sanitized, so it is not always the enrolled name
+        ("O'Brien" is saved under OBrien): a person is named as in
+        enrolled_names, then as in the existing row, and only images added
+        by hand fall back to the folder name.
+
+        Args:
+            known_faces_dir: directory with one folder of images per person
+            enrolled_names: dict image path -> enrolled name (the encoding
+                store's paths and names)
+
+        Returns:
+            number of images in the index
+        """
+        names = {self.relative_path(path): name for path, name in (enrolled_names or {}).items() if path}
+        known = {path: (size, mtime) for path, size, mtime in
+                 self.conn.execute("SELECT path, size, mtime FROM images")}
+        known_people = dict(self.conn.execute("SELECT path, person FROM images"))
+        found = set()
+        new_images = []
+        if os.path.isdir(known_faces_dir):
+            for person_dir in sorted(os.listdir(known_faces_dir)):
+                person_path = os.path.join(known_faces_dir, person_dir)
+                if not os.path.isdir(person_path):
+                    continue
+                folder_person = person_dir.replace('_', ' ')
+                for filename in sorted(os.listdir(person_path)):
+                    if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                        continue
+                    path = os.path.join(person_path, filename)
+                    relative = self.relative_path(path)
+                    stat = os.stat(path)
+                    found.add(relative)
+                    person = names.get(relative) or known_people.get(relative) or folder_person
+                    if known.get(relative) != (stat.st_size, stat.st_mtime) or person != known_people[relative]:
+                        new_images.append((person, path, None, stat.st_size, stat.st_mtime))
+        self.add_many(new_images)
+        with self.conn:
+            self.conn.executemany("DELETE FROM images WHERE path = ?",
+                                  [(path,) for path in set(known) - found])
+        return self.conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+def open_index(db_path, base_dir, known_faces_dir, enrolled_names=None):
+    """
+    Open the index, building it from known_faces_dir the first time
+
+    Args:
+        enrolled_names: callable() -> dict image path -> enrolled name, only
+            called when the index has to be built (see FaceIndex.rebuild)
+    """
+    index = FaceIndex(db_path, base_dir)
+    if index.is_new:
+        count = index.rebuild(known_faces_dir, enrolled_names() if enrolled_names else None)
+        if count:
+            print(f"Indexed {count} existing face images")
+    return index
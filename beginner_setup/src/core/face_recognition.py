@@ -1,20 +1,32 @@
+import argparse
 import cv2
 import numpy as np
 import os
-import pickle
 from datetime import datetime
 import sys
 import dlib
+
+# This file has the same name as the face_recognition library: make sure
+# `import face_recognition` finds the library, not this script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path = [p for p in sys.path if os.path.abspath(p or '.') != script_dir]
 import face_recognition
 
 # Add the project root directory to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 sys.path.append(project_root)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.encoding_store import EncodingStore, migrate_pickle
+from src.core.face_index import open_index
+from src.utils.profiling import LoopProfiler
 
 class FaceRecognitionSystem:
     def __init__(self):
-        self.known_faces = []
+        # Known faces: name, saved face image and its encoding (computed once at enrollment)
         self.known_names = []
+        self.known_paths = []
+        self.known_encodings = np.empty((0, 128), dtype=np.float32)
         self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
         
         # Fix the path to the shape predictor model
@@ -36,39 +48,73 @@ class FaceRecognitionSystem:
         self.known_faces_dir = os.path.join(project_root, 'beginner_setup', 'known_faces')
         os.makedirs(self.known_faces_dir, exist_ok=True)
         
-        self.db_path = os.path.join(self.data_dir, 'known_faces.pkl')
+        self.db_path = os.path.join(self.data_dir, 'known_faces.enc')
+        self.store = EncodingStore(self.db_path)
         self.load_known_faces()
+        
+        # Index of the saved face images, updated on every enrollment
+        self.face_index = open_index(os.path.join(self.data_dir, 'known_faces_index.db'),
+                                     os.path.join(project_root, 'beginner_setup'), self.known_faces_dir,
+                                     lambda: dict(zip(self.known_paths, self.known_names)))
 
     def load_known_faces(self):
         """Load known faces from the database"""
-        if os.path.exists(self.db_path):
-            with open(self.db_path, 'rb') as f:
-                data = pickle.load(f)
-                self.known_faces = data['faces']
-                self.known_names = data['names']
+        # Convert the old pickle of face images once
+        old_db_path = os.path.join(self.data_dir, 'known_faces.pkl')
+        if os.path.exists(old_db_path):
+            migrate_pickle(old_db_path, self.store, self.encode_face, self.known_faces_dir)
+        if self.store.exists():
+            self.known_names, self.known_paths, self.known_encodings = self.store.load()
             print(f"Loaded {len(self.known_names)} known faces")
 
-    def compare_faces(self, face1, face2):
-        """Compare two face images and return confidence score"""
+    def encode_faces(self, image, boxes):
+        """
+        Encode several faces of a BGR image in one call
+
+        The faces were already found by the Haar cascade, so their boxes are
+        passed to face_recognition as known locations instead of letting dlib
+        search the image for faces a second time.
+
+        Args:
+            image: BGR image
+            boxes: list of (x, y, w, h) face rectangles
+
+        Returns:
+            list with a 128-d encoding (or None on error) for every box
+        """
+        if len(boxes) == 0:
+            return []
+        # face_recognition wants RGB and (top, right, bottom, left) boxes
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        locations = [(int(y), int(x + w), int(y + h), int(x)) for (x, y, w, h) in boxes]
         try:
-            # Convert BGR to RGB (face_recognition uses RGB)
-            face1_rgb = cv2.cvtColor(face1, cv2.COLOR_BGR2RGB)
-            face2_rgb = cv2.cvtColor(face2, cv2.COLOR_BGR2RGB)
-            
-            # Get face encodings
-            face1_encoding = face_recognition.face_encodings(face1_rgb)[0]
-            face2_encoding = face_recognition.face_encodings(face2_rgb)[0]
-            
-            # Calculate face distance (lower is more similar)
-            face_distance = face_recognition.face_distance([face1_encoding], face2_encoding)[0]
-            
-            # Convert distance to confidence score (0-100%)
-            confidence = (1 - face_distance) * 100
-            
-            return confidence > 60, confidence  # Return both match result and confidence score
+            return face_recognition.face_encodings(rgb, known_face_locations=locations)
         except Exception as e:
-            print(f"Error in face comparison: {str(e)}")
-            return False, 0.0
+            print(f"Error encoding faces: {str(e)}")
+            return [None] * len(boxes)
+
+    def encode_face(self, face_image):
+        """Return the 128-d encoding of a BGR face crop, or None on error"""
+        height, width = face_image.shape[:2]
+        return self.encode_faces(face_image, [(0, 0, width, height)])[0]
+
+    def identify(self, encoding):
+        """
+        Find the closest known face for an encoding
+
+        All known faces are compared at once with a single face_distance call.
+        Returns (name, confidence) where confidence is 0-100%; the name is
+        "Unknown" if no known face is a match (confidence above 60%).
+        """
+        if encoding is None or len(self.known_encodings) == 0:
+            return "Unknown", 0.0
+        # Lower distance is more similar
+        distances = face_recognition.face_distance(self.known_encodings, encoding)
+        best = int(np.argmin(distances))
+        confidence = (1 - distances[best]) * 100
+        if confidence > 60:
+            return self.known_names[best], confidence
+        return "Unknown", 0.0
 
     def process_frame(self, frame):
         """Process a single frame for face detection and recognition"""
@@ -83,19 +129,13 @@ class FaceRecognitionSystem:
             minSize=(30, 30)
         )
         
+        # Encode all faces in one call, at the boxes the cascade found
+        encodings = self.encode_faces(frame, faces)
+        
         # Process each detected face
-        for (x, y, w, h) in faces:
-            # Extract face region
-            face_roi = frame[y:y+h, x:x+w]
-            
-            # Try to recognize the face
-            name = "Unknown"
-            confidence = 0.0
-            for known_face, known_name in zip(self.known_faces, self.known_names):
-                is_match, conf = self.compare_faces(face_roi, known_face)
-                if is_match and conf > confidence:
-                    name = known_name
-                    confidence = conf
+        for (x, y, w, h), encoding in zip(faces, encodings):
+            # Compare the face with all known faces at once
+            name, confidence = self.identify(encoding)
             
             # Draw rectangle around face
             cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
@@ -108,8 +148,8 @@ class FaceRecognitionSystem:
         
         return frame
 
-    def run(self):
-        """Run the face recognition system"""
+    def run(self, profiler=None):
+        """Run the face recognition system (optionally with a LoopProfiler)"""
         # Try different camera indices
         for camera_index in [0, 1]:
             video_capture = cv2.VideoCapture(camera_index)
@@ -128,8 +168,13 @@ class FaceRecognitionSystem:
             return
         
         print("Face recognition system started. Press 'q' to quit, 's' to save frame, 'a' to add face")
+        if profiler is not None:
+            print("Press 'p' to capture a new CPU profile and memory report")
+            profiler.start()
         
         while True:
+            if profiler is not None:
+                profiler.tick()
             ret, frame = video_capture.read()
             if not ret:
                 print("Error: Could not read frame")
@@ -155,8 +200,12 @@ class FaceRecognitionSystem:
                 name = input("Enter name for the new face: ")
                 if self.add_face(frame, name):
                     print(f"Added new face: {name}")
+            elif key == ord('p') and profiler is not None:
+                profiler.request_capture()
         
         # Clean up
+        if profiler is not None:
+            profiler.stop()
         video_capture.release()
         cv2.destroyAllWindows()
 
@@ -179,6 +228,10 @@ class FaceRecognitionSystem:
             
             # Extract face region
             face_roi = frame[y:y+h, x:x+w]
+            encoding = self.encode_faces(frame, [(x, y, w, h)])[0]
+            if encoding is None:
+                print("Could not encode the face. Please try again.")
+                return False
             
             # Create directory for this person
             safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).strip()
@@ -194,17 +247,14 @@ class FaceRecognitionSystem:
             face_path = os.path.join(person_dir, face_filename)
             cv2.imwrite(face_path, face_roi)
             
+            # Save to database (appends just this face)
+            self.store.append(name, face_path, encoding)
+            self.face_index.add(name, face_path)
+            
             # Add to known faces
-            self.known_faces.append(face_roi)
             self.known_names.append(name)
-            
-            # Save to database
-            data = {
-                'faces': self.known_faces,
-                'names': self.known_names
-            }
-            with open(self.db_path, 'wb') as f:
-                pickle.dump(data, f)
+            self.known_paths.append(face_path)
+            self.known_encodings = np.vstack([self.known_encodings, encoding.astype(np.float32)])
             
             return True
         else:
@@ -212,5 +262,16 @@ class FaceRecognitionSystem:
             return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Real-time face recognition')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the video loop (also: FACE_PROFILE=1)')
+    parser.add_argument('--profile-dir', default=os.environ.get('FACE_PROFILE_DIR', 'profiles'),
+                        help='Where to save the profiles (default: profiles)')
+    args = parser.parse_args()
+
+    profiler = None
+    if args.profile or os.environ.get('FACE_PROFILE') == '1':
+        profiler = LoopProfiler(args.profile_dir)
+
     face_system = FaceRecognitionSystem()
-    face_system.run() 
\ No newline at end of file
+    face_system.run(profiler) 
\ No newline at end of file
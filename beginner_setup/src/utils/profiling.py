@@ -0,0 +1,92 @@
+import cProfile
+import os
+import pstats
+import signal
+import time
+import tracemalloc
+
+class LoopProfiler:
+    """
+    Profile a video loop with cProfile and watch its memory with tracemalloc
+
+    Call tick() once per loop iteration. The first `seconds` of the run are
+    profiled and saved as a .prof file plus a readable summary. Every
+    `snapshot_every` seconds the memory in use is compared with the start,
+    which shows lists that keep growing (e.g. known_faces). Pressing the
+    capture key (request_capture()) or sending SIGUSR1 starts a new capture.
+    """
+
+    def __init__(self, output_dir="profiles", seconds=30, snapshot_every=300):
+        self.output_dir = output_dir
+        self.seconds = seconds
+        self.snapshot_every = snapshot_every
+        self.profile = None
+        self.started_at = None
+        self.capture_requested = False
+        self.first_snapshot = None
+        self.next_snapshot_at = None
+        self.saved = 0  # number of files written, keeps names unique
+
+    def start(self):
+        """Start memory tracing and the first profiling window"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        tracemalloc.start()
+        self.first_snapshot = tracemalloc.take_snapshot()
+        self.next_snapshot_at = time.time() + self.snapshot_every
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.request_capture())
+        self._start_profile()
+        print(f"Profiling enabled, writing to {os.path.abspath(self.output_dir)}")
+
+    def request_capture(self):
+        """Ask for a new profile and memory report at the next tick()"""
+        self.capture_requested = True
+
+    def tick(self):
+        now = time.time()
+        if self.capture_requested:
+            self.capture_requested = False
+            if self.profile is None:
+                self._start_profile()
+            self._save_memory_report()
+        elif self.profile is not None and now - self.started_at >= self.seconds:
+            self._save_profile()
+        if now >= self.next_snapshot_at:
+            self.next_snapshot_at = now + self.snapshot_every
+            self._save_memory_report()
+
+    def stop(self):
+        """Save whatever is still open and stop tracing"""
+        if self.profile is not None:
+            self._save_profile()
+        if tracemalloc.is_tracing():
+            self._save_memory_report()
+            tracemalloc.stop()
+
+    def _start_profile(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        self.started_at = time.time()
+        print(f"Profiling for {self.seconds} seconds...")
+
+    def _save_profile(self):
+        self.profile.disable()
+        base = os.path.join(self.output_dir, f"cpu_{time.strftime('%Y%m%d_%H%M%S')}_{self.saved}")
+        self.profile.dump_stats(base + ".prof")
+        with open(base + ".txt", 'w') as f:
+            pstats.Stats(self.profile, stream=f).sort_stats('cumulative').print_stats(30)
+        self.profile = None
+        self.saved += 1
+        print(f"Saved CPU profile to {base}.prof")
+
+    def _save_memory_report(self):
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        path = os.path.join(self.output_dir, f"memory_{time.strftime('%Y%m%d_%H%M%S')}_{self.saved}.txt")
+        with open(path, 'w') as f:
+            f.write(f"Traced memory: current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB\n\n")
+            f.write("Growth since start:\n")
+            for stat in snapshot.compare_to(self.first_snapshot, 'lineno')[:30]:
+                f.write(f"  {stat}\n")
+        self.saved += 1
+        print(f"Saved memory report to {path}")
@@ -0,0 +1,120 @@
+import os
+import pickle
+import struct
+import numpy as np
+import pytest
+from src.core.encoding_store import EncodingStore, MAGIC, OLD_MAGIC, migrate_pickle
+
+def encoding(seed):
+    return np.random.default_rng(seed).normal(size=128).astype(np.float32)
+
+@pytest.fixture
+def store(tmp_path):
+    """Store with five faces of three people"""
+    store = EncodingStore(str(tmp_path / "known_faces.enc"))
+    for i in range(5):
+        store.append(f"person{i % 3}", f"known_faces/person{i % 3}/face_{i}.jpg", encoding(i))
+    return store
+
+def record_offsets(path):
+    """Start of every record, found by walking the length fields"""
+    data = open(path, 'rb').read()
+    offsets, offset = [], len(MAGIC)
+    while offset < len(data):
+        offsets.append(offset)
+        (name_length,) = struct.unpack_from('<I', data, offset)
+        (path_length,) = struct.unpack_from('<I', data, offset + 4 + name_length)
+        offset += 8 + name_length + path_length + 128 * 4 + 8
+    return offsets
+
+def test_records_round_trip(store):
+    names, paths, encodings = EncodingStore(store.path).load()
+    assert names == ["person0", "person1", "person2", "person0", "person1"]
+    assert paths[3] == "known_faces/person0/face_3.jpg"
+    assert encodings.shape == (5, 128) and encodings.dtype == np.float32
+    assert np.array_equal(encodings[4], encoding(4))
+
+    store.append_many([("Zoë", None, encoding(5)), ("O'Brien", "x.jpg", encoding(6))])
+    names, paths, _ = EncodingStore(store.path).load()
+    assert names[-2:] == ["Zoë", "O'Brien"] and paths[-2:] == ["", "x.jpg"]
+
+def test_incomplete_last_record_is_ignored_and_cut_off(store):
+    """Test that an interrupted append loses only the record being written"""
+    size = os.path.getsize(store.path)
+    with open(store.path, 'ab') as f:
+        f.write(open(store.path, 'rb').read()[len(MAGIC):len(MAGIC) + 300])
+
+    reopened = EncodingStore(store.path)
+    assert len(reopened.load()[0]) == 5
+    fresh = EncodingStore(store.path)
+    fresh.append("late", "late.jpg", encoding(7))
+    names, _, _ = EncodingStore(store.path).load()
+    assert names == ["person0", "person1", "person2", "person0", "person1", "late"]
+    assert os.path.getsize(store.path) > size
+
+def test_damaged_record_is_reported_not_cut_off(store):
+    """Test that a damaged length in the middle raises instead of dropping the later faces"""
+    offset = record_offsets(store.path)[2]
+    for damaged_length in (3000, 0xFFFFFFFF):
+        data = bytearray(open(store.path, 'rb').read())
+        data[offset:offset + 4] = struct.pack('<I', damaged_length)
+        with open(store.path, 'wb') as f:
+            f.write(data)
+        size = os.path.getsize(store.path)
+        with pytest.raises(ValueError):
+            EncodingStore(store.path).load()
+        # Appending after it is harmless: nothing is cut off
+        EncodingStore(store.path).append("new", "new.jpg", encoding(8))
+        assert os.path.getsize(store.path) > size
+        assert open(store.path, 'rb').read()[:size] == bytes(data)
+
+def test_damaged_encoding_fails_checksum(store):
+    offset = record_offsets(store.path)[1]
+    with open(store.path, 'r+b') as f:
+        f.seek(offset + 100)
+        f.write(b'\x00\x01')
+    with pytest.raises(ValueError):
+        EncodingStore(store.path).load()
+
+def test_append_reads_only_the_last_record(store, monkeypatch):
+    """Test that a new process appends without parsing the whole file"""
+    fresh = EncodingStore(store.path)
+    monkeypatch.setattr(fresh, '_read', lambda: pytest.fail("append parsed the whole store"))
+    fresh.append("new", "new.jpg", encoding(9))
+    assert EncodingStore(store.path).load()[0][-1] == "new"
+
+def test_first_format_is_upgraded(tmp_path):
+    path = str(tmp_path / "known_faces.enc")
+    with open(path, 'wb') as f:
+        f.write(OLD_MAGIC)
+        for i, name in enumerate(["ann", "bob"]):
+            for text in (name.encode(), f"{name}.jpg".encode()):
+                f.write(struct.pack('<I', len(text)) + text)
+            f.write(encoding(i).astype('<f4').tobytes())
+
+    names, paths, encodings = EncodingStore(path).load()
+    assert names == ["ann", "bob"] and paths == ["ann.jpg", "bob.jpg"]
+    assert np.array_equal(encodings[1], encoding(1))
+    assert open(path, 'rb').read(len(MAGIC)) == MAGIC
+    assert os.path.exists(path + '.v1')
+    assert EncodingStore(path).load()[0] == ["ann", "bob"]
+
+def test_migrate_pickle_saves_images_and_skips_unencodable(tmp_path):
+    pickle_path = str(tmp_path / "known_faces.pkl")
+    faces = [np.full((20, 20, 3), value, dtype=np.uint8) for value in (10, 20, 30)]
+    with open(pickle_path, 'wb') as f:
+        pickle.dump({'faces': faces, 'names': ["Ann Lee", "Bob", "Ann Lee"]}, f)
+
+    def encode_face(face):
+        return None if face[0, 0, 0] == 20 else np.full(128, face[0, 0, 0], dtype=np.float32)
+
+    store = EncodingStore(str(tmp_path / "known_faces.enc"))
+    image_dir = str(tmp_path / "known_faces")
+    assert migrate_pickle(pickle_path, store, encode_face, image_dir) == 2
+
+    names, paths, encodings = store.load()
+    assert names == ["Ann Lee", "Ann Lee"]
+    assert all(os.path.dirname(p) == os.path.join(image_dir, "Ann_Lee") for p in paths)
+    assert all(os.path.exists(p) for p in paths)
+    assert list(encodings[:, 0]) == [10, 30]
+    assert not os.path.exists(pickle_path) and os.path.exists(pickle_path + '.migrated')
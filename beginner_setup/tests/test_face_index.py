@@ -0,0 +1,37 @@
+import os
+import pytest
+from src.core.face_index import FaceIndex, open_index
+
+@pytest.fixture
+def known_faces(tmp_path):
+    """known_faces/ with a sanitized folder (O'Brien -> OBrien) and a hand-made one"""
+    paths = {}
+    for folder, filename in (("OBrien", "face_1.jpg"), ("OBrien", "face_2.jpg"), ("Ann_Lee", "a.jpg")):
+        os.makedirs(tmp_path / "known_faces" / folder, exist_ok=True)
+        path = str(tmp_path / "known_faces" / folder / filename)
+        with open(path, 'wb') as f:
+            f.write(filename.encode())
+        paths[filename] = path
+    return paths
+
+def test_rebuild_keeps_enrolled_names(tmp_path, known_faces):
+    """Test that --reindex lists people under the names they were enrolled with"""
+    enrolled = {known_faces["face_1.jpg"]: "O'Brien", known_faces["face_2.jpg"]: "O'Brien"}
+    index = open_index(str(tmp_path / "index.db"), str(tmp_path), str(tmp_path / "known_faces"),
+                       lambda: enrolled)
+    assert index.people() == [("Ann Lee", 1), ("O'Brien", 2)]
+
+    # Rebuilding without the store keeps the names already in the index
+    assert index.rebuild(str(tmp_path / "known_faces")) == 3
+    assert index.people() == [("Ann Lee", 1), ("O'Brien", 2)]
+    index.close()
+
+def test_rebuild_renames_rows_indexed_under_the_folder_name(tmp_path, known_faces):
+    index = FaceIndex(str(tmp_path / "index.db"), str(tmp_path))
+    index.rebuild(str(tmp_path / "known_faces"))
+    assert index.people() == [("Ann Lee", 1), ("OBrien", 2)]
+
+    index.rebuild(str(tmp_path / "known_faces"),
+                  {known_faces["face_1.jpg"]: "O'Brien", known_faces["face_2.jpg"]: "O'Brien"})
+    assert index.people() == [("Ann Lee", 1), ("O'Brien", 2)]
+    index.close()
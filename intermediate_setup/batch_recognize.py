@@ -0,0 +1,83 @@
+import argparse
+from src.recognition.backends import available_backends
+from src.pipeline.components import RecognitionComponents
+from src.batch.video_batch import (VideoBatchProcessor, WRITERS, collect_videos,
+                                   load_progress, output_format)
+from src.utils.model_downloader import ModelDownloader
+from src.utils.opencv_setup import OpenCVSetup
+from src.utils.metrics import start_reporting
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Recognize faces in recorded video files without a display')
+    parser.add_argument('inputs', nargs='+', help='Video files or directories of videos')
+    parser.add_argument('-o', '--output', required=True,
+                        help='Output file with one record per processed frame (.jsonl or .csv)')
+    parser.add_argument('--format', choices=sorted(WRITERS), default=None,
+                        help='Output format (default: from the output file extension, else jsonl)')
+    sampling = parser.add_mutually_exclusive_group()
+    sampling.add_argument('--stride', type=int, default=1,
+                          help='Process every N-th frame (default: 1)')
+    sampling.add_argument('--interval', type=float, default=None,
+                          help='Process one frame every N seconds of video instead')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='Recognition worker threads (default: 2)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Append to the output and skip frames it already contains')
+    parser.add_argument('--model', default='VGG-Face', choices=available_backends(),
+                        help='Embedding model (default: VGG-Face)')
+    parser.add_argument('--engine', default='tensorflow', choices=['tensorflow', 'onnx'],
+                        help='Inference engine for the embedding model (default: tensorflow)')
+    parser.add_argument('--onnx-threads', type=int, default=None,
+                        help='Intra-op threads for the ONNX engine (default: all cores)')
+    parser.add_argument('--int8', action='store_true',
+                        help='Use the int8-quantized model with the ONNX engine')
+    parser.add_argument('--db', default='face_database.db', help='Face database path')
+    parser.add_argument('--no-quality-gate', action='store_true',
+                        help='Embed every detected face, even tiny, blurry or dark ones')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Log per-stage latency histograms and counters (also: FACE_METRICS=1)')
+    parser.add_argument('--metrics-file', default=None,
+                        help='Also write them to this Prometheus text file (e.g. for node exporter)')
+    args = parser.parse_args()
+
+    videos = collect_videos(args.inputs)
+    if not videos:
+        print("Error: no video files found")
+        return 1
+    fmt = output_format(args.output, args.format)
+    progress = load_progress(args.output, fmt) if args.resume else {}
+
+    reporter = start_reporting(args.metrics, args.metrics_file)
+    try:
+        if not OpenCVSetup().setup_opencv_files():
+            raise Exception("Failed to set up OpenCV files")
+        if not ModelDownloader().download_model():
+            raise Exception("Failed to download required model")
+
+        components = RecognitionComponents(args.model, engine=args.engine,
+                                           onnx_threads=args.onnx_threads, quantize=args.int8,
+                                           db_path=args.db, thread_safe_detector=True)
+        print(components.startup_timer.report())
+
+        writer = WRITERS[fmt](args.output, append=args.resume)
+        processor = VideoBatchProcessor(components, writer, num_workers=args.workers,
+                                        stride=args.stride, interval=args.interval,
+                                        quality_gate=not args.no_quality_gate)
+        try:
+            processor.run(videos, progress)
+        except KeyboardInterrupt:
+            print("Interrupted; run again with --resume to continue")
+        finally:
+            writer.close()
+            print(processor.summary())
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return 1
+    finally:
+        if reporter is not None:
+            reporter.stop()
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
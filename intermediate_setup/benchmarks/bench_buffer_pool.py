@@ -0,0 +1,106 @@
+"""
+Measure per-frame allocations with and without the buffer pool
+
+Runs the image operations the pipeline performs on every frame (BGR->RGB
+for the detector and the landmark predictor, BGR->gray for the quality
+gate, one warpAffine and one BGR->RGB per face, a drawing copy and the
+GUI's RGB conversion) on synthetic frames, once allocating fresh arrays
+and once writing into pooled buffers. Allocations are counted with
+tracemalloc (numpy and OpenCV report their array memory to it).
+
+Usage:
+    python benchmarks/bench_buffer_pool.py
+    python benchmarks/bench_buffer_pool.py --width 1280 --height 720 --faces 4 --frames 300
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.buffer_pool import BufferPool
+
+ALLOCATION_THRESHOLD = 4096  # bytes; smaller allocations are Python bookkeeping
+
+class AllocationCounter:
+    """Counts array-sized allocations between calls to step()"""
+
+    def __init__(self):
+        self.count = 0
+        self.bytes = 0
+
+    def step(self, function):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        result = function()
+        grown = tracemalloc.get_traced_memory()[1] - before
+        if grown >= ALLOCATION_THRESHOLD:
+            self.count += 1
+            self.bytes += grown
+        return result
+
+def process_frame(frame, pool, face_transforms, counter=None):
+    """The per-frame image work of detection, quality, alignment, embedding and display"""
+    # Buffers are requested inside each step so that their allocation is counted
+    step = counter.step if counter else (lambda function: function())
+    step(lambda: cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=pool.like(frame, tag='detect_rgb')))
+    step(lambda: cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=pool.like(frame, tag='landmarks_rgb')))
+    step(lambda: cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY,
+                              dst=pool.like(frame, channels=1, tag='quality_gray')))
+    for M in face_transforms:
+        aligned = step(lambda: cv2.warpAffine(frame, M, (150, 150), flags=cv2.INTER_CUBIC,
+                                              dst=pool.get((150, 150, 3), frame.dtype, 'aligned')))
+        step(lambda: cv2.cvtColor(aligned, cv2.COLOR_BGR2RGB, dst=pool.like(aligned, tag='embed_rgb')))
+    display = step(lambda: pool.copy(frame, tag='display'))
+    step(lambda: cv2.cvtColor(display, cv2.COLOR_BGR2RGB, dst=pool.like(display, tag='display_rgb')))
+
+def run(frames, face_transforms, enabled, rounds):
+    pool = BufferPool(enabled=enabled)
+
+    # Frame time without tracemalloc, which slows allocations down
+    process_frame(frames[0], pool, face_transforms)
+    start = time.perf_counter()
+    for i in range(rounds):
+        process_frame(frames[i % len(frames)], pool, face_transforms)
+    frame_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    counter = AllocationCounter()
+    tracemalloc.start()
+    try:
+        for i in range(rounds):
+            process_frame(frames[i % len(frames)], pool, face_transforms, counter)
+    finally:
+        tracemalloc.stop()
+    return {
+        'frame_ms': frame_ms,
+        'allocations_per_frame': counter.count / rounds,
+        'mb_per_frame': counter.bytes / rounds / 1e6,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Buffer pool allocation benchmark')
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--faces', type=int, default=2, help='Faces aligned per frame (default: 2)')
+    parser.add_argument('--frames', type=int, default=200, help='Frames per run (default: 200)')
+    parser.add_argument('--fps', type=float, default=30.0, help='Frame rate for the MB/s figure')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(4)]
+    face_transforms = [cv2.getRotationMatrix2D((args.width * (i + 1) / (args.faces + 1), args.height / 2),
+                                               5.0 * i, 0.5) for i in range(args.faces)]
+
+    print(f"{args.width}x{args.height}, {args.faces} faces, {args.frames} frames")
+    print(f"{'':<12} {'frame ms':>9} {'allocs/frame':>13} {'MB/frame':>9} {'MB/s @' + str(int(args.fps)):>10}")
+    for label, enabled in (("no pool", False), ("pool", True)):
+        result = run(frames, face_transforms, enabled, args.frames)
+        print(f"{label:<12} {result['frame_ms']:9.2f} {result['allocations_per_frame']:13.1f} "
+              f"{result['mb_per_frame']:9.2f} {result['mb_per_frame'] * args.fps:10.1f}")
+
+if __name__ == "__main__":
+    main()
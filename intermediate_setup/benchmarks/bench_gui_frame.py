@@ -0,0 +1,97 @@
+"""
+Measure GUI thread CPU per displayed frame, before and after off-thread rendering
+
+"label" is the old MainWindow.update_frame: BGR->RGB of the full camera
+frame, QImage, QPixmap.fromImage, scaled(KeepAspectRatio) and setPixmap
+on a QLabel, all on the GUI thread. "view" is the current path: the
+capture thread renders the frame at the view size with render_display()
+and the GUI thread only wraps the buffer in a QImage and paints it in
+VideoView.paintEvent. Both are repainted synchronously and timed with
+time.thread_time(), so only the CPU of the calling (GUI) thread counts;
+the render_display() cost that moved to the capture thread is reported
+separately.
+
+Runs on Qt's offscreen platform unless QT_QPA_PLATFORM is set.
+
+Usage:
+    python benchmarks/bench_gui_frame.py
+    python benchmarks/bench_gui_frame.py --width 1280 --height 720 --view 960x540 --frames 300
+"""
+import argparse
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import QApplication, QLabel
+from src.gui.display_frame import render_display
+from src.gui.video_view import VideoView
+
+def label_frame(label, frame):
+    """The GUI thread work of the old update_frame()"""
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    h, w, ch = rgb_frame.shape
+    qt_image = QImage(rgb_frame.data, w, h, ch * w, QImage.Format_RGB888)
+    label.setPixmap(QPixmap.fromImage(qt_image).scaled(label.size(), Qt.KeepAspectRatio))
+    label.repaint()
+
+def view_frame(view, image):
+    """The GUI thread work of the current update_frame() and paintEvent()"""
+    view.set_frame(image)
+    view.repaint()
+
+def measure(frames, rounds, show):
+    show(frames[0])  # warm-up
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    for i in range(rounds):
+        show(frames[i % len(frames)])
+    cpu_ms = (time.thread_time() - cpu_start) * 1000 / rounds
+    wall_ms = (time.perf_counter() - wall_start) * 1000 / rounds
+    return cpu_ms, wall_ms
+
+def main():
+    parser = argparse.ArgumentParser(description='GUI thread cost per displayed frame')
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--view', default='800x600', help='Video widget size (default: 800x600)')
+    parser.add_argument('--frames', type=int, default=200, help='Frames per run (default: 200)')
+    args = parser.parse_args()
+    view_width, view_height = (int(n) for n in args.view.lower().split('x'))
+
+    app = QApplication(sys.argv)
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8) for _ in range(4)]
+
+    label = QLabel()
+    label.resize(view_width, view_height)
+    label.show()
+    view = VideoView()
+    view.resize(view_width, view_height)
+    view.show()
+    app.processEvents()
+
+    # Capture thread side of the new path, prepared up front so it is not counted as GUI work
+    images = [render_display(frame, None, view.device_size()).copy() for frame in frames]
+    render_start = time.perf_counter()
+    for i in range(args.frames):
+        render_display(frames[i % len(frames)], None, view.device_size(), tag=f'view_rgb{i % 2}')
+    render_ms = (time.perf_counter() - render_start) * 1000 / args.frames
+
+    print(f"{args.width}x{args.height} camera, {view_width}x{view_height} view, {args.frames} frames")
+    print(f"{'':<8} {'GUI CPU ms/frame':>17} {'wall ms/frame':>14}")
+    for name, items, show in (("label", frames, lambda frame: label_frame(label, frame)),
+                              ("view", images, lambda image: view_frame(view, image))):
+        cpu_ms, wall_ms = measure(items, args.frames, show)
+        print(f"{name:<8} {cpu_ms:17.2f} {wall_ms:14.2f}")
+    print(f"render_display() on the capture thread: {render_ms:.2f} ms/frame")
+    app.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compare the DeepFace/TensorFlow and ONNX Runtime embedding engines
+
+Measures per-face latency, batched throughput and the cosine drift of the
+ONNX fp32 and int8 embeddings against the TensorFlow ones.
+
+Usage:
+    python benchmarks/bench_onnx_engine.py --model VGG-Face --threads 4
+    python benchmarks/bench_onnx_engine.py --faces path/to/aligned_crops --json results.json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.recognition.backends import DeepFaceBackend, get_backend
+from src.recognition.onnx_engine import create_onnx_backend
+
+def load_faces(faces_dir, count):
+    """Load aligned face crops as RGB, or generate random ones"""
+    if faces_dir:
+        paths = sorted(glob.glob(os.path.join(faces_dir, '*.jpg')) + glob.glob(os.path.join(faces_dir, '*.png')))
+        faces = [cv2.cvtColor(cv2.imread(path), cv2.COLOR_BGR2RGB) for path in paths[:count]]
+        if faces:
+            return faces
+        print(f"No images found in {faces_dir}, using random crops")
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (150, 150, 3), dtype=np.uint8) for _ in range(count)]
+
+def time_per_face(represent, faces):
+    """Return the embeddings and per-face latencies in milliseconds"""
+    embeddings = []
+    latencies = []
+    for face in faces:
+        start = time.perf_counter()
+        embeddings.append(np.asarray(represent(face), dtype=np.float32).ravel())
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(embeddings), np.array(latencies)
+
+def cosine_drift(reference, embeddings):
+    """Cosine similarity of each embedding with its reference"""
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return np.sum(reference * embeddings, axis=1)
+
+def summarize(name, latencies, throughput, cosines=None):
+    result = {
+        'engine': name,
+        'latency_ms_mean': float(latencies.mean()),
+        'latency_ms_p50': float(np.percentile(latencies, 50)),
+        'latency_ms_p95': float(np.percentile(latencies, 95)),
+        'throughput_faces_per_s': float(throughput),
+    }
+    if cosines is not None:
+        result['cosine_mean'] = float(cosines.mean())
+        result['cosine_min'] = float(cosines.min())
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark TensorFlow vs ONNX Runtime embeddings')
+    parser.add_argument('--model', default='VGG-Face', help='DeepFace model (default: VGG-Face)')
+    parser.add_argument('--threads', type=int, default=None, help='ONNX Runtime intra-op threads')
+    parser.add_argument('--faces', help='Directory of aligned face crops (default: random crops)')
+    parser.add_argument('--count', type=int, default=50, help='Number of faces (default: 50)')
+    parser.add_argument('--batch', type=int, default=16, help='Batch size for the throughput run')
+    parser.add_argument('--json', help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    faces = load_faces(args.faces, args.count)
+
+    # Same preprocessing for both engines: no re-detection inside the crop
+    tensorflow_backend = get_backend(args.model)
+    if not isinstance(tensorflow_backend, DeepFaceBackend):
+        parser.error(f"'{args.model}' is not a DeepFace model")
+    tensorflow_backend.detector_backend = "skip"
+    tensorflow_backend.warm_up()
+    reference, latencies = time_per_face(tensorflow_backend.represent, faces)
+    results = [summarize('tensorflow', latencies, 1000 / latencies.mean())]
+
+    for quantize in (False, True):
+        backend = create_onnx_backend(args.model, intra_op_threads=args.threads, quantize=quantize)
+        backend.warm_up()
+        embeddings, latencies = time_per_face(backend.represent, faces)
+
+        start = time.perf_counter()
+        for i in range(0, len(faces), args.batch):
+            backend.represent_batch(faces[i:i + args.batch])
+        throughput = len(faces) / (time.perf_counter() - start)
+
+        name = 'onnx-int8' if quantize else 'onnx-fp32'
+        results.append(summarize(name, latencies, throughput, cosine_drift(reference, embeddings)))
+
+    print(f"{'engine':<12} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'faces/s':>9} {'cos mean':>9} {'cos min':>9}")
+    for r in results:
+        print(f"{r['engine']:<12} {r['latency_ms_mean']:9.2f} {r['latency_ms_p50']:9.2f} "
+              f"{r['latency_ms_p95']:9.2f} {r['throughput_faces_per_s']:9.1f} "
+              f"{r.get('cosine_mean', 1.0):9.4f} {r.get('cosine_min', 1.0):9.4f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'model': args.model, 'threads': args.threads, 'results': results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Measure how recognition throughput scales with worker processes
+
+Submits the same frames to RecognitionWorkerPool with an increasing number
+of workers (one stream per frame, so frames spread over all workers) and
+reports frames per second and the speed-up over one worker.
+
+Usage:
+    python benchmarks/bench_process_pool.py --workers 1 2 4 8 16
+    python benchmarks/bench_process_pool.py --video recordings/door.mp4 --frames 200 --json scaling.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.server.process_pool import RecognitionWorkerPool
+
+def load_frames(video, count, width, height):
+    """Read frames from a video, or generate random ones"""
+    frames = []
+    if video:
+        capture = cv2.VideoCapture(video)
+        while len(frames) < count:
+            ret, frame = capture.read()
+            if not ret:
+                break
+            frames.append(frame)
+        capture.release()
+        if frames:
+            return frames
+        print(f"Could not read frames from {video}, using random frames")
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+def measure(frames, num_workers, component_options):
+    pool = RecognitionWorkerPool(num_workers, frames[0].shape, component_options=component_options)
+    pool.start()
+    try:
+        # One untimed round so every worker has created its recognizers
+        for future in [pool.submit(frame, stream_id=i) for i, frame in enumerate(frames[:num_workers])]:
+            future.result()
+        start = time.perf_counter()
+        futures = [pool.submit(frame, stream_id=i) for i, frame in enumerate(frames)]
+        for future in futures:
+            future.result()
+        return len(frames) / (time.perf_counter() - start)
+    finally:
+        pool.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Process pool scaling benchmark')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--video', default=None, help='Video to take frames from (default: random frames)')
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--model', default='VGG-Face')
+    parser.add_argument('--engine', default='tensorflow', choices=['tensorflow', 'onnx'])
+    parser.add_argument('--json', default=None, help='Write the results to this file')
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, args.width, args.height)
+    component_options = {'model_name': args.model, 'engine': args.engine, 'onnx_threads': 1}
+    results = []
+    for num_workers in args.workers:
+        fps = measure(frames, num_workers, component_options)
+        speedup = fps / results[0]['frames_per_s'] if results else 1.0
+        results.append({'workers': num_workers, 'frames_per_s': fps, 'speedup': speedup})
+        print(f"{num_workers:3d} workers: {fps:8.1f} frames/s  (x{speedup:.2f})")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Measure sharded gallery search on a large synthetic gallery
+
+Fills a face database with random unit embeddings (reused on later runs
+when --db points at an existing gallery of the right size), then for each
+shard count starts a ShardedFaceDatabase and reports its load time, the
+gallery memory per shard, single-query latency (p50/p95) and batch
+throughput. With --baseline the single-process FaceDatabase.search_face is
+timed on one query for comparison.
+
+Shards only run in parallel on as many cores as the machine has; on fewer
+cores than shards the numbers show the merge and IPC overhead instead.
+
+Usage:
+    python benchmarks/bench_sharded_search.py
+    python benchmarks/bench_sharded_search.py --rows 1000000 --shards 1 2 4 8 --batch 64 --json sharded.json
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_gallery
+from src.data.face_database import FaceDatabase
+from src.data.sharded_search import ShardedFaceDatabase
+
+def gallery_rows(db_path):
+    if not os.path.exists(db_path):
+        return 0
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM faces').fetchone()[0]
+    except sqlite3.Error:
+        return 0
+    finally:
+        conn.close()
+
+def measure(num_shards, db_path, queries, batch, rounds):
+    started = time.perf_counter()
+    database = ShardedFaceDatabase(db_path, num_shards=num_shards).start()
+    load_s = time.perf_counter() - started
+    try:
+        sizes = database.size()
+        dim = queries.shape[1]
+
+        database.search_face(queries[0], 0.6)  # warm-up
+        latencies = []
+        for query in queries[:rounds]:
+            started = time.perf_counter()
+            database.search_face(query, 0.6)
+            latencies.append(time.perf_counter() - started)
+
+        batches = [queries[i:i + batch] for i in range(0, len(queries) - batch + 1, batch)] or [queries]
+        started = time.perf_counter()
+        searched = 0
+        for queries_batch in batches:
+            database.search_batch(queries_batch, k=5, threshold=0.6)
+            searched += len(queries_batch)
+        throughput = searched / (time.perf_counter() - started)
+    finally:
+        database.stop()
+    return {
+        'shards': num_shards,
+        'load_s': load_s,
+        'mb_per_shard': max(sizes) * dim * 4 / 1e6,
+        'latency_ms_p50': float(np.percentile(latencies, 50)) * 1000,
+        'latency_ms_p95': float(np.percentile(latencies, 95)) * 1000,
+        'queries_per_s': throughput,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Sharded gallery search benchmark')
+    parser.add_argument('--rows', type=int, default=1000000, help='Gallery size (default: 1M)')
+    parser.add_argument('--dim', type=int, default=128, help='Embedding dimension (default: 128)')
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--batch', type=int, default=64, help='Queries per batch for throughput')
+    parser.add_argument('--queries', type=int, default=512, help='Queries in total (default: 512)')
+    parser.add_argument('--rounds', type=int, default=50, help='Single queries timed for latency')
+    parser.add_argument('--db', default=None,
+                        help='Gallery database to use or create (default: a temporary file)')
+    parser.add_argument('--baseline', action='store_true',
+                        help='Also time FaceDatabase.search_face (slow on large galleries)')
+    parser.add_argument('--json', default=None, help='Write the results to this file')
+    args = parser.parse_args()
+
+    temp_dir = None
+    db_path = args.db
+    if db_path is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(temp_dir.name, 'gallery.db')
+    if gallery_rows(db_path) != args.rows:
+        print(f"Building a gallery of {args.rows} faces in {db_path}...")
+        started = time.perf_counter()
+        make_gallery(db_path, args.rows, args.dim)
+        print(f"  done in {time.perf_counter() - started:.1f} s")
+
+    rng = np.random.default_rng(1)
+    queries = rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+
+    print(f"{args.rows} faces, {args.dim}-d, {os.cpu_count()} CPUs")
+    print(f"{'shards':>6} {'load s':>8} {'MB/shard':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'queries/s @' + str(args.batch):>15}")
+    results = []
+    for num_shards in args.shards:
+        result = measure(num_shards, db_path, queries, args.batch, args.rounds)
+        results.append(result)
+        print(f"{result['shards']:>6} {result['load_s']:8.1f} {result['mb_per_shard']:9.0f} "
+              f"{result['latency_ms_p50']:8.1f} {result['latency_ms_p95']:8.1f} "
+              f"{result['queries_per_s']:15.0f}")
+
+    baseline = None
+    if args.baseline:
+        database = FaceDatabase(db_path)
+        started = time.perf_counter()
+        database.search_face(queries[0], 0.6)
+        baseline = {'latency_ms': (time.perf_counter() - started) * 1000}
+        print(f"FaceDatabase.search_face: {baseline['latency_ms']:.0f} ms per query")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'rows': args.rows, 'dim': args.dim, 'cpus': os.cpu_count(),
+                       'batch': args.batch, 'sharded': results, 'baseline': baseline}, f, indent=2)
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+if __name__ == "__main__":
+    main()
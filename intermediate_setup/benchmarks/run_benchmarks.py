@@ -0,0 +1,324 @@
+"""
+Performance benchmark suite for the recognition pipeline
+
+Measures every component (detector, aligner, feature extractor, database
+search at several gallery sizes, enrollment) and the end-to-end frame
+pipeline at several resolutions and face counts, on synthetic or recorded
+frames. Results are written as JSON and can be compared against a stored
+baseline; the run fails when a benchmark got slower than the tolerance.
+
+Usage:
+    python benchmarks/run_benchmarks.py --json results.json
+    python benchmarks/run_benchmarks.py --suite search enrollment --quick
+    python benchmarks/run_benchmarks.py --face-image me.jpg --baseline baseline.json --tolerance 0.15
+    python benchmarks/run_benchmarks.py --video recordings/door.mp4 --suite pipeline
+
+Benchmarks whose dependencies (dlib, DeepFace) are missing are reported as
+skipped instead of failing the run.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_frame, make_gallery, load_video_frames
+
+SUITES = ['detector', 'aligner', 'extractor', 'search', 'enrollment', 'pipeline']
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+FACE_COUNTS = [1, 4, 8]
+SEARCH_SIZES = [1000, 10000, 100000]
+
+def measure(function, repeat, warmup=1):
+    """
+    Call `function` repeatedly and summarize its latency
+
+    Returns:
+        dict with mean/p50/p95/min in milliseconds and calls per second
+    """
+    for _ in range(warmup):
+        function()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies = np.array(latencies)
+    return {
+        'mean_ms': float(latencies.mean()),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'min_ms': float(latencies.min()),
+        'per_s': float(1000 / latencies.mean()) if latencies.mean() > 0 else 0.0,
+        'repeat': repeat
+    }
+
+class BenchmarkContext:
+    """Inputs and lazily loaded components shared by the benchmarks"""
+
+    def __init__(self, args, work_dir):
+        self.args = args
+        self.work_dir = work_dir
+        self.face_image = cv2.imread(args.face_image) if args.face_image else None
+        if args.face_image and self.face_image is None:
+            raise IOError(f"Could not read {args.face_image}")
+        self._components = {}
+
+    def frames(self, width, height, num_faces):
+        """Frames for one configuration: recorded footage if given, else synthetic"""
+        if self.args.video:
+            frames = load_video_frames(self.args.video, 10, width, height)
+            if frames:
+                return frames
+        return [make_frame(width, height, num_faces, seed, self.face_image)[0] for seed in range(3)]
+
+    def component(self, name):
+        if name not in self._components:
+            if name == 'detector':
+                from src.detection.face_detector import FaceDetector
+                self._components[name] = FaceDetector()
+            elif name == 'aligner':
+                from src.alignment.face_aligner import FaceAligner
+                self._components[name] = FaceAligner()
+            elif name == 'extractor':
+                from src.recognition.feature_extractor import FeatureExtractor
+                extractor = FeatureExtractor(self.args.model, engine=self.args.engine)
+                extractor.warm_up()
+                self._components[name] = extractor
+        return self._components[name]
+
+def rectangle(box):
+    from src.utils.lazy_import import LazyModule
+    dlib = LazyModule('dlib')
+    x, y, w, h = box
+    return dlib.rectangle(x, y, x + w, y + h)
+
+def bench_detector(context, results):
+    detector = context.component('detector')
+    for width, height in RESOLUTIONS:
+        frames = context.frames(width, height, 1)
+        index = [0]
+        def detect():
+            detector.detect_faces(frames[index[0] % len(frames)])
+            index[0] += 1
+        results[f"detector/{height}p"] = measure(detect, context.args.repeat)
+
+def bench_aligner(context, results):
+    aligner = context.component('aligner')
+    frame, boxes = make_frame(640, 480, 1, 0, context.face_image)
+    face = rectangle(boxes[0])
+    results["aligner/landmarks"] = measure(lambda: aligner.get_landmarks(frame, face), context.args.repeat)
+    landmarks = aligner.get_landmarks(frame, face)
+    results["aligner/align"] = measure(lambda: aligner.align_face(frame, face, landmarks),
+                                       context.args.repeat)
+
+def bench_extractor(context, results):
+    extractor = context.component('extractor')
+    frame, boxes = make_frame(300, 300, 1, 0, context.face_image)
+    x, y, w, h = boxes[0]
+    crop = cv2.resize(frame[y:y + h, x:x + w], (150, 150))
+    failures = [0]
+    def extract():
+        if extractor.extract_features(crop) is None:
+            failures[0] += 1
+    result = measure(extract, context.args.repeat)
+    result['failures'] = failures[0]
+    results[f"extractor/{extractor.model_name}"] = result
+
+def bench_search(context, results):
+    from src.data.face_database import FaceDatabase
+    sizes = [1000, 10000] if context.args.quick else SEARCH_SIZES
+    for rows in sizes:
+        db_path = os.path.join(context.work_dir, f"gallery_{rows}.db")
+        query = make_gallery(db_path, rows, context.args.search_dim)
+        database = FaceDatabase(db_path)
+        repeat = max(3, context.args.repeat // max(1, rows // 10000))
+        result = measure(lambda: database.search_face(query, 0.6), repeat)
+        result['rows'] = rows
+        result['dim'] = context.args.search_dim
+        results[f"search/{rows}"] = result
+
+def bench_enrollment(context, results):
+    from src.data.face_database import FaceDatabase
+    db_path = os.path.join(context.work_dir, "enrollment.db")
+    make_gallery(db_path, 1000, context.args.search_dim)
+    database = FaceDatabase(db_path)
+    rng = np.random.default_rng(1)
+    counter = [0]
+    def enroll():
+        counter[0] += 1
+        person_id = database.add_person(f"enrolled{counter[0]}")
+        database.add_face(person_id, rng.normal(size=context.args.search_dim), "enrolled.jpg")
+    results["enrollment/database"] = measure(enroll, context.args.repeat)
+
+    # Full enrollment of one captured frame: detect, align, embed, store
+    try:
+        detector = context.component('detector')
+        aligner = context.component('aligner')
+        extractor = context.component('extractor')
+    except ImportError as e:
+        results["enrollment/frame"] = {'skipped': str(e)}
+        return
+    frame, _ = make_frame(640, 480, 1, 0, context.face_image)
+    def enroll_frame():
+        faces = detector.detect_faces(frame)
+        if not faces:
+            return
+        aligned = aligner.align_face(frame, faces[0])
+        features = extractor.extract_features(aligned)
+        if features is not None:
+            database.add_face(database.add_person("frame"), features, "frame.jpg",
+                              model_name=extractor.model_name)
+    results["enrollment/frame"] = measure(enroll_frame, context.args.repeat)
+
+def bench_pipeline(context, results):
+    from src.data.face_database import FaceDatabase
+    from src.pipeline.frame_recognizer import FrameRecognizer
+    from src.quality.face_quality import FaceQualityGate
+
+    detector = context.component('detector')
+    aligner = context.component('aligner')
+    extractor = context.component('extractor')
+    db_path = os.path.join(context.work_dir, "pipeline.db")
+    make_gallery(db_path, 1000, extractor.embedding_dim, model_name=extractor.model_name)
+    database = FaceDatabase(db_path)
+
+    face_counts = [1, 4] if context.args.quick else FACE_COUNTS
+    resolutions = RESOLUTIONS[:2] if context.args.quick else RESOLUTIONS
+    for width, height in resolutions:
+        for num_faces in face_counts:
+            recognizer = FrameRecognizer(detector, aligner, extractor, database,
+                                         quality_gate=FaceQualityGate())
+            frames = context.frames(width, height, num_faces)
+            index = [0]
+            detected = []
+            def recognize():
+                detected.append(len(recognizer.recognize(frames[index[0] % len(frames)])))
+                index[0] += 1
+            result = measure(recognize, context.args.repeat)
+            result['faces_placed'] = 0 if context.args.video else num_faces
+            result['faces_detected'] = float(np.mean(detected))
+            results[f"pipeline/{height}p/{num_faces}faces"] = result
+
+BENCHMARKS = {
+    'detector': bench_detector,
+    'aligner': bench_aligner,
+    'extractor': bench_extractor,
+    'search': bench_search,
+    'enrollment': bench_enrollment,
+    'pipeline': bench_pipeline,
+}
+
+def compare(results, baseline, tolerance, metric='p50_ms', suites=None):
+    """
+    Compare results with a baseline
+
+    Args:
+        suites: suites that were run; baseline entries of other suites are
+            not expected in the results (default: all)
+
+    Returns:
+        (lines, regressions, missing) where regressions lists the benchmark
+        names that are slower than baseline * (1 + tolerance) and missing
+        the baseline benchmarks without a current measurement (not run,
+        skipped or failed)
+    """
+    lines = [f"{'benchmark':<32} {'baseline':>10} {'current':>10} {'change':>8}"]
+    regressions = []
+    missing = []
+    for name, reference in sorted(baseline.items()):
+        if suites is not None and name.split('/')[0] not in suites:
+            continue
+        if metric in (reference or {}) and metric not in results.get(name, {}):
+            missing.append(name)
+            lines.append(f"{name:<32} {reference[metric]:10.2f} {'-':>10} {'':>8}  MISSING")
+    for name, result in sorted(results.items()):
+        reference = baseline.get(name)
+        if not reference or metric not in result or metric not in reference:
+            continue
+        change = result[metric] / reference[metric] - 1 if reference[metric] > 0 else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        lines.append(f"{name:<32} {reference[metric]:10.2f} {result[metric]:10.2f} {change:+7.1%}{flag}")
+    return lines, regressions, missing
+
+def main():
+    parser = argparse.ArgumentParser(description='Recognition pipeline benchmark suite')
+    parser.add_argument('--suite', nargs='+', choices=SUITES, default=SUITES,
+                        help='Benchmarks to run (default: all)')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed calls per benchmark (default: 20)')
+    parser.add_argument('--quick', action='store_true', help='Smaller galleries and fewer configurations')
+    parser.add_argument('--face-image', default=None, help='Face photo pasted into synthetic frames')
+    parser.add_argument('--video', default=None, help='Recorded footage instead of synthetic frames')
+    parser.add_argument('--model', default='VGG-Face', help='Embedding model (default: VGG-Face)')
+    parser.add_argument('--engine', default='tensorflow', choices=['tensorflow', 'onnx'])
+    parser.add_argument('--search-dim', type=int, default=128,
+                        help='Embedding dimension of the synthetic search galleries (default: 128)')
+    parser.add_argument('--json', default=None, help='Write the results to this JSON file')
+    parser.add_argument('--baseline', default=None, help='Baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed slowdown against the baseline (default: 0.2 = 20%%)')
+    parser.add_argument('--metric', default='p50_ms', choices=['mean_ms', 'p50_ms', 'p95_ms', 'min_ms'],
+                        help='Latency statistic compared with the baseline (default: p50_ms)')
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        context = BenchmarkContext(args, work_dir)
+        for suite in args.suite:
+            print(f"Running {suite}...")
+            try:
+                BENCHMARKS[suite](context, results)
+            except ImportError as e:
+                # Optional heavy dependency (dlib, DeepFace) not installed
+                results[suite] = {'skipped': str(e)}
+                print(f"  skipped: {str(e)}")
+
+    print(f"{'benchmark':<32} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'per s':>9}")
+    for name, result in results.items():
+        if 'skipped' in result:
+            print(f"{name:<32} skipped ({result['skipped']})")
+            continue
+        print(f"{name:<32} {result['mean_ms']:9.2f} {result['p50_ms']:9.2f} "
+              f"{result['p95_ms']:9.2f} {result['per_s']:9.1f}")
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'args': vars(args)
+        },
+        'results': results
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        lines, regressions, missing = compare(results, baseline, args.tolerance, args.metric, args.suite)
+        print("\n".join(lines))
+        if missing:
+            print(f"{len(missing)} baseline benchmark(s) have no current result: {', '.join(missing)}")
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}: "
+                  f"{', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
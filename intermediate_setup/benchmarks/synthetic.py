@@ -0,0 +1,127 @@
+"""
+Synthetic and recorded inputs for the benchmarks
+
+Synthetic frames are drawn deterministically from a seed, so two runs on the
+same machine measure the same work. Pass a real face photo (--face-image) or
+recorded footage (--video) when the detector should actually find faces:
+dlib's HOG detector does not reliably fire on drawn faces.
+"""
+import os
+import pickle
+import sqlite3
+import cv2
+import numpy as np
+
+def draw_face(rng, size):
+    """Draw a face-like pattern (skin ellipse, eyes, brows, nose, mouth)"""
+    face = np.full((size, size, 3), rng.integers(40, 90), dtype=np.uint8)
+    center = (size // 2, size // 2)
+    skin = tuple(int(v) for v in rng.integers([90, 120, 170], [130, 160, 220]))
+    cv2.ellipse(face, center, (int(size * 0.36), int(size * 0.46)), 0, 0, 360, skin, -1)
+    eye_y = int(size * 0.42)
+    for eye_x in (int(size * 0.36), int(size * 0.64)):
+        cv2.ellipse(face, (eye_x, eye_y), (size // 12, size // 22), 0, 0, 360, (255, 255, 255), -1)
+        cv2.circle(face, (eye_x, eye_y), size // 28, (40, 30, 20), -1)
+        cv2.line(face, (eye_x - size // 10, eye_y - size // 10), (eye_x + size // 10, eye_y - size // 10),
+                 (30, 30, 40), max(1, size // 40))
+    cv2.line(face, (size // 2, int(size * 0.45)), (size // 2 - size // 20, int(size * 0.62)),
+             (70, 90, 140), max(1, size // 50))
+    cv2.ellipse(face, (size // 2, int(size * 0.74)), (size // 7, size // 22), 0, 0, 180,
+                (60, 60, 150), max(1, size // 30))
+    noise = rng.normal(0, 6, face.shape)
+    return np.clip(face + noise, 0, 255).astype(np.uint8)
+
+def make_frame(width, height, num_faces, seed=0, face_image=None):
+    """
+    Frame with `num_faces` faces laid out on a grid
+
+    Args:
+        width, height: frame size
+        num_faces: number of faces to place
+        seed: random seed for background and drawn faces
+        face_image: optional BGR face photo to paste instead of drawn faces
+
+    Returns:
+        (frame, boxes) with boxes as (x, y, w, h)
+    """
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 60, (height, width, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (7, 7), 0)
+    boxes = []
+    if num_faces == 0:
+        return frame, boxes
+
+    columns = int(np.ceil(np.sqrt(num_faces)))
+    rows = int(np.ceil(num_faces / columns))
+    cell_w, cell_h = width // columns, height // rows
+    size = int(min(cell_w, cell_h) * 0.7)
+    for index in range(num_faces):
+        row, column = divmod(index, columns)
+        x = column * cell_w + (cell_w - size) // 2
+        y = row * cell_h + (cell_h - size) // 2
+        if face_image is not None:
+            face = cv2.resize(face_image, (size, size))
+        else:
+            face = draw_face(rng, size)
+        frame[y:y + size, x:x + size] = face
+        boxes.append((x, y, size, size))
+    return frame, boxes
+
+def load_video_frames(path, count, width=None, height=None):
+    """Read up to `count` frames of a recording, optionally resized"""
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < count:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        if width and height:
+            frame = cv2.resize(frame, (width, height))
+        frames.append(frame)
+    capture.release()
+    return frames
+
+def make_gallery(db_path, rows, dim, model_name="VGG-Face", faces_per_person=5, seed=0):
+    """
+    Fill a face database with random unit embeddings
+
+    Rows are bulk-inserted in the FaceDatabase schema (the database is
+    created through FaceDatabase first, so the schema always matches).
+
+    Args:
+        db_path: database file, replaced if it exists
+        rows: number of face rows
+        dim: embedding dimension
+        model_name: model recorded for the rows
+        faces_per_person: faces enrolled per synthetic person
+
+    Returns:
+        one stored embedding, usable as a query that matches
+    """
+    from src.data.face_database import FaceDatabase
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    FaceDatabase(db_path)
+
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(db_path)
+    persons = max(1, rows // faces_per_person)
+    conn.executemany('INSERT INTO persons (id, name) VALUES (?, ?)',
+                     ((i + 1, f"person{i + 1}") for i in range(persons)))
+    sample = None
+    batch = 10000
+    for start in range(0, rows, batch):
+        count = min(batch, rows - start)
+        embeddings = rng.normal(size=(count, dim))
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        if sample is None:
+            sample = embeddings[0].copy()
+        conn.executemany(
+            'INSERT INTO faces (person_id, features, image_path, model_name, embedding_dim) '
+            'VALUES (?, ?, ?, ?, ?)',
+            ((1 + (start + i) % persons, pickle.dumps(embeddings[i]), f"synthetic/{start + i}.jpg",
+              model_name, dim) for i in range(count)))
+    conn.commit()
+    conn.close()
+    return sample
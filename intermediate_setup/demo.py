@@ -1,47 +1,120 @@
+import argparse
+import threading
 import cv2
 import numpy as np
-from src.detection.face_detector import FaceDetector
-from src.alignment.face_aligner import FaceAligner
-from src.recognition.feature_extractor import FeatureExtractor
-from src.data.face_database import FaceDatabase
+from src.recognition.backends import available_backends
+from src.capture.frame_source import open_capture, FrameRecorder, RecordingCapture
+from src.pipeline.components import RecognitionComponents
+from src.pipeline.frame_skip_controller import AdaptiveFrameSkipController
+from src.pipeline.threaded_pipeline import ThreadedPipeline
 from src.utils.model_downloader import ModelDownloader
 from src.utils.opencv_setup import OpenCVSetup
+from src.utils.buffer_pool import buffer_pool
+from src.utils.metrics import start_reporting
+from src.utils.profiling import create_profiler
+from src.utils.startup_timer import StartupTimer
 
 class FaceRecognitionDemo:
-    def __init__(self):
+    def __init__(self, model_name="VGG-Face", warm_up=True, engine="tensorflow",
+                 onnx_threads=None, quantize=False, quality_gate=True, tracking=True,
+                 refresh_interval=30, target_latency_ms=None, target_cpu=0.6, max_skip=15,
+                 source=0, replay_speed=1.0, record_path=None):
+        """
+        Set up models, database and camera
+
+        Args:
+            model_name: embedding backend, see backends.available_backends()
+            warm_up: run one dummy inference so the first frame is not slow
+            engine: "tensorflow" or "onnx" inference for the embedding model
+            onnx_threads: intra-op threads for the ONNX engine
+            quantize: use the int8-quantized ONNX model
+            quality_gate: skip tiny, blurry, dark or turned faces before embedding
+            tracking: reuse the identity of tracked faces instead of re-embedding them
+            refresh_interval: processed frames after which a tracked face is re-embedded
+            target_latency_ms: adapt the frame skip to this recognition latency
+            target_cpu: otherwise adapt it to this recognition thread duty cycle
+            max_skip: never process less than every max_skip-th frame
+            source: camera index, video file/recording or stream URL
+            replay_speed: pace video files at this multiple of their recorded
+                timing (0 = as fast as possible)
+            record_path: also record the frames read from the source (video
+                plus timing index) for later replay
+        """
+        self.startup_timer = StartupTimer()
+
         # Set up OpenCV files
-        opencv_setup = OpenCVSetup()
-        if not opencv_setup.setup_opencv_files():
-            raise Exception("Failed to set up OpenCV files")
+        with self.startup_timer.stage('opencv_setup'):
+            opencv_setup = OpenCVSetup()
+            if not opencv_setup.setup_opencv_files():
+                raise Exception("Failed to set up OpenCV files")
             
         # Download model if needed
-        downloader = ModelDownloader()
-        if not downloader.download_model():
-            raise Exception("Failed to download required model")
+        with self.startup_timer.stage('model_download'):
+            downloader = ModelDownloader()
+            if not downloader.download_model():
+                raise Exception("Failed to download required model")
             
-        # Initialize components
-        self.face_detector = FaceDetector()
-        self.face_aligner = FaceAligner()  # Will use default path
-        self.feature_extractor = FeatureExtractor()
-        self.face_database = FaceDatabase()
+        # Load the models once, in the background: the camera preview starts
+        # right away and recognition begins when they are ready
+        self.components = RecognitionComponents(model_name, engine=engine,
+                                                onnx_threads=onnx_threads, quantize=quantize,
+                                                warm_up=warm_up, startup_timer=self.startup_timer,
+                                                background=True)
+        self.face_detector = None
+        self.face_aligner = None
+        self.feature_extractor = None
+        self.face_database = None
+        self.recognizer = None
+        self.quality_gate = None
+        self.recognizer_options = {'quality_gate': quality_gate, 'tracking': tracking,
+                                   'refresh_interval': refresh_interval}
+        # models_ready() runs on the recognition thread and on this one (add_face)
+        self.recognizer_lock = threading.Lock()
         
         # Initialize camera
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
-            raise Exception("Could not open camera")
-            
-        # Set camera properties for better performance
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)  # Reduced resolution
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.cap.set(cv2.CAP_PROP_FPS, 30)
+        with self.startup_timer.stage('camera'):
+            # Reduced camera resolution for better performance
+            self.cap = open_capture(source, width=640, height=480, fps=30,
+                                    replay_speed=replay_speed)
+            if record_path:
+                self.cap = RecordingCapture(self.cap, FrameRecorder(record_path, fps=30))
         
         # Performance optimization variables
-        self.frame_count = 0
-        self.process_every_n_frames = 3  # Process every 3rd frame
+        # Process as many frames as the latency/CPU target allows (starts at every 3rd)
+        self.frame_skip = AdaptiveFrameSkipController(target_latency_ms=target_latency_ms,
+                                                      target_cpu=target_cpu,
+                                                      max_interval=max_skip)
         self.last_detection = None  # Store last detection results
+        self.pipeline = None
+        
+    def models_ready(self):
+        """
+        Finish setting up once the components have loaded (never blocks)
+
+        Returns:
+            True if the recognizer is available
+        """
+        with self.recognizer_lock:
+            if self.recognizer is not None:
+                return True
+            if not self.components.ready():
+                return False
+            self.face_detector = self.components.face_detector
+            self.face_aligner = self.components.face_aligner
+            self.feature_extractor = self.components.feature_extractor
+            self.face_database = self.components.face_database
+            
+            # Track faces between frames so a known person is not re-embedded every frame
+            recognizer = self.components.create_recognizer(**self.recognizer_options)
+            self.quality_gate = recognizer.quality_gate
+            self.recognizer = recognizer
+            return True
         
     def add_face(self, name):
         """Add a new face to the database"""
+        if not self.models_ready():
+            print(f"Models are still loading ({self.components.status_text()}). Please try again.")
+            return True
         print(f"Adding face for {name}. Press 'c' to capture when ready...")
         while True:
             ret, frame = self.cap.read()
@@ -73,9 +146,17 @@ class FaceRecognitionDemo:
                     
                 # Get the first face
                 face = faces[0]
+                landmarks = self.face_aligner.get_landmarks(frame, face)
+                
+                # Only enrol crops that would also pass during recognition
+                if self.quality_gate is not None:
+                    quality = self.quality_gate.assess(frame, [face], [landmarks])[0]
+                    if not quality['passed']:
+                        print(f"Face quality too low ({', '.join(quality['reasons'])}). Please try again.")
+                        continue
                 
                 # Align face
-                aligned_face = self.face_aligner.align_face(frame, face)
+                aligned_face = self.face_aligner.align_face(frame, face, landmarks)
                 if aligned_face is None:
                     print("Failed to align face. Please try again.")
                     continue
@@ -88,8 +169,13 @@ class FaceRecognitionDemo:
                     
                 # Add to database
                 person_id = self.face_database.add_person(name)
-                self.face_database.add_face(person_id, features, None)
+                self.face_database.add_face(person_id, features, None,
+                                            model_name=self.feature_extractor.model_name)
                 print(f"Successfully added face for {name}")
+                
+                # Identities cached before this enrolment may now be wrong
+                if self.recognizer.cache is not None:
+                    self.recognizer.cache.clear()
                 break
                 
             elif key == ord('q'):
@@ -110,7 +196,7 @@ class FaceRecognitionDemo:
             cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
             
             # Prepare text
-            text = f"{name} ({similarity:.2f})"
+            text = name if similarity is None else f"{name} ({similarity:.2f})"
             
             # Get text size
             (text_width, text_height), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
@@ -127,89 +213,187 @@ class FaceRecognitionDemo:
         
         return frame
         
-    def process_frame(self, frame):
-        """Process a single frame for face detection and recognition"""
-        # Detect faces
-        faces = self.face_detector.detect_faces(frame)
-        detection_results = []
+    def recognize_frame(self, frame):
+        """
+        Recognize the faces in a frame
         
-        # Process each face
-        for face in faces:
-            # Get face rectangle
-            x = face.left()
-            y = face.top()
-            w = face.right() - x
-            h = face.bottom() - y
-            
-            # Align face
-            aligned_face = self.face_aligner.align_face(frame, face)
-            
-            # Extract features
-            features = self.feature_extractor.extract_features(aligned_face)
-            if features is None:
-                continue
-                
-            # Search database
-            match = self.face_database.search_face(features)
+        Returns:
+            list of (x, y, w, h, name, similarity, color) tuples for draw_detection,
+            or None while the models are loading
+        """
+        if not self.models_ready():
+            return None
+        detection_results = []
+        for result in self.recognizer.recognize(frame):
+            x, y, w, h = result['box']
             
             # Prepare detection info
-            if match:
-                person_id, name, similarity = match
+            if result['person_id'] is not None:
                 color = (0, 255, 0)  # Green for recognized face
+            elif result['similarity'] is None:
+                color = (128, 128, 128)  # Gray for faces skipped by the quality gate
             else:
-                name = "Unknown"
-                similarity = 0.0
                 color = (0, 0, 255)  # Red for unknown face
                 
-            detection_results.append((x, y, w, h, name, similarity, color))
+            detection_results.append((x, y, w, h, result['name'], result['similarity'], color))
+        
+        if self.startup_timer.mark('first_recognition'):
+            print(self.startup_timer.report())
+        return detection_results
         
+    def process_frame(self, frame):
+        """Process a single frame for face detection and recognition"""
         # Update last detection
-        self.last_detection = detection_results
+        self.last_detection = self.recognize_frame(frame)
         return frame
         
-    def run(self):
-        """Run the face recognition demo"""
+    def draw_status(self, frame, text):
+        """Draw a status line in the top-left corner"""
+        cv2.putText(frame, text, (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 3)
+        cv2.putText(frame, text, (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+        return frame
+        
+    def run(self, profiler=None):
+        """
+        Run the face recognition demo
+
+        Args:
+            profiler: optional Profiler; 'p' (or SIGUSR1) starts a new capture
+        """
         print("Face Recognition Demo")
         print("Commands:")
         print("  'a' - Add a new face")
+        if profiler is not None:
+            print("  'p' - Capture a CPU profile and memory report")
         print("  'q' - Quit")
         
-        while True:
-            ret, frame = self.cap.read()
-            if not ret:
-                continue
+        # Capture and recognition run on their own threads; this thread renders
+        process_fn = self.recognize_frame
+        if profiler is not None:
+            process_fn = profiler.profiled(process_fn)
+        self.pipeline = ThreadedPipeline(self.cap, process_fn, frame_skip=self.frame_skip)
+        self.pipeline.start()
+        if profiler is not None:
+            profiler.open_window()
+        
+        try:
+            while True:
+                if profiler is not None:
+                    profiler.tick()
+                if self.components.error is not None:
+                    raise self.components.error
+                item = self.pipeline.next_frame(timeout=1.0)
+                if item is None:
+                    if cv2.waitKey(1) & 0xFF == ord('q'):
+                        break
+                    continue
+                frame_id, captured_at, frame, detection = item
+                self.last_detection = detection
                 
-            # Process every nth frame for better performance
-            self.frame_count += 1
-            if self.frame_count % self.process_every_n_frames == 0:
-                self.process_frame(frame)
-            
-            # Always draw the last detection results
-            frame = self.draw_detection(frame, self.last_detection)
-            
-            # Show frame
-            cv2.imshow('Face Recognition', frame)
-            
-            # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('a'):
-                name = input("Enter person's name: ")
-                if not self.add_face(name):
-                    break
-            elif key == ord('q'):
-                break
+                # The recognition thread may still be reading this frame: draw on a
+                # copy (a reused buffer; imshow copies it into the window)
+                frame = self.draw_detection(buffer_pool.copy(frame, tag='display'), detection)
+                if self.recognizer is None:
+                    frame = self.draw_status(frame, self.components.status_text())
+                else:
+                    frame = self.draw_status(frame, self.pipeline.status_text())
+                
+                # Show frame
+                cv2.imshow('Face Recognition', frame)
+                self.pipeline.frame_displayed(captured_at)
+                if self.startup_timer.mark('first_frame'):
+                    print(f"First frame after {self.startup_timer.milestones['first_frame']:.2f} s "
+                          f"({self.components.status_text()})")
                 
-        # Cleanup
-        self.cap.release()
-        cv2.destroyAllWindows()
+                # Handle key presses
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('a'):
+                    # Enrolment reads the camera itself, once the capture thread has let go of it
+                    if not self.pipeline.stop():
+                        print("The camera is not responding, cannot add a face now")
+                        break
+                    name = input("Enter person's name: ")
+                    if not self.add_face(name):
+                        break
+                    self.pipeline.start()
+                elif key == ord('p') and profiler is not None:
+                    profiler.request_capture()
+                elif key == ord('q'):
+                    break
+        finally:
+            # Cleanup
+            if self.pipeline.stop():
+                self.cap.release()
+            else:
+                print("Warning: the capture thread did not exit, leaving the camera to process exit")
+            cv2.destroyAllWindows()
+            
+        print(self.pipeline.report())
+        report = self.recognizer.report() if self.recognizer is not None else None
+        if report:
+            print(report)
 
 def main():
+    parser = argparse.ArgumentParser(description='Real-time face recognition demo')
+    parser.add_argument('--model', default='VGG-Face', choices=available_backends(),
+                        help='Embedding model (default: VGG-Face)')
+    parser.add_argument('--engine', default='tensorflow', choices=['tensorflow', 'onnx'],
+                        help='Inference engine for the embedding model (default: tensorflow)')
+    parser.add_argument('--onnx-threads', type=int, default=None,
+                        help='Intra-op threads for the ONNX engine (default: all cores)')
+    parser.add_argument('--int8', action='store_true',
+                        help='Use the int8-quantized model with the ONNX engine')
+    parser.add_argument('--no-quality-gate', action='store_true',
+                        help='Embed every detected face, even tiny, blurry or dark ones')
+    parser.add_argument('--no-tracking', action='store_true',
+                        help='Re-embed every face on every processed frame')
+    parser.add_argument('--refresh-interval', type=int, default=30,
+                        help='Processed frames before a tracked face is re-embedded (default: 30)')
+    parser.add_argument('--target-latency', type=float, default=None,
+                        help='Adapt the frame skip to this recognition latency in ms')
+    parser.add_argument('--target-cpu', type=float, default=0.6,
+                        help='Otherwise adapt it to this recognition thread duty cycle (default: 0.6)')
+    parser.add_argument('--max-skip', type=int, default=15,
+                        help='Process at least every N-th frame (default: 15)')
+    parser.add_argument('--source', default='0',
+                        help='Camera index, video file/recording or stream URL (default: 0)')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='Speed for video files: 1 = recorded timing, 0 = as fast as possible')
+    parser.add_argument('--record', default=None,
+                        help='Record the input to this .avi file (plus a timing index) for replay')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Log per-stage latency histograms and counters (also: FACE_METRICS=1)')
+    parser.add_argument('--metrics-file', default=None,
+                        help='Also write them to this Prometheus text file (e.g. for node exporter)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile with cProfile and tracemalloc; press p for a new capture '
+                             '(also: FACE_PROFILE=1)')
+    parser.add_argument('--profile-dir', default=None,
+                        help='Directory for the profile dumps (default: $FACE_PROFILE_DIR or ./profiles)')
+    args = parser.parse_args()
+    
+    reporter = start_reporting(args.metrics, args.metrics_file)
+    profiler = create_profiler(args.profile, args.profile_dir)
     try:
-        demo = FaceRecognitionDemo()
-        demo.run()
+        demo = FaceRecognitionDemo(model_name=args.model, engine=args.engine,
+                                   onnx_threads=args.onnx_threads, quantize=args.int8,
+                                   quality_gate=not args.no_quality_gate,
+                                   tracking=not args.no_tracking,
+                                   refresh_interval=args.refresh_interval,
+                                   target_latency_ms=args.target_latency,
+                                   target_cpu=args.target_cpu,
+                                   max_skip=args.max_skip,
+                                   source=args.source, replay_speed=args.replay_speed,
+                                   record_path=args.record)
+        demo.run(profiler)
     except Exception as e:
         print(f"Error: {str(e)}")
         return 1
+    finally:
+        if profiler is not None:
+            profiler.stop()
+        if reporter is not None:
+            reporter.stop()
     return 0
 
 if __name__ == "__main__":
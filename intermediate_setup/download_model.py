@@ -1,8 +1,27 @@
+import argparse
 from src.utils.model_downloader import ModelDownloader
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Install the face landmark model')
+    parser.add_argument('--archive', default=None,
+                        help='Install from a local shape_predictor_68_face_landmarks.dat.bz2 '
+                             'instead of downloading it')
+    parser.add_argument('--sha256', default=None,
+                        help='Expected SHA-256 of the installed (decompressed) model')
+    parser.add_argument('--verify', action='store_true',
+                        help='Re-hash the installed models and compare them with the manifest')
+    args = parser.parse_args()
+
     downloader = ModelDownloader()
-    if downloader.download_model():
+    if args.verify:
+        ok = downloader.verify()
+        print("All models match the manifest" if ok else "Model check failed!")
+        raise SystemExit(0 if ok else 1)
+    if args.archive:
+        ok = downloader.install_from_archive(args.archive, args.sha256)
+    else:
+        ok = downloader.download_model()
+    if ok:
         print("Model setup completed successfully!")
     else:
-        print("Model setup failed!") 
\ No newline at end of file
+        print("Model setup failed!")
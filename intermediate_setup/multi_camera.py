@@ -0,0 +1,113 @@
+import argparse
+import json
+import sys
+from src.recognition.backends import available_backends
+from src.pipeline.components import RecognitionComponents
+from src.server.multi_stream import MultiStreamRunner
+from src.server.process_pool import RecognitionWorkerPool
+from src.utils.model_downloader import ModelDownloader
+from src.utils.opencv_setup import OpenCVSetup
+from src.utils.metrics import start_reporting
+
+def print_result(stream_name, frame_id, captured_at, results):
+    """Write the faces recognized in a frame as one JSON line"""
+    faces = [{
+        'box': [int(v) for v in r['box']],
+        'track_id': r['track_id'],
+        'person_id': r['person_id'],
+        'name': r['name'],
+        'similarity': r['similarity'],
+        'cached': r['cached']
+    } for r in results]
+    print(json.dumps({'stream': stream_name, 'frame': frame_id, 'faces': faces}))
+    sys.stdout.flush()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Headless face recognition on several cameras, video files or RTSP streams')
+    parser.add_argument('sources', nargs='+',
+                        help='Camera indexes, video files or stream URLs (e.g. 0 1 rtsp://host/stream)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Recognition worker threads shared by all streams (default: 4)')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='Run recognition in this many worker processes instead of threads')
+    parser.add_argument('--max-frame-size', default='1920x1080',
+                        help='Largest frame size (WxH) accepted by the worker processes')
+    parser.add_argument('--model', default='VGG-Face', choices=available_backends(),
+                        help='Embedding model (default: VGG-Face)')
+    parser.add_argument('--engine', default='tensorflow', choices=['tensorflow', 'onnx'],
+                        help='Inference engine for the embedding model (default: tensorflow)')
+    parser.add_argument('--onnx-threads', type=int, default=None,
+                        help='Intra-op threads for the ONNX engine (default: all cores)')
+    parser.add_argument('--int8', action='store_true',
+                        help='Use the int8-quantized model with the ONNX engine')
+    parser.add_argument('--db', default='face_database.db', help='Face database path')
+    parser.add_argument('--search-shards', type=int, default=None,
+                        help='Split the gallery search over this many processes (large galleries)')
+    parser.add_argument('--no-tracking', action='store_true',
+                        help='Re-embed every face on every processed frame')
+    parser.add_argument('--stats-interval', type=float, default=5.0,
+                        help='Seconds between per-stream stats lines (default: 5)')
+    parser.add_argument('--duration', type=float, default=None,
+                        help='Stop after this many seconds')
+    parser.add_argument('--print-results', action='store_true',
+                        help='Print recognized faces as JSON lines')
+    parser.add_argument('--fast', action='store_true',
+                        help='Read video files as fast as possible instead of at their frame rate')
+    parser.add_argument('--replay-speed', type=float, default=None,
+                        help='Replay video files with their recorded timing at this speed '
+                             '(0 = as fast as possible)')
+    parser.add_argument('--metrics', action='store_true',
+                        help='Log per-stage latency histograms and counters (also: FACE_METRICS=1)')
+    parser.add_argument('--metrics-file', default=None,
+                        help='Also write them to this Prometheus text file (e.g. for node exporter)')
+    args = parser.parse_args()
+
+    reporter = start_reporting(args.metrics, args.metrics_file)
+    try:
+        if not OpenCVSetup().setup_opencv_files():
+            raise Exception("Failed to set up OpenCV files")
+        if not ModelDownloader().download_model():
+            raise Exception("Failed to download required model")
+
+        pool = None
+        if args.processes:
+            # Every process loads its own models; frames travel through shared memory
+            width, height = (int(v) for v in args.max_frame_size.lower().split('x'))
+            pool = RecognitionWorkerPool(args.processes, (height, width, 3), component_options={
+                'model_name': args.model, 'engine': args.engine, 'onnx_threads': args.onnx_threads or 1,
+                'quantize': args.int8, 'db_path': args.db
+            })
+            print(f"Starting {args.processes} recognition processes...")
+            components = pool.start()
+            num_workers = args.processes
+        else:
+            # One copy of every model, shared by all streams
+            components = RecognitionComponents(args.model, engine=args.engine,
+                                               onnx_threads=args.onnx_threads, quantize=args.int8,
+                                               db_path=args.db, thread_safe_detector=True,
+                                               search_shards=args.search_shards)
+            print(components.startup_timer.report())
+            num_workers = args.workers
+
+        try:
+            runner = MultiStreamRunner(args.sources, components, num_workers=num_workers,
+                                       on_result=print_result if args.print_results else None,
+                                       tracking=not args.no_tracking, realtime=not args.fast,
+                                       replay_speed=args.replay_speed)
+            runner.run(stats_interval=args.stats_interval, duration=args.duration)
+        finally:
+            if pool is not None:
+                pool.stop()
+            else:
+                components.close()
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return 1
+    finally:
+        if reporter is not None:
+            reporter.stop()
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
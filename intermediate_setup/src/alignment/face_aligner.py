@@ -1,21 +1,44 @@
-import dlib
 import cv2
 import numpy as np
 import os
+from src.utils.buffer_pool import buffer_pool
+from src.utils.lazy_import import LazyModule
+from src.utils.metrics import metrics
+
+dlib = LazyModule('dlib')
 
 class FaceAligner:
-    def __init__(self, predictor_path=None):
+    def __init__(self, predictor_path=None, preload=True):
         """
         Initialize the face aligner with dlib's facial landmark predictor
         
         Args:
             predictor_path: path to the dlib facial landmark predictor model
+            preload: load the ~100 MB predictor now; if False it is loaded on first use
         """
         if predictor_path is None:
             predictor_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), 'models', 'shape_predictor_68_face_landmarks.dat')
-        self.predictor = dlib.shape_predictor(predictor_path)
+        self.predictor_path = predictor_path
         self.desired_size = (150, 150)  # Standard size for aligned faces
+        self._predictor = None
+        if preload:
+            self.load()
+
+    def load(self):
+        """Load the landmark predictor (only the first call does any work)"""
+        if self._predictor is None:
+            self._predictor = dlib.shape_predictor(self.predictor_path)
+        return self
+
+    @property
+    def is_loaded(self):
+        return self._predictor is not None
+
+    @property
+    def predictor(self):
+        return self.load()._predictor
         
+    @metrics.timed('landmarks')
     def get_landmarks(self, image, face):
         """
         Get facial landmarks for a face
@@ -27,8 +50,9 @@ class FaceAligner:
         Returns:
             numpy array of 68 facial landmarks
         """
-        # Convert BGR to RGB (dlib uses RGB)
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        # Convert BGR to RGB (dlib uses RGB) into a reused buffer
+        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB,
+                                 dst=buffer_pool.like(image, tag='landmarks_rgb'))
         
         # Get landmarks
         shape = self.predictor(rgb_image, face)
@@ -36,19 +60,24 @@ class FaceAligner:
         
         return landmarks
     
-    def align_face(self, image, face):
+    @metrics.timed('align')
+    def align_face(self, image, face, landmarks=None, dst=None):
         """
         Align a face using facial landmarks
         
         Args:
             image: numpy array of the image in BGR format
             face: dlib rectangle containing face location
+            landmarks: landmarks from get_landmarks() if already computed
+            dst: optional desired_size buffer to write the aligned face into
+                (e.g. from the buffer pool) instead of allocating one
             
         Returns:
             aligned face image
         """
         # Get facial landmarks
-        landmarks = self.get_landmarks(image, face)
+        if landmarks is None:
+            landmarks = self.get_landmarks(image, face)
         
         # Get left and right eye centers
         left_eye = landmarks[36:42].mean(axis=0)
@@ -82,7 +111,7 @@ class FaceAligner:
         M[1, 2] += (tY - eyes_center[1])
         
         # Apply transformation
-        aligned_face = cv2.warpAffine(image, M, self.desired_size,
+        aligned_face = cv2.warpAffine(image, M, self.desired_size, dst=dst,
                                      flags=cv2.INTER_CUBIC)
         
         return aligned_face
@@ -0,0 +1,413 @@
+import csv
+import io
+import json
+import os
+import queue
+import threading
+import time
+import cv2
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.m4v', '.mpg', '.mpeg', '.wmv', '.webm')
+
+CSV_FIELDS = ['video', 'frame', 'timestamp', 'x', 'y', 'w', 'h', 'person_id', 'name', 'similarity']
+
+def collect_videos(paths, extensions=VIDEO_EXTENSIONS):
+    """
+    Expand files and directories into a sorted list of video files
+
+    Args:
+        paths: video files and/or directories (searched recursively)
+        extensions: file extensions treated as video
+
+    Returns:
+        list of video file paths
+    """
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = []
+            for root, _, files in os.walk(path):
+                found.extend(os.path.join(root, name) for name in files
+                             if name.lower().endswith(extensions))
+            videos.extend(sorted(found))
+        elif os.path.isfile(path):
+            videos.append(path)
+        else:
+            print(f"Warning: {path} not found, skipping")
+    return videos
+
+def sampling_stride(fps, stride=None, interval=None):
+    """
+    Frames between two sampled frames
+
+    Args:
+        fps: frame rate of the video (0 if unknown)
+        stride: sample every stride-th frame
+        interval: sample one frame every `interval` seconds (needs a known fps)
+    """
+    if interval:
+        if fps and fps > 0:
+            return max(1, int(round(interval * fps)))
+        print("Warning: unknown frame rate, sampling every frame instead of by time")
+        return 1
+    return max(1, stride or 1)
+
+def sample_frames(capture, stride=1, start_frame=0, fps=None, stage_times=None):
+    """
+    Yield every stride-th frame of an opened video
+
+    Frames in between are only grabbed, not retrieved, which skips the
+    color conversion and copy. Sampled frames are always those with
+    frame_index % stride == 0, so a resumed run samples the same frames.
+
+    Args:
+        capture: opened cv2.VideoCapture
+        stride: frames between samples
+        start_frame: first frame index to consider (seeks when > 0)
+        fps: frame rate used for timestamps
+        stage_times: optional dict; decode seconds are added under 'decode'
+
+    Yields:
+        (frame_index, timestamp_seconds, frame)
+    """
+    frame_index = 0
+    if start_frame > 0:
+        if capture.set(cv2.CAP_PROP_POS_FRAMES, start_frame):
+            frame_index = int(capture.get(cv2.CAP_PROP_POS_FRAMES))
+        # Containers without a usable index: decode forward instead
+        while frame_index < start_frame and capture.grab():
+            frame_index += 1
+
+    while True:
+        started_at = time.perf_counter()
+        if frame_index % stride == 0:
+            ret, frame = capture.read()
+        else:
+            ret, frame = capture.grab(), None
+        if stage_times is not None:
+            stage_times['decode'] = stage_times.get('decode', 0.0) + time.perf_counter() - started_at
+        if not ret:
+            return
+        if frame is not None:
+            if fps and fps > 0:
+                timestamp = frame_index / fps
+            else:
+                timestamp = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            yield frame_index, timestamp, frame
+        frame_index += 1
+
+def frame_record(video, frame_index, timestamp, results):
+    """Output record of one processed frame"""
+    return {
+        'video': video,
+        'frame': frame_index,
+        'timestamp': round(timestamp, 3),
+        'faces': [{
+            'box': [int(v) for v in r['box']],
+            'person_id': r['person_id'],
+            'name': r['name'],
+            'similarity': None if r['similarity'] is None else round(float(r['similarity']), 4)
+        } for r in results]
+    }
+
+def _truncate_partial_line(path):
+    """
+    Drop a trailing line without newline, e.g. from an interrupted run
+
+    Returns:
+        True if a partial line was removed
+    """
+    with open(path, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end != len(data):
+            f.truncate(end)
+            return True
+    return False
+
+class JsonlWriter:
+    def __init__(self, path, append=False):
+        """
+        Write one JSON line per processed frame
+
+        Args:
+            path: output file
+            append: continue an existing file (see load_progress)
+        """
+        self.path = path
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + "\n")
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    @staticmethod
+    def read_progress(path):
+        progress = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                progress[record['video']] = max(progress.get(record['video'], -1), record['frame'])
+        return progress
+
+class CsvWriter:
+    def __init__(self, path, append=False):
+        """
+        Write one CSV row per detected face
+
+        Frames without faces get a row with empty face columns, so the
+        output also records which frames were processed.
+
+        Args:
+            path: output file
+            append: continue an existing file (see load_progress)
+        """
+        self.path = path
+        write_header = not (append and os.path.getsize(path) > 0)
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=CSV_FIELDS)
+        if write_header:
+            self.writer.writeheader()
+
+    def write(self, record):
+        # All rows of a frame go out in one write, so a frame is never cut between two rows
+        rows = io.StringIO()
+        writer = csv.DictWriter(rows, fieldnames=CSV_FIELDS)
+        base = {'video': record['video'], 'frame': record['frame'], 'timestamp': record['timestamp']}
+        if not record['faces']:
+            writer.writerow(base)
+        for face in record['faces']:
+            x, y, w, h = face['box']
+            writer.writerow(dict(base, x=x, y=y, w=w, h=h, person_id=face['person_id'],
+                                 name=face['name'], similarity=face['similarity']))
+        self.file.write(rows.getvalue())
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    @staticmethod
+    def read_progress(path):
+        progress = {}
+        with open(path, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                try:
+                    frame = int(row['frame'])
+                except (TypeError, ValueError):
+                    continue
+                progress[row['video']] = max(progress.get(row['video'], -1), frame)
+        return progress
+
+    @staticmethod
+    def drop_last_frame(path):
+        """Remove all rows of the last frame in the file (keeps the header)"""
+        with open(path, 'rb+') as f:
+            lines = f.read().splitlines(keepends=True)
+            keys = [tuple(row[:2]) for row in csv.reader(line.decode('utf-8') for line in lines)]
+            end = len(lines)
+            while end > 1 and keys[end - 1] == keys[-1]:
+                end -= 1
+            f.truncate(sum(len(line) for line in lines[:end]))
+
+WRITERS = {'jsonl': JsonlWriter, 'csv': CsvWriter}
+
+def output_format(path, fmt=None):
+    """Explicit format, or the one implied by the file extension (default jsonl)"""
+    if fmt:
+        return fmt
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+def load_progress(path, fmt):
+    """
+    Last written frame of every video in an existing output file
+
+    Results are written in frame order, so every sampled frame up to the
+    returned index is complete. A partially written last line is removed;
+    in a CSV file the other rows of that frame (one per face) are removed
+    with it, so the frame is processed again instead of missing faces.
+
+    Returns:
+        dict video -> last frame index (empty if the file does not exist)
+    """
+    if not os.path.exists(path):
+        return {}
+    if _truncate_partial_line(path) and fmt == 'csv':
+        CsvWriter.drop_last_frame(path)
+    return WRITERS[fmt].read_progress(path)
+
+class VideoBatchProcessor:
+    def __init__(self, components, writer, num_workers=2, stride=1, interval=None,
+                 quality_gate=True, max_in_flight=None):
+        """
+        Recognize faces on sampled frames of video files, without a display
+
+        A decode thread reads and samples frames, a pool of worker threads
+        runs recognition (each with its own FrameRecognizer, sharing the
+        models in `components`) and the calling thread writes the records in
+        frame order through a reorder buffer. At most `max_in_flight` frames
+        are decoded but not yet written, which bounds memory when one frame
+        is slow.
+
+        Tracking is off: sampled frames are too far apart for box overlap to
+        follow a face, and workers finish frames out of order.
+
+        Args:
+            components: RecognitionComponents, preferably created with
+                thread_safe_detector=True
+            writer: JsonlWriter or CsvWriter
+            num_workers: recognition worker threads
+            stride: sample every stride-th frame
+            interval: sample one frame every `interval` seconds instead
+            quality_gate: skip tiny, blurry, dark or turned faces
+            max_in_flight: decoded frames waiting for recognition or output
+                (default: 4 per worker)
+        """
+        self.writer = writer
+        self.num_workers = num_workers
+        self.stride = stride
+        self.interval = interval
+        self.max_in_flight = max_in_flight or 4 * num_workers
+        self.recognizers = [components.create_recognizer(quality_gate=quality_gate, tracking=False)
+                            for _ in range(num_workers)]
+        self.stage_times = {}  # decode and write; recognition stages live in the recognizers
+        self.frames_processed = 0
+        self.faces_found = 0
+        self.videos_processed = 0
+        self.started_at = None
+        self.finished_at = None
+
+    def process_video(self, path, start_frame=0):
+        """
+        Process one video from `start_frame` on
+
+        Returns:
+            number of frames processed
+        """
+        capture = cv2.VideoCapture(path)
+        if not capture.isOpened():
+            print(f"Error: could not open {path}")
+            return 0
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        stride = sampling_stride(fps, self.stride, self.interval)
+        tasks = queue.Queue()
+        done = threading.Condition()
+        results = {}  # sequence number -> record (the reorder buffer)
+        in_flight = threading.Semaphore(self.max_in_flight)
+        decoded = {'count': None}
+        stop_event = threading.Event()
+
+        def decode():
+            sequence = 0
+            try:
+                for frame_index, timestamp, frame in sample_frames(capture, stride, start_frame, fps,
+                                                                   self.stage_times):
+                    while not in_flight.acquire(timeout=0.1):
+                        if stop_event.is_set():
+                            return
+                    tasks.put((sequence, frame_index, timestamp, frame))
+                    sequence += 1
+            finally:
+                for _ in range(self.num_workers):
+                    tasks.put(None)
+                with done:
+                    decoded['count'] = sequence
+                    done.notify_all()
+
+        def work(recognizer):
+            while True:
+                task = tasks.get()
+                if task is None:
+                    return
+                sequence, frame_index, timestamp, frame = task
+                try:
+                    faces = recognizer.recognize(frame)
+                except Exception as e:
+                    print(f"Error processing frame {frame_index} of {path}: {str(e)}")
+                    faces = []
+                with done:
+                    results[sequence] = frame_record(path, frame_index, timestamp, faces)
+                    done.notify_all()
+
+        threads = [threading.Thread(target=decode, name="decode", daemon=True)]
+        threads += [threading.Thread(target=work, args=(recognizer,), name=f"worker-{i}", daemon=True)
+                    for i, recognizer in enumerate(self.recognizers)]
+        for thread in threads:
+            thread.start()
+
+        next_sequence = 0
+        try:
+            while True:
+                with done:
+                    while next_sequence not in results and decoded['count'] != next_sequence:
+                        done.wait()
+                    record = results.pop(next_sequence, None)
+                if record is None:
+                    break  # every decoded frame has been written
+                started_at = time.perf_counter()
+                self.writer.write(record)
+                # Flush per frame so an interrupted run can resume where it stopped
+                self.writer.flush()
+                self.stage_times['write'] = self.stage_times.get('write', 0.0) + time.perf_counter() - started_at
+                self.frames_processed += 1
+                self.faces_found += len(record['faces'])
+                next_sequence += 1
+                in_flight.release()
+        finally:
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+            capture.release()
+            self.finished_at = time.perf_counter()
+        self.videos_processed += 1
+        return next_sequence
+
+    def run(self, videos, progress=None):
+        """
+        Process several videos, skipping frames already in `progress`
+
+        Args:
+            videos: list of video paths
+            progress: dict video -> last processed frame (see load_progress)
+        """
+        progress = progress or {}
+        for path in videos:
+            start_frame = progress.get(path, -1) + 1
+            if start_frame > 0:
+                print(f"Resuming {path} after frame {start_frame - 1}")
+            else:
+                print(f"Processing {path}")
+            count = self.process_video(path, start_frame)
+            print(f"  {count} frames")
+
+    def summary(self):
+        """Frames per second and time per stage"""
+        elapsed = (self.finished_at - self.started_at) if self.started_at and self.finished_at else 0.0
+        stage_times = dict(self.stage_times)
+        for recognizer in self.recognizers:
+            for stage, seconds in recognizer.stage_times.items():
+                stage_times[stage] = stage_times.get(stage, 0.0) + seconds
+
+        lines = [
+            "Batch summary:",
+            f"  videos {self.videos_processed}, frames {self.frames_processed}, faces {self.faces_found}",
+            f"  wall time {elapsed:.1f} s, "
+            f"{self.frames_processed / elapsed if elapsed > 0 else 0.0:.1f} frames/s",
+            "  time per stage (summed over threads):"
+        ]
+        for stage, seconds in sorted(stage_times.items(), key=lambda item: -item[1]):
+            per_frame = seconds / self.frames_processed * 1000 if self.frames_processed else 0.0
+            lines.append(f"    {stage:10s} {seconds:8.2f} s  {per_frame:7.1f} ms/frame")
+        return "\n".join(lines)
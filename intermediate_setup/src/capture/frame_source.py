@@ -0,0 +1,246 @@
+import os
+import time
+import cv2
+
+def parse_source(source):
+    """
+    Interpret a command-line video source
+
+    Args:
+        source: device index ("0", 0), video file path or stream URL (rtsp://, http://)
+
+    Returns:
+        int for camera devices, otherwise the string unchanged
+    """
+    if isinstance(source, int):
+        return source
+    if isinstance(source, str) and source.isdigit():
+        return int(source)
+    return source
+
+def is_live_source(source):
+    """True for cameras and network streams, False for video files"""
+    source = parse_source(source)
+    return isinstance(source, int) or "://" in source
+
+def open_capture(source, width=None, height=None, fps=None, replay_speed=None):
+    """
+    Open a camera, video file or stream
+
+    Args:
+        source: see parse_source()
+        width, height, fps: requested camera properties (ignored for files)
+        replay_speed: open a video file as a ReplaySource paced at this speed
+            (1.0 = as recorded, 0 = as fast as possible)
+
+    Returns:
+        opened cv2.VideoCapture, or ReplaySource
+
+    Raises:
+        IOError: if the source cannot be opened
+    """
+    source = parse_source(source)
+    if replay_speed is not None and not is_live_source(source):
+        return ReplaySource(source, speed=replay_speed)
+    capture = cv2.VideoCapture(source)
+    if not capture.isOpened():
+        raise IOError(f"Could not open video source {source!r}")
+
+    if isinstance(source, int):
+        if width:
+            capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            capture.set(cv2.CAP_PROP_FPS, fps)
+    return capture
+
+def timing_index_path(video_path):
+    """Path of the timing index stored next to a recording"""
+    return video_path + ".timing"
+
+def read_timing_index(video_path):
+    """
+    Capture timestamps of a recording
+
+    Returns:
+        list of seconds since the first frame, or None without an index
+    """
+    path = timing_index_path(video_path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return [float(line) for line in f if line.strip()]
+
+class FrameRecorder:
+    def __init__(self, path, fps=30.0, fourcc='MJPG'):
+        """
+        Record frames into a video file plus a timing index
+
+        The video holds the pixels; the index (one capture timestamp per
+        line, in seconds since the first frame) holds the real timing,
+        including jitter and gaps that the container frame rate cannot
+        express. Both are written incrementally, so a crash loses at most
+        the last frame.
+
+        Args:
+            path: output video file (.avi for MJPG)
+            fps: nominal frame rate stored in the container
+            fourcc: codec; MJPG keeps frames intact at a moderate size
+        """
+        self.path = path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.writer = None
+        self.index_file = None
+        self.first_timestamp = None
+        self.frame_count = 0
+
+    def write(self, frame, timestamp=None):
+        """
+        Append a frame
+
+        Args:
+            frame: BGR frame; all frames must have the size of the first one
+            timestamp: capture time in seconds (default: time.perf_counter())
+        """
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        if self.writer is None:
+            height, width = frame.shape[:2]
+            self.writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc),
+                                          self.fps, (width, height))
+            if not self.writer.isOpened():
+                raise IOError(f"Could not open {self.path} for writing")
+            self.index_file = open(timing_index_path(self.path), 'w')
+            self.first_timestamp = timestamp
+        self.writer.write(frame)
+        self.index_file.write(f"{timestamp - self.first_timestamp:.6f}\n")
+        self.index_file.flush()
+        self.frame_count += 1
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.index_file.close()
+            self.writer = None
+            self.index_file = None
+
+class RecordingCapture:
+    def __init__(self, capture, recorder):
+        """
+        Pass frames of a capture through while recording them
+
+        Args:
+            capture: cv2.VideoCapture (or compatible object)
+            recorder: FrameRecorder
+        """
+        self.capture = capture
+        self.recorder = recorder
+
+    def read(self):
+        ret, frame = self.capture.read()
+        if ret:
+            self.recorder.write(frame)
+        return ret, frame
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def get(self, prop):
+        return self.capture.get(prop)
+
+    def set(self, prop, value):
+        return self.capture.set(prop, value)
+
+    def release(self):
+        self.capture.release()
+        self.recorder.close()
+
+class ReplaySource:
+    def __init__(self, path, speed=1.0, loop=False, drop_late=False):
+        """
+        Play a recording back like a camera
+
+        Frames are released at their recorded times (from the timing index,
+        or the container frame rate without one) divided by `speed`, so
+        latency and load tests see the same input on every run and on
+        machines without a camera.
+
+        Implements the part of the cv2.VideoCapture interface the pipelines
+        use: read(), isOpened(), get(), set() and release().
+
+        Args:
+            path: video file, usually written by FrameRecorder
+            speed: 1.0 plays as recorded, 2.0 twice as fast, 0 as fast as
+                possible
+            loop: start over at the end instead of reporting end of stream
+            drop_late: like a camera, skip frames whose time has already
+                passed when the consumer falls behind
+        """
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.drop_late = drop_late
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise IOError(f"Could not open recording {path!r}")
+        self.timestamps = read_timing_index(path)
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self.position = 0     # index of the next frame in the file
+        self.loop_offset = 0.0  # recorded duration of the completed loops
+        self.started_at = None
+        self.frames_dropped = 0
+
+    def _timestamp(self, index):
+        """Recorded time of frame `index`; one frame interval after the last for the end"""
+        if not self.timestamps:
+            return index / self.fps
+        if index < len(self.timestamps):
+            return self.timestamps[index]
+        return self.timestamps[-1] + (index - len(self.timestamps) + 1) / self.fps
+
+    def _rewind(self):
+        self.loop_offset += self._timestamp(self.position) if self.position else 0.0
+        self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.position = 0
+
+    def read(self):
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+        while True:
+            if not self.capture.grab():
+                if not self.loop or self.position == 0:
+                    return False, None
+                self._rewind()
+                continue
+            index = self.position
+            self.position += 1
+            if not self.speed:
+                break
+            due = self.started_at + (self.loop_offset + self._timestamp(index)) / self.speed
+            next_due = self.started_at + (self.loop_offset + self._timestamp(index + 1)) / self.speed
+            now = time.perf_counter()
+            if self.drop_late and now >= next_due:
+                self.frames_dropped += 1
+                continue
+            if due > now:
+                time.sleep(due - now)
+            break
+        return self.capture.retrieve()
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps * (self.speed or 1.0)
+        return self.capture.get(prop)
+
+    def set(self, prop, value):
+        # Camera properties (resolution, fps) cannot be changed on a recording
+        return False
+
+    def release(self):
+        self.capture.release()
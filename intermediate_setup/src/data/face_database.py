@@ -3,6 +3,10 @@ import numpy as np
 import os
 import pickle
 from datetime import datetime
+from src.utils.metrics import metrics
+
+# Model assumed for rows written before the model was recorded
+DEFAULT_MODEL_NAME = "VGG-Face"
 
 class FaceDatabase:
     def __init__(self, db_path="face_database.db"):
@@ -37,13 +41,34 @@ class FaceDatabase:
             features BLOB,
             image_path TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            model_name TEXT,
+            embedding_dim INTEGER,
             FOREIGN KEY (person_id) REFERENCES persons (id)
         )
         ''')
         
+        self._migrate_model_columns(cursor)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_faces_model ON faces (model_name)')
+        
         conn.commit()
         conn.close()
         
+    def _migrate_model_columns(self, cursor):
+        """Add model_name/embedding_dim to databases created before they existed"""
+        columns = [row[1] for row in cursor.execute('PRAGMA table_info(faces)')]
+        if 'model_name' in columns:
+            return
+            
+        cursor.execute('ALTER TABLE faces ADD COLUMN model_name TEXT')
+        cursor.execute('ALTER TABLE faces ADD COLUMN embedding_dim INTEGER')
+        
+        # Every legacy row was produced by the only model available back then
+        rows = cursor.execute('SELECT id, features FROM faces').fetchall()
+        for face_id, features_bytes in rows:
+            embedding_dim = len(pickle.loads(features_bytes))
+            cursor.execute('UPDATE faces SET model_name = ?, embedding_dim = ? WHERE id = ?',
+                           (DEFAULT_MODEL_NAME, embedding_dim, face_id))
+        
     def add_person(self, name):
         """
         Add a new person to the database
@@ -65,7 +90,7 @@ class FaceDatabase:
         
         return person_id
         
-    def add_face(self, person_id, features, image_path):
+    def add_face(self, person_id, features, image_path, model_name=DEFAULT_MODEL_NAME):
         """
         Add a face to the database
         
@@ -73,6 +98,7 @@ class FaceDatabase:
             person_id: ID of the person
             features: facial features as numpy array
             image_path: path to the face image
+            model_name: embedding model that produced the features
             
         Returns:
             face_id: ID of the newly created face
@@ -84,9 +110,9 @@ class FaceDatabase:
         features_bytes = pickle.dumps(features)
         
         cursor.execute('''
-        INSERT INTO faces (person_id, features, image_path)
-        VALUES (?, ?, ?)
-        ''', (person_id, features_bytes, image_path))
+        INSERT INTO faces (person_id, features, image_path, model_name, embedding_dim)
+        VALUES (?, ?, ?, ?, ?)
+        ''', (person_id, features_bytes, image_path, model_name, len(features)))
         
         face_id = cursor.lastrowid
         
@@ -141,26 +167,64 @@ class FaceDatabase:
         
         return persons
         
-    def search_face(self, features, threshold=0.6):
+    def get_models(self):
+        """
+        Get the embedding models present in the database
+        
+        Returns:
+            list of (model_name, embedding_dim, face_count) tuples
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT model_name, embedding_dim, COUNT(*)
+        FROM faces
+        GROUP BY model_name, embedding_dim
+        ''')
+        models = cursor.fetchall()
+        
+        conn.close()
+        
+        return models
+        
+    @metrics.timed('search')
+    def search_face(self, features, threshold=0.6, model_name=DEFAULT_MODEL_NAME):
         """
         Search for a matching face in the database
         
+        Only faces embedded with the same model are compared; embeddings
+        from different models live in unrelated spaces.
+        
         Args:
             features: facial features to search for
             threshold: similarity threshold
+            model_name: embedding model that produced the features
             
         Returns:
             (person_id, name, similarity) tuple if match found, None otherwise
+            
+        Raises:
+            ValueError: if stored faces of this model have a different dimension
         """
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute('SELECT id, features, person_id FROM faces')
+        cursor.execute('''
+        SELECT id, features, person_id, embedding_dim
+        FROM faces
+        WHERE model_name = ?
+        ''', (model_name,))
         best_match = None
         best_similarity = 0
         
         for row in cursor.fetchall():
-            face_id, features_bytes, person_id = row
+            face_id, features_bytes, person_id, embedding_dim = row
+            if embedding_dim != len(features):
+                conn.close()
+                raise ValueError(f"Cannot compare a {len(features)}-d embedding with stored "
+                                 f"{embedding_dim}-d '{model_name}' embeddings")
+                
             stored_features = pickle.loads(features_bytes)
             
             # Calculate similarity
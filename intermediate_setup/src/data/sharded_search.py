@@ -0,0 +1,407 @@
+import multiprocessing as mp
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import numpy as np
+from src.data.face_database import FaceDatabase, DEFAULT_MODEL_NAME
+from src.utils.metrics import metrics
+
+class GalleryShard:
+    def __init__(self, shard_index, num_shards, db_path, model_name=DEFAULT_MODEL_NAME):
+        """
+        The embeddings of the faces with id % num_shards == shard_index
+
+        Embeddings are kept L2-normalized in one float32 matrix, so a batch
+        of queries is a single matrix product. The matrix grows by doubling
+        when faces are added.
+
+        Args:
+            shard_index: index of this shard
+            num_shards: total number of shards
+            db_path: SQLite face database to load from
+            model_name: only faces of this embedding model are loaded
+        """
+        self.shard_index = shard_index
+        self.num_shards = num_shards
+        self.db_path = db_path
+        self.model_name = model_name
+        self.count = 0
+        self.dim = None
+        self.embeddings = None  # capacity x dim float32, first `count` rows valid
+        self.face_ids = np.empty(0, dtype=np.int64)
+        self.person_ids = np.empty(0, dtype=np.int64)
+        self.last_id = 0  # highest face id seen in the database
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, rows):
+        needed = self.count + rows
+        capacity = 0 if self.embeddings is None else len(self.embeddings)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity, 1024)
+        embeddings = np.empty((capacity, self.dim), dtype=np.float32)
+        face_ids = np.empty(capacity, dtype=np.int64)
+        person_ids = np.empty(capacity, dtype=np.int64)
+        if self.count:
+            embeddings[:self.count] = self.embeddings[:self.count]
+            face_ids[:self.count] = self.face_ids[:self.count]
+            person_ids[:self.count] = self.person_ids[:self.count]
+        self.embeddings, self.face_ids, self.person_ids = embeddings, face_ids, person_ids
+
+    def add_rows(self, face_ids, person_ids, embeddings):
+        """Append faces; embeddings is an N x dim array (normalized here)"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if len(embeddings) == 0:
+            return
+        if self.dim is None:
+            self.dim = embeddings.shape[1]
+        elif embeddings.shape[1] != self.dim:
+            raise ValueError(f"Cannot add {embeddings.shape[1]}-d embeddings to a {self.dim}-d shard")
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._reserve(len(embeddings))
+        end = self.count + len(embeddings)
+        np.divide(embeddings, norms, out=self.embeddings[self.count:end])
+        self.face_ids[self.count:end] = face_ids
+        self.person_ids[self.count:end] = person_ids
+        self.count = end
+
+    def sync(self, batch_size=10000):
+        """
+        Load the faces added to the database since the last sync
+
+        Face ids only grow (AUTOINCREMENT), so this is a range scan on the
+        primary key starting at the last id seen.
+
+        Returns:
+            number of faces loaded
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # Rows committed after this point get higher ids and are left for the next sync
+            max_id = conn.execute('SELECT MAX(id) FROM faces').fetchone()[0] or 0
+            cursor = conn.execute(
+                'SELECT id, person_id, features FROM faces '
+                'WHERE id > ? AND id <= ? AND model_name = ? AND id % ? = ? ORDER BY id',
+                (self.last_id, max_id, self.model_name, self.num_shards, self.shard_index))
+            loaded = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                self.add_rows([row[0] for row in rows], [row[1] for row in rows],
+                              np.stack([np.asarray(pickle.loads(row[2]), dtype=np.float32)
+                                        for row in rows]))
+                loaded += len(rows)
+            self.last_id = max(self.last_id, max_id)
+        finally:
+            conn.close()
+        return loaded
+
+    def search(self, queries, k=1):
+        """
+        Top-k cosine similarities of each query within this shard
+
+        Args:
+            queries: Q x dim array of L2-normalized embeddings
+            k: matches per query
+
+        Returns:
+            (similarities, face_ids, person_ids), each Q x min(k, len(self)),
+            best first
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        k = min(k, self.count)
+        if k == 0:
+            empty = np.empty((len(queries), 0))
+            return empty.astype(np.float32), empty.astype(np.int64), empty.astype(np.int64)
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"Cannot compare a {queries.shape[1]}-d embedding with stored "
+                             f"{self.dim}-d '{self.model_name}' embeddings")
+        similarities = queries @ self.embeddings[:self.count].T  # Q x N
+        if k < self.count:
+            top = np.argpartition(similarities, -k, axis=1)[:, -k:]
+        else:
+            top = np.broadcast_to(np.arange(self.count), similarities.shape)
+        top_similarities = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_similarities, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return (np.take_along_axis(top_similarities, order, axis=1),
+                self.face_ids[top], self.person_ids[top])
+
+def _shard_main(connection, shard_index, num_shards, db_path, model_name, threads_per_shard):
+    # Keep every shard to its own core(s) instead of oversubscribing the machine
+    for variable in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[variable] = str(threads_per_shard)
+
+    try:
+        shard = GalleryShard(shard_index, num_shards, db_path, model_name)
+        shard.sync()
+        connection.send(('ready', len(shard)))
+    except Exception as e:
+        connection.send(('error', f"Shard {shard_index} failed to load: {e}"))
+        connection.close()
+        return
+
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            break
+        command = message[0]
+        if command == 'stop':
+            break
+        try:
+            if command == 'search':
+                _, queries, k = message
+                connection.send(('ok', shard.search(queries, k)))
+            elif command == 'sync':
+                connection.send(('ok', shard.sync()))
+            elif command == 'size':
+                connection.send(('ok', len(shard)))
+            else:
+                connection.send(('error', f"Unknown command {command!r}"))
+        except Exception as e:
+            connection.send(('error', str(e)))
+    connection.close()
+
+class ShardedFaceDatabase:
+    def __init__(self, db_path="face_database.db", num_shards=None, model_name=DEFAULT_MODEL_NAME,
+                 sync_interval=1.0, threads_per_shard=1):
+        """
+        FaceDatabase whose search is spread over shard processes
+
+        The embeddings of one model are partitioned by face id over
+        num_shards worker processes, so no process has to hold the whole
+        gallery and a query uses every shard's core. Each query batch is
+        sent to all shards over one pipe per shard, every shard returns its
+        own top-k, and the results are merged here.
+
+        SQLite stays the source of truth: add_face() writes the row and then
+        has its shard load it (read-your-writes), and before a search the
+        shards load rows inserted by other processes once the newest face id
+        changed (checked at most every sync_interval seconds). Faces are only
+        ever added by FaceDatabase; deleting rows needs a restart.
+
+        Other FaceDatabase methods are passed through, so this can replace
+        the FaceDatabase of RecognitionComponents.
+
+        Args:
+            db_path: path to the SQLite face database
+            num_shards: shard processes (default: CPU count)
+            model_name: embedding model whose faces are searched
+            sync_interval: seconds between checks for new rows (0: every search)
+            threads_per_shard: math library threads per shard process
+        """
+        self.database = FaceDatabase(db_path)
+        self.db_path = db_path
+        self.num_shards = num_shards or os.cpu_count() or 1
+        self.model_name = model_name
+        self.sync_interval = sync_interval
+        self.threads_per_shard = threads_per_shard
+
+        self.lock = threading.Lock()  # one request at a time on the pipes
+        self.connections = []
+        self.processes = []
+        self.synced_max_id = None
+        self.last_sync_check = 0.0
+        self.names = {}  # person_id -> name
+        self.shard_sizes = []
+
+    def start(self, timeout=None):
+        """
+        Start the shard processes and wait until they have loaded their faces
+
+        Raises:
+            RuntimeError: if a shard fails to load
+        """
+        # 'spawn' avoids forking a parent that may already hold TensorFlow state
+        context = mp.get_context('spawn')
+        self.synced_max_id = self._max_face_id()
+        for index in range(self.num_shards):
+            parent_connection, child_connection = context.Pipe()
+            process = context.Process(
+                target=_shard_main, name=f"search-shard-{index}", daemon=True,
+                args=(child_connection, index, self.num_shards, self.db_path, self.model_name,
+                      self.threads_per_shard))
+            process.start()
+            child_connection.close()
+            self.connections.append(parent_connection)
+            self.processes.append(process)
+
+        errors = []
+        self.shard_sizes = []
+        for connection in self.connections:
+            if timeout is not None and not connection.poll(timeout):
+                errors.append("Shard did not start in time")
+                continue
+            kind, payload = connection.recv()
+            if kind == 'error':
+                errors.append(payload)
+            else:
+                self.shard_sizes.append(payload)
+        if errors:
+            self.stop()
+            raise RuntimeError("; ".join(errors))
+        self.last_sync_check = time.perf_counter()
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stop the shard processes"""
+        for connection in self.connections:
+            try:
+                connection.send(('stop',))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
+        self.processes = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _max_face_id(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute('SELECT MAX(id) FROM faces').fetchone()[0] or 0
+        finally:
+            conn.close()
+
+    def _request(self, connections, message):
+        """Send a message to several shards, then collect their answers in order"""
+        for connection in connections:
+            connection.send(message)
+        answers, errors = [], []
+        for connection in connections:
+            kind, payload = connection.recv()
+            if kind == 'error':
+                errors.append(payload)
+            else:
+                answers.append(payload)
+        if errors:
+            raise ValueError(errors[0])
+        return answers
+
+    def _sync_if_changed(self):
+        now = time.perf_counter()
+        if now - self.last_sync_check < self.sync_interval:
+            return
+        self.last_sync_check = now
+        max_id = self._max_face_id()
+        if max_id != self.synced_max_id:
+            self._request(self.connections, ('sync',))
+            self.synced_max_id = max_id
+
+    def sync(self):
+        """Load new database rows into all shards now"""
+        with self.lock:
+            self.synced_max_id = self._max_face_id()
+            self._request(self.connections, ('sync',))
+            self.last_sync_check = time.perf_counter()
+
+    def size(self):
+        """Number of faces held by each shard"""
+        with self.lock:
+            return self._request(self.connections, ('size',))
+
+    def _names(self, person_ids):
+        missing = [int(p) for p in set(person_ids) if p not in self.names]
+        if missing:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                placeholders = ','.join('?' * len(missing))
+                self.names.update(conn.execute(
+                    f'SELECT id, name FROM persons WHERE id IN ({placeholders})', missing))
+            finally:
+                conn.close()
+        return [self.names.get(int(p)) for p in person_ids]
+
+    @metrics.timed('search')
+    def search_batch(self, queries, k=1, threshold=0.0):
+        """
+        Top-k matches for a batch of query embeddings
+
+        Args:
+            queries: Q x dim array (or list) of embeddings
+            k: matches per query
+            threshold: drop matches below this cosine similarity
+
+        Returns:
+            one list per query of (person_id, name, similarity, face_id)
+            tuples, best first
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        queries = queries / norms
+
+        with self.lock:
+            self._sync_if_changed()
+            answers = self._request(self.connections, ('search', queries, k))
+
+        # Merge the per-shard top-k lists into the global top-k
+        similarities = np.concatenate([a[0] for a in answers], axis=1)
+        face_ids = np.concatenate([a[1] for a in answers], axis=1)
+        person_ids = np.concatenate([a[2] for a in answers], axis=1)
+        order = np.argsort(-similarities, axis=1)[:, :k]
+
+        results = []
+        for row, columns in enumerate(order):
+            matches = [(int(person_ids[row, c]), float(similarities[row, c]), int(face_ids[row, c]))
+                       for c in columns if similarities[row, c] >= threshold]
+            names = self._names([person_id for person_id, _, _ in matches])
+            results.append([(person_id, name, min(max(similarity, 0.0), 1.0), face_id)
+                            for (person_id, similarity, face_id), name in zip(matches, names)])
+        return results
+
+    def search_face(self, features, threshold=0.6, model_name=DEFAULT_MODEL_NAME):
+        """
+        Search for a matching face (same contract as FaceDatabase.search_face)
+
+        Returns:
+            (person_id, name, similarity) tuple if match found, None otherwise
+
+        Raises:
+            ValueError: for another model than the shards hold, or a
+                different embedding dimension
+        """
+        if model_name != self.model_name:
+            raise ValueError(f"The shards hold '{self.model_name}' embeddings, not '{model_name}'")
+        matches = self.search_batch([features], k=1, threshold=threshold)[0]
+        if not matches:
+            return None
+        person_id, name, similarity, _ = matches[0]
+        return person_id, name, similarity
+
+    def add_person(self, name):
+        return self.database.add_person(name)
+
+    def add_face(self, person_id, features, image_path, model_name=DEFAULT_MODEL_NAME):
+        """Add a face to the database and to its shard"""
+        face_id = self.database.add_face(person_id, features, image_path, model_name=model_name)
+        if model_name == self.model_name:
+            # The owning shard loads everything up to and including the new row
+            with self.lock:
+                self._request([self.connections[face_id % self.num_shards]], ('sync',))
+        return face_id
+
+    def get_person_faces(self, person_id):
+        return self.database.get_person_faces(person_id)
+
+    def get_all_persons(self):
+        return self.database.get_all_persons()
+
+    def get_models(self):
+        return self.database.get_models()
@@ -1,12 +1,39 @@
-import dlib
+import threading
 import cv2
 import numpy as np
+from src.utils.buffer_pool import buffer_pool
+from src.utils.lazy_import import LazyModule
+from src.utils.metrics import metrics
+
+dlib = LazyModule('dlib')
 
 class FaceDetector:
-    def __init__(self):
-        """Initialize the face detector using dlib's HOG detector"""
-        self.detector = dlib.get_frontal_face_detector()
+    def __init__(self, preload=True):
+        """
+        Initialize the face detector using dlib's HOG detector
+
+        Args:
+            preload: load the detector now; if False it is loaded on first use
+        """
+        self._detector = None
+        if preload:
+            self.load()
+
+    def load(self):
+        """Load dlib's HOG detector (only the first call does any work)"""
+        if self._detector is None:
+            self._detector = dlib.get_frontal_face_detector()
+        return self
+
+    @property
+    def is_loaded(self):
+        return self._detector is not None
+
+    @property
+    def detector(self):
+        return self.load()._detector
         
+    @metrics.timed('detect')
     def detect_faces(self, image):
         """
         Detect faces in an image using dlib's HOG detector
@@ -17,8 +44,9 @@ class FaceDetector:
         Returns:
             list of dlib rectangles containing face locations
         """
-        # Convert BGR to RGB (dlib uses RGB)
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        # Convert BGR to RGB (dlib uses RGB) into a reused buffer
+        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB,
+                                 dst=buffer_pool.like(image, tag='detect_rgb'))
         
         # Detect faces with increased upsampling for better detection
         faces = self.detector(rgb_image, 2)  # 2 means upsampling twice
@@ -78,4 +106,37 @@ class FaceDetector:
             face_images.append(face_img)
             locations.append((x, y, w, h))
             
-        return face_images, locations 
\ No newline at end of file
+        return face_images, locations 
+
+class ThreadLocalFaceDetector:
+    """
+    FaceDetector that gives every calling thread its own dlib detector
+
+    dlib's object detector keeps per-call scanning state and must not be used
+    from several threads at once. The HOG model is small, so one copy per
+    worker thread is cheaper than serializing all detection behind a lock.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _detector(self):
+        detector = getattr(self._local, 'detector', None)
+        if detector is None:
+            detector = FaceDetector()
+            self._local.detector = detector
+        return detector
+
+    def load(self):
+        """Load the detector of the calling thread"""
+        self._detector()
+        return self
+
+    def detect_faces(self, image):
+        return self._detector().detect_faces(image)
+
+    def get_face_rectangles(self, image):
+        return self._detector().get_face_rectangles(image)
+
+    def extract_faces(self, image):
+        return self._detector().extract_faces(image)
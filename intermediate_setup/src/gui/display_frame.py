@@ -0,0 +1,69 @@
+import cv2
+from src.utils.buffer_pool import buffer_pool
+
+def fit_size(width, height, max_width, max_height):
+    """
+    Largest size with the aspect ratio of width x height that fits in max_width x max_height
+
+    Returns:
+        (width, height), at least 1 x 1
+    """
+    scale = min(max_width / width, max_height / height)
+    return max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+
+def draw_results(frame, results, scale=1.0):
+    """
+    Draw face boxes and names on a BGR frame
+
+    Args:
+        frame: BGR image, drawn on in place
+        results: list of dicts with 'box' (x, y, w, h in source frame
+            pixels), 'name', 'similarity' and 'person_id'
+        scale: factor from source frame to `frame` coordinates
+
+    Returns:
+        frame
+    """
+    for result in results or []:
+        x, y, w, h = (int(round(v * scale)) for v in result['box'])
+        if result.get('person_id') is not None:
+            color = (0, 255, 0)  # Green for recognized face
+            label = f"{result['name']} ({result['similarity']:.2f})"
+        else:
+            color = (0, 0, 255)  # Red for unknown face
+            label = result.get('name') or "Unknown"
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(frame, label, (x, max(y - 8, 12)), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    return frame
+
+def render_display(frame, results, view_size, tag='view'):
+    """
+    Prepare a camera frame for the video view, off the GUI thread
+
+    The frame is scaled to fit view_size (keeping its aspect ratio), the
+    results are drawn at display resolution and the image is converted to
+    RGB, so the GUI thread only has to paint it. Scaling first means the
+    drawing and the color conversion touch the display's pixels, not the
+    camera's.
+
+    Args:
+        frame: BGR camera frame (not modified)
+        results: recognition results for draw_results(), or None
+        view_size: (width, height) of the view in device pixels
+        tag: buffer pool tag of the returned image; alternate between two
+            tags when the previous image may still be on screen
+
+    Returns:
+        C-contiguous RGB uint8 image from the calling thread's buffer pool
+    """
+    height, width = frame.shape[:2]
+    display_width, display_height = fit_size(width, height, *view_size)
+    if (display_width, display_height) == (width, height):
+        scaled = buffer_pool.copy(frame, tag='view_bgr')
+    else:
+        # Bilinear: INTER_AREA looks slightly better when shrinking but costs ~6x more
+        scaled = cv2.resize(frame, (display_width, display_height), interpolation=cv2.INTER_LINEAR,
+                            dst=buffer_pool.get((display_height, display_width) + frame.shape[2:],
+                                                frame.dtype, 'view_bgr'))
+    draw_results(scaled, results, display_width / width)
+    return cv2.cvtColor(scaled, cv2.COLOR_BGR2RGB, dst=buffer_pool.like(scaled, tag=tag))
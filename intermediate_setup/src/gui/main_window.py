@@ -1,15 +1,44 @@
 import sys
-import cv2
+import time
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                             QHBoxLayout, QPushButton, QLabel, QLineEdit,
-                            QMessageBox, QFileDialog)
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QImage, QPixmap
+                            QMessageBox, QFileDialog, QShortcut)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtGui import QKeySequence
 import os
+from src.capture.frame_source import open_capture
+from src.gui.video_view import VideoView
+from src.gui.video_worker import VideoWorker
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # Emitted when the user asks for the list of known people
+    list_faces_signal = pyqtSignal()
+
+    def __init__(self, source=0, replay_speed=1.0, profiler=None, recognize_fn=None,
+                 status_fn=None, add_face_fn=None):
+        """
+        Args:
+            source: camera index, video file/recording or stream URL
+            replay_speed: pace video files at this multiple of their recorded
+                timing (0 = as fast as possible)
+            profiler: optional Profiler; Ctrl+P starts a new capture
+            recognize_fn: callable(frame) -> list of dicts with 'box', 'name',
+                'similarity' and 'person_id', run on a worker thread for the
+                overlays (None shows the video only)
+            status_fn: callable() -> extra status line (e.g. model loading
+                progress) or None, polled every 500 ms
+            add_face_fn: callable(name, BGR frame) -> (success, message),
+                run on the recognition thread to enrol the current frame
+        """
         super().__init__()
+        self.source = source
+        self.replay_speed = replay_speed
+        self.profiler = profiler
+        self.recognize_fn = recognize_fn
+        self.status_fn = status_fn
+        self.add_face_fn = add_face_fn
+        if profiler is not None and recognize_fn is not None:
+            self.recognize_fn = profiler.profiled(recognize_fn)
         self.setWindowTitle("Face Recognition System")
         self.setGeometry(100, 100, 1200, 800)
         
@@ -18,10 +47,12 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(main_widget)
         layout = QHBoxLayout(main_widget)
         
-        # Create video display
-        self.video_label = QLabel()
-        self.video_label.setMinimumSize(800, 600)
-        layout.addWidget(self.video_label)
+        # Create video display (frames arrive scaled and converted from the capture thread)
+        self.video_view = VideoView()
+        self.video_view.setMinimumSize(800, 600)
+        self.video_view.frame_painted.connect(self.frame_painted)
+        self.video_view.size_changed.connect(self.view_resized)
+        layout.addWidget(self.video_view, 1)
         
         # Create control panel
         control_panel = QWidget()
@@ -32,9 +63,9 @@ class MainWindow(QMainWindow):
         self.name_input.setPlaceholderText("Enter person's name")
         control_layout.addWidget(self.name_input)
         
-        add_face_btn = QPushButton("Add Face")
-        add_face_btn.clicked.connect(self.add_face)
-        control_layout.addWidget(add_face_btn)
+        self.add_face_btn = QPushButton("Add Face")
+        self.add_face_btn.clicked.connect(self.add_face)
+        control_layout.addWidget(self.add_face_btn)
         
         # Add camera controls
         start_camera_btn = QPushButton("Start Camera")
@@ -50,51 +81,92 @@ class MainWindow(QMainWindow):
         list_faces_btn.clicked.connect(self.list_faces)
         control_layout.addWidget(list_faces_btn)
         
+        # Add FPS / latency readout
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+        control_layout.addWidget(self.status_label)
+        
         # Add spacing
         control_layout.addStretch()
         
         # Add control panel to main layout
         layout.addWidget(control_panel)
         
-        # Initialize camera
+        # Initialize camera; frames and results arrive from the worker threads
         self.camera = None
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_frame)
+        self.worker = None
+        self.shown_captured_at = None  # capture time of the frame waiting to be painted
+        self.set_frame_cpu = 0.0       # GUI thread CPU seconds of update_frame()
+        self.status_timer = QTimer()
+        self.status_timer.timeout.connect(self.update_status)
+        self.status_timer.start(500)
+        
+        # Profiling windows are opened and closed from the event loop
+        if self.profiler is not None:
+            self.profile_timer = QTimer()
+            self.profile_timer.timeout.connect(self.profiler.tick)
+            self.profile_timer.start(100)
+            QShortcut(QKeySequence("Ctrl+P"), self, activated=self.profiler.request_capture)
         
     def start_camera(self):
         """Start the camera feed"""
         if self.camera is None:
-            self.camera = cv2.VideoCapture(0)
-            if not self.camera.isOpened():
-                QMessageBox.critical(self, "Error", "Could not open camera")
+            try:
+                self.camera = open_capture(self.source, replay_speed=self.replay_speed)
+            except IOError as e:
+                QMessageBox.critical(self, "Error", str(e))
                 return
-            self.timer.start(30)  # Update every 30ms
+            self.worker = VideoWorker(self.camera, self.recognize_fn,
+                                      display_size=self.video_view.device_size())
+            self.worker.frame_ready.connect(self.update_frame)
+            self.worker.capture_thread.finished_reading.connect(self.stop_camera)
+            if self.worker.recognition_thread is not None:
+                self.worker.recognition_thread.recognition_failed.connect(self.show_recognition_error)
+            self.worker.start()
             
     def stop_camera(self):
         """Stop the camera feed"""
         if self.camera is not None:
-            self.timer.stop()
+            self.worker.stop()
+            self.worker = None
+            self.add_face_btn.setEnabled(True)  # a queued enrolment is dropped with the worker
             self.camera.release()
             self.camera = None
-            self.video_label.clear()
+            self.shown_captured_at = None
+            self.video_view.set_frame(None)
             
-    def update_frame(self):
-        """Update the video frame"""
-        if self.camera is not None:
-            ret, frame = self.camera.read()
-            if ret:
-                # Convert frame to RGB
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Convert to QImage
-                h, w, ch = rgb_frame.shape
-                bytes_per_line = ch * w
-                qt_image = QImage(rgb_frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-                
-                # Display image
-                self.video_label.setPixmap(QPixmap.fromImage(qt_image).scaled(
-                    self.video_label.size(), Qt.KeepAspectRatio))
-                
+    def update_frame(self, frame_id, captured_at, image):
+        """Show an RGB image rendered by the capture thread (wrapped, not copied)"""
+        if self.worker is None:
+            return
+        started = time.thread_time()
+        self.video_view.set_frame(image)
+        self.shown_captured_at = captured_at
+        self.set_frame_cpu = time.thread_time() - started
+        
+    def frame_painted(self):
+        """The last image is on screen: record latency and GUI cost, let the next frame through"""
+        if self.worker is not None and self.shown_captured_at is not None:
+            self.worker.frame_shown(self.shown_captured_at,
+                                    self.set_frame_cpu + self.video_view.paint_cpu)
+            self.shown_captured_at = None
+            
+    def view_resized(self, width, height):
+        if self.worker is not None:
+            self.worker.set_display_size(width, height)
+        
+    def update_status(self):
+        """Refresh the readiness, FPS and latency readout"""
+        lines = []
+        if self.status_fn is not None:
+            lines.append(self.status_fn())
+        if self.worker is not None:
+            lines.append(self.worker.status_text())
+        self.status_label.setText("\n".join(line for line in lines if line))
+            
+    def show_recognition_error(self, message):
+        self.status_label.setText(f"Recognition error: {message}")
+        
     def add_face(self):
         """Add a new face to the database"""
         name = self.name_input.text().strip()
@@ -102,17 +174,53 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please enter a name")
             return
             
-        if self.camera is None:
+        frame = self.worker.last_frame() if self.worker is not None else None
+        if self.camera is None or frame is None:
             QMessageBox.warning(self, "Warning", "Please start the camera first")
             return
             
-        # TODO: Implement face detection and database storage
-        QMessageBox.information(self, "Success", f"Added face for {name}")
+        # Detection and embedding take a while: they run on the recognition
+        # thread between two frames and face_added() reports the outcome
+        frame = frame.copy()
+        if self.add_face_fn is None or not self.worker.run_job(
+                lambda: self.add_face_fn(name, frame), self.face_added):
+            QMessageBox.warning(self, "Warning", "Face recognition is not available")
+            return
+        self.add_face_btn.setEnabled(False)
+        self.status_label.setText(f"Adding face for {name}...")
+        
+    def face_added(self, result, error):
+        self.add_face_btn.setEnabled(True)
+        if error is not None:
+            self.show_add_face_result(False, f"Failed to add face: {error}")
+        else:
+            self.show_add_face_result(*result)
+        
+    def show_add_face_result(self, success, message):
+        """Report the outcome of an enrolment"""
+        if success:
+            QMessageBox.information(self, "Success", message)
+            self.name_input.clear()
+        else:
+            QMessageBox.warning(self, "Warning", message)
         
     def list_faces(self):
         """List all known faces in the database"""
-        # TODO: Implement face listing
-        QMessageBox.information(self, "Known Faces", "List of known faces will be shown here")
+        # The application answers with show_known_faces()
+        self.list_faces_signal.emit()
+        
+    def show_known_faces(self, persons):
+        """
+        Show the known people
+        
+        Args:
+            persons: list of (person_id, name) tuples
+        """
+        if not persons:
+            QMessageBox.information(self, "Known Faces", "No known faces yet")
+            return
+        names = sorted(name for _, name in persons)
+        QMessageBox.information(self, "Known Faces", f"{len(names)} known people:\n" + "\n".join(names))
         
     def closeEvent(self, event):
         """Handle window close event"""
@@ -0,0 +1,72 @@
+import time
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+class VideoView(QWidget):
+    """
+    Paints RGB frames prepared by the capture thread
+
+    set_frame() wraps the numpy buffer in a QImage without copying it and
+    schedules a repaint; paintEvent() draws it centred on a black
+    background. There is no per-frame QPixmap, color conversion or scaling
+    on the GUI thread: the capture thread renders frames at the size
+    reported by size_changed.
+
+    The buffer must not be written while it is on screen, so the capture
+    thread alternates between two buffers and only renders the next frame
+    after frame_painted.
+    """
+
+    frame_painted = pyqtSignal()               # a new frame reached the screen
+    size_changed = pyqtSignal(int, int)        # view size in device pixels
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)  # every pixel is painted, skip the erase
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.frame = None     # numpy buffer behind self.image, kept alive while shown
+        self.image = None
+        self.new_frame = False
+        self.paint_cpu = 0.0  # GUI thread CPU seconds of the last paint
+
+    def device_size(self):
+        """View size in device pixels (the resolution frames should be rendered at)"""
+        ratio = self.devicePixelRatioF()
+        return int(self.width() * ratio), int(self.height() * ratio)
+
+    def set_frame(self, frame):
+        """
+        Show an RGB frame on the next repaint
+
+        Args:
+            frame: C-contiguous H x W x 3 uint8 RGB array, or None to clear
+        """
+        self.frame = frame
+        if frame is None:
+            self.image = None
+        else:
+            height, width = frame.shape[:2]
+            self.image = QImage(frame.data, width, height, frame.strides[0], QImage.Format_RGB888)
+            self.image.setDevicePixelRatio(self.devicePixelRatioF())
+            self.new_frame = True
+        self.update()
+
+    def paintEvent(self, event):
+        started = time.thread_time()
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.black)
+        if self.image is not None:
+            ratio = self.image.devicePixelRatio()
+            x = int((self.width() - self.image.width() / ratio) / 2)
+            y = int((self.height() - self.image.height() / ratio) / 2)
+            painter.drawImage(x, y, self.image)
+        painter.end()
+        self.paint_cpu = time.thread_time() - started
+        if self.new_frame:
+            self.new_frame = False
+            self.frame_painted.emit()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.size_changed.emit(*self.device_size())
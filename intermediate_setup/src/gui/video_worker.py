@@ -0,0 +1,225 @@
+import queue
+import threading
+import time
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from src.gui.display_frame import render_display
+from src.pipeline.latest_frame_queue import LatestFrameQueue
+from src.pipeline.stream_stats import StreamStats
+from src.utils.metrics import metrics
+
+class CaptureThread(QThread):
+    """Reads the camera, hands every frame to the recognition thread and renders frames for the GUI"""
+
+    frame_ready = pyqtSignal(int, float, object)  # frame_id, captured_at, RGB display image
+    finished_reading = pyqtSignal()               # end of a video file or camera failure
+
+    def __init__(self, capture, recognition_queue, stats, recognition_thread=None,
+                 display_size=(800, 600), parent=None):
+        super().__init__(parent)
+        self.capture = capture
+        self.recognition_queue = recognition_queue
+        self.stats = stats
+        self.recognition_thread = recognition_thread  # source of the overlays
+        self.display_size = display_size
+        self.last_frame = None  # newest BGR frame sent to the GUI, for enrolment
+        # Set while a frame is on its way to the screen; newer frames are dropped
+        # instead of queueing up behind it in the event loop
+        self.display_pending = threading.Event()
+        self.display_dropped = 0
+        self.display_rendered = 0
+
+    def frame_shown(self):
+        """Called by the GUI once it has painted the last frame"""
+        self.display_pending.clear()
+
+    def run(self):
+        frame_id = 0
+        failures = 0
+        while not self.isInterruptionRequested():
+            ret, frame = self.capture.read()
+            if not ret:
+                failures += 1
+                if failures > 200:  # ~1 s without a frame
+                    self.finished_reading.emit()
+                    return
+                time.sleep(0.005)
+                continue
+            failures = 0
+            frame_id += 1
+            captured_at = time.perf_counter()
+            self.stats.tick('captured', captured_at)
+
+            if self.recognition_queue.put((frame_id, captured_at, frame)):
+                metrics.inc('frames_dropped')
+            if self.display_pending.is_set():
+                self.display_dropped += 1
+                continue
+            self.display_pending.set()
+            results = self.recognition_thread.latest_results if self.recognition_thread else None
+            # Two display buffers, alternating per rendered frame (not per captured
+            # frame, which counts the dropped ones): the image on screen stays untouched
+            tag = f'view_rgb{self.display_rendered % 2}'
+            self.display_rendered += 1
+            image = render_display(frame, results, self.display_size, tag=tag)
+            self.last_frame = frame
+            self.frame_ready.emit(frame_id, captured_at, image)
+
+class RecognitionThread(QThread):
+    """Runs recognition on the newest captured frame, skipping the ones it missed"""
+
+    results_ready = pyqtSignal(int, object)  # frame_id, results
+    recognition_failed = pyqtSignal(str)
+    job_done = pyqtSignal(object, object, object)  # callback, result, exception
+
+    def __init__(self, recognize_fn, recognition_queue, stats, parent=None):
+        super().__init__(parent)
+        self.recognize_fn = recognize_fn
+        self.recognition_queue = recognition_queue
+        self.stats = stats
+        self.latest_results = None  # read by the capture thread for the overlays
+        self.jobs = queue.Queue()
+
+    def submit_job(self, fn, callback):
+        """Run fn() on this thread before the next frame, then emit job_done"""
+        self.jobs.put((fn, callback))
+
+    def run_jobs(self):
+        while True:
+            try:
+                fn, callback = self.jobs.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                self.job_done.emit(callback, fn(), None)
+            except Exception as e:
+                self.job_done.emit(callback, None, e)
+
+    def run(self):
+        while not self.isInterruptionRequested():
+            self.run_jobs()
+            item = self.recognition_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            frame_id, captured_at, frame = item
+            try:
+                results = self.recognize_fn(frame)
+            except Exception as e:
+                # Keep the UI alive; the window shows the error
+                self.recognition_failed.emit(str(e))
+                continue
+            done_at = time.perf_counter()
+            metrics.observe('recognition_latency', done_at - captured_at)
+            self.stats.tick('recognized', done_at)
+            self.stats.add_latency('recognition', done_at - captured_at)
+            self.latest_results = results
+            self.results_ready.emit(frame_id, results)
+
+class VideoWorker(QObject):
+    def __init__(self, capture, recognize_fn=None, display_size=(800, 600), parent=None):
+        """
+        Capture and recognition on QThreads for the GUI
+
+        The capture thread reads frames as fast as the camera delivers them
+        and emits frame_ready with an RGB image already scaled to the view
+        and annotated with the latest results; while the GUI is still busy
+        with the previous frame, new frames are dropped rather than queued. The
+        recognition thread always works on the newest frame (latest-frame-
+        wins queue) and emits results_ready, so a slow model lowers the
+        recognition rate but never the display rate or UI responsiveness.
+
+        Args:
+            capture: object with read() -> (ret, frame), e.g. cv2.VideoCapture
+            recognize_fn: callable(frame) -> results for draw_results(), run on
+                the recognition thread; None shows the video only
+            display_size: initial (width, height) of the view in device pixels
+        """
+        super().__init__(parent)
+        self.capture = capture
+        self.stats = StreamStats()
+        self.recognition_queue = LatestFrameQueue(1)
+        self.recognition_thread = None
+        if recognize_fn is not None:
+            self.recognition_thread = RecognitionThread(recognize_fn, self.recognition_queue, self.stats)
+            self.recognition_thread.job_done.connect(self.finish_job)
+        self.capture_thread = CaptureThread(capture, self.recognition_queue, self.stats,
+                                            self.recognition_thread, display_size)
+
+    @property
+    def frame_ready(self):
+        return self.capture_thread.frame_ready
+
+    @property
+    def results_ready(self):
+        return self.recognition_thread.results_ready if self.recognition_thread else None
+
+    def run_job(self, fn, callback):
+        """
+        Run fn() on the recognition thread, between two frames
+
+        Work that uses the models (e.g. enrolment) runs there so it neither
+        blocks the GUI nor races with recognition over the detector and the
+        recognizer's cache.
+
+        Args:
+            fn: callable() run on the recognition thread
+            callback: callable(result, exception) called on the GUI thread
+                afterwards; exception is None if fn() returned normally
+
+        Returns:
+            False if there is no recognition thread to run it
+        """
+        if self.recognition_thread is None:
+            return False
+        self.recognition_thread.submit_job(fn, callback)
+        return True
+
+    def finish_job(self, callback, result, error):
+        callback(result, error)
+
+    def set_display_size(self, width, height):
+        """Render the following frames for a view of this size (device pixels)"""
+        self.capture_thread.display_size = (max(1, width), max(1, height))
+
+    def last_frame(self):
+        """Newest full-resolution BGR frame sent to the view, or None"""
+        return self.capture_thread.last_frame
+
+    def start(self):
+        self.capture_thread.start()
+        if self.recognition_thread is not None:
+            self.recognition_thread.start()
+
+    def stop(self, timeout_ms=2000):
+        """Stop both threads and wait for them to finish"""
+        for thread in (self.capture_thread, self.recognition_thread):
+            if thread is not None:
+                thread.requestInterruption()
+        self.recognition_queue.close()
+        for thread in (self.capture_thread, self.recognition_thread):
+            if thread is not None:
+                thread.wait(timeout_ms)
+
+    def frame_shown(self, captured_at, gui_cpu=None):
+        """
+        Record that a frame is on screen and allow the next one to be sent
+
+        Args:
+            captured_at: perf_counter() time the frame was read
+            gui_cpu: GUI thread CPU seconds spent on the frame, if measured
+        """
+        shown_at = time.perf_counter()
+        metrics.observe('end_to_end_latency', shown_at - captured_at)
+        self.stats.tick('displayed', shown_at)
+        self.stats.add_latency('end_to_end', shown_at - captured_at)
+        if gui_cpu is not None:
+            metrics.observe('gui_frame_cpu', gui_cpu)
+            self.stats.add_latency('gui_cpu', gui_cpu)
+        self.capture_thread.frame_shown()
+
+    def status_text(self):
+        """FPS and latency readout for the window"""
+        return (f"Display {self.stats.fps('displayed'):.0f} fps | "
+                f"Recognition {self.stats.fps('recognized'):.1f} fps\n"
+                f"Recognition latency {self.stats.latency_ms('recognition'):.0f} ms | "
+                f"End-to-end {self.stats.latency_ms('end_to_end'):.0f} ms\n"
+                f"GUI thread {self.stats.latency_ms('gui_cpu'):.2f} ms CPU/frame")
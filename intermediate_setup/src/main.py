@@ -1,31 +1,90 @@
+import argparse
 import os
 import sys
+import threading
 import cv2
-from PyQt5.QtWidgets import QApplication
-from gui.main_window import MainWindow
-from detection.face_detector import FaceDetector
-from alignment.face_aligner import FaceAligner
-from recognition.feature_extractor import FeatureExtractor
-from data.face_database import FaceDatabase
+
+# Make the `src.` package importable when run as `python src/main.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.pipeline.components import RecognitionComponents
+from src.utils.startup_timer import StartupTimer
+from src.utils.metrics import start_reporting
+from src.utils.profiling import create_profiler
 
 class FaceRecognitionApp:
-    def __init__(self):
-        # Initialize components
-        self.face_detector = FaceDetector()
-        self.face_aligner = FaceAligner()  # Will use default path
-        self.feature_extractor = FeatureExtractor()
-        self.face_database = FaceDatabase()
+    def __init__(self, model_name="VGG-Face", warm_up=True, source=0, replay_speed=1.0,
+                 profiler=None):
+        self.startup_timer = StartupTimer()
+        self.profiler = profiler
+
+        # Load the models once, in the background while the window comes up;
+        # the recognizer is created when they are ready. Recognition and
+        # enrolment both run on the window's recognition thread
+        self.components = RecognitionComponents(model_name, warm_up=warm_up,
+                                                startup_timer=self.startup_timer,
+                                                background=True)
+        self.face_detector = None
+        self.face_aligner = None
+        self.feature_extractor = None
+        self.face_database = None
+        self.recognizer = None
+        self.quality_gate = None
+        self.recognizer_lock = threading.Lock()
         
         # Initialize GUI
-        self.app = QApplication(sys.argv)
-        self.main_window = MainWindow()
+        with self.startup_timer.stage('gui'):
+            from PyQt5.QtWidgets import QApplication
+            from src.gui.main_window import MainWindow
+            self.app = QApplication(sys.argv)
+            self.main_window = MainWindow(source=source, replay_speed=replay_speed,
+                                          profiler=profiler, recognize_fn=self.recognize_face,
+                                          status_fn=self.loading_status, add_face_fn=self.add_face)
         
         # Connect GUI signals
-        self.main_window.add_face_signal.connect(self.add_face)
-        self.main_window.list_faces_signal.connect(self.list_faces)
+        self.main_window.list_faces_signal.connect(self.on_list_faces)
+        self.main_window.video_view.frame_painted.connect(self.on_frame_painted)
+        
+    def models_ready(self):
+        """
+        Finish setting up once the components have loaded (never blocks)
+
+        Returns:
+            True if the recognizer is available
+        """
+        with self.recognizer_lock:
+            if self.recognizer is not None:
+                return True
+            if not self.components.ready():
+                return False
+            self.face_detector = self.components.face_detector
+            self.face_aligner = self.components.face_aligner
+            self.feature_extractor = self.components.feature_extractor
+            self.face_database = self.components.face_database
+            recognizer = self.components.create_recognizer()
+            self.quality_gate = recognizer.quality_gate
+            self.recognizer = recognizer
+            return True
+        
+    def loading_status(self):
+        """Readiness line for the status panel, None once recognition runs"""
+        if self.recognizer is not None:
+            return None
+        return self.components.status_text()
+        
+    def on_frame_painted(self):
+        if self.startup_timer.mark('first_frame'):
+            print(f"First frame after {self.startup_timer.milestones['first_frame']:.2f} s "
+                  f"({self.components.status_text()})")
+        
+    def on_list_faces(self):
+        self.main_window.show_known_faces(self.list_faces())
         
     def add_face(self, name, frame):
-        """Add a new face to the database"""
+        """Add a new face to the database (runs on the GUI's recognition thread, between frames)"""
+        if not self.models_ready():
+            return False, f"Models are still loading ({self.components.status_text()})"
+            
         # Detect faces
         faces = self.face_detector.detect_faces(frame)
         if not faces:
@@ -44,51 +103,72 @@ class FaceRecognitionApp:
             
         # Add to database
         person_id = self.face_database.add_person(name)
-        self.face_database.add_face(person_id, features, None)  # No image path for now
+        self.face_database.add_face(person_id, features, None,  # No image path for now
+                                    model_name=self.feature_extractor.model_name)
+        # Cached "Unknown" identities may now be wrong; this is the thread that uses the cache
+        self.recognizer.cache.clear()
         
         return True, f"Added face for {name}"
         
     def list_faces(self):
         """List all known faces in the database"""
+        if not self.models_ready():
+            return []
         return self.face_database.get_all_persons()
         
     def recognize_face(self, frame):
-        """Recognize faces in a frame"""
-        # Detect faces
-        faces = self.face_detector.detect_faces(frame)
-        if not faces:
+        """Recognize faces in a frame (runs on the GUI's recognition thread)"""
+        if not self.models_ready():
+            if self.components.error is not None:
+                raise self.components.error
             return []
-            
         results = []
-        for face in faces:
-            # Align face
-            aligned_face = self.face_aligner.align_face(frame, face)
-            
-            # Extract features
-            features = self.feature_extractor.extract_features(aligned_face)
-            if features is None:
-                continue
-                
-            # Search database
-            match = self.face_database.search_face(features)
-            if match:
-                person_id, name, similarity = match
-                results.append({
-                    'face': face,
-                    'name': name,
-                    'similarity': similarity
-                })
+        for result in self.recognizer.recognize(frame):
+            results.append({
+                'face': result['face'],
+                'box': result['box'],
+                'person_id': result['person_id'],
+                'name': result['name'],
+                'similarity': result['similarity']
+            })
                 
+        if self.startup_timer.mark('first_recognition'):
+            print(self.startup_timer.report())
         return results
         
     def run(self):
         """Run the application"""
         self.main_window.show()
+        self.startup_timer.mark('window_shown')
+        if self.profiler is not None:
+            self.profiler.open_window()
         return self.app.exec_()
 
 def main():
-    app = FaceRecognitionApp()
-    sys.exit(app.run())
+    parser = argparse.ArgumentParser(description='Face recognition GUI')
+    parser.add_argument('--source', default='0',
+                        help='Camera index, video file/recording or stream URL (default: 0)')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='Speed for video files: 1 = recorded timing, 0 = as fast as possible')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile with cProfile and tracemalloc; Ctrl+P for a new capture '
+                             '(also: FACE_PROFILE=1)')
+    parser.add_argument('--profile-dir', default=None,
+                        help='Directory for the profile dumps (default: $FACE_PROFILE_DIR or ./profiles)')
+    args = parser.parse_args()
+
+    # Enabled through FACE_METRICS=1 / FACE_METRICS_FILE
+    reporter = start_reporting()
+    profiler = create_profiler(args.profile, args.profile_dir)
+    app = FaceRecognitionApp(source=args.source, replay_speed=args.replay_speed, profiler=profiler)
+    try:
+        status = app.run()
+    finally:
+        if profiler is not None:
+            profiler.stop()
+        if reporter is not None:
+            reporter.stop()
+    sys.exit(status)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
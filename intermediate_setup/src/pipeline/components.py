@@ -0,0 +1,176 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from src.detection.face_detector import FaceDetector, ThreadLocalFaceDetector
+from src.alignment.face_aligner import FaceAligner
+from src.recognition.feature_extractor import FeatureExtractor
+from src.data.face_database import FaceDatabase
+from src.data.sharded_search import ShardedFaceDatabase
+from src.quality.face_quality import FaceQualityGate
+from src.tracking.face_tracker import FaceTracker
+from src.tracking.recognition_cache import RecognitionCache
+from src.pipeline.frame_recognizer import FrameRecognizer
+from src.utils.startup_timer import StartupTimer
+
+class RecognitionComponents:
+    def __init__(self, model_name="VGG-Face", engine="tensorflow", onnx_threads=None,
+                 quantize=False, db_path="face_database.db", warm_up=True,
+                 thread_safe_detector=False, startup_timer=None, parallel=True, background=False,
+                 search_shards=None):
+        """
+        Load the detector, aligner, feature extractor and database once
+
+        The loaded models can be shared by any number of FrameRecognizers,
+        e.g. one per camera, instead of loading the ~100 MB landmark model and
+        the embedding weights once per stream.
+
+        The four components are loaded on their own threads at the same time,
+        so start-up takes closer to the slowest one (the landmark model or
+        the embedding model) than to the sum; how much overlaps depends on
+        how much of each load runs in native code. With background=True the
+        constructor returns immediately: the application can show its window
+        or camera preview while the models load, poll ready() and
+        status_text(), and call wait() or create_recognizer() once it needs
+        them. The component attributes are None until their load finishes.
+
+        Args:
+            model_name: embedding backend, see backends.available_backends()
+            engine: "tensorflow" or "onnx" inference for the embedding model
+            onnx_threads: intra-op threads for the ONNX engine
+            quantize: use the int8-quantized ONNX model
+            db_path: path to the SQLite face database
+            warm_up: run one dummy inference after loading the embedding model
+            thread_safe_detector: give every thread its own dlib detector, for
+                recognizers driven by a pool of worker threads
+            startup_timer: StartupTimer to record the loading times in
+            parallel: load the components concurrently (False: one after another)
+            background: return before the components are loaded
+            search_shards: search the gallery with a ShardedFaceDatabase of
+                this many processes (for galleries too large for one process);
+                call close() to stop them
+        """
+        self.startup_timer = startup_timer or StartupTimer()
+        self.face_detector = None
+        self.face_aligner = None
+        self.feature_extractor = None
+        self.face_database = None
+
+        def load_detector():
+            if thread_safe_detector:
+                return ThreadLocalFaceDetector().load()
+            return FaceDetector()
+
+        def load_feature_extractor():
+            feature_extractor = FeatureExtractor(model_name, engine=engine,
+                                                 onnx_threads=onnx_threads,
+                                                 quantize=quantize)
+            if warm_up:
+                with self.startup_timer.stage('feature_extractor_warm_up'):
+                    feature_extractor.warm_up()
+            return feature_extractor
+
+        def load_database():
+            if search_shards:
+                return ShardedFaceDatabase(db_path, search_shards, model_name).start()
+            return FaceDatabase(db_path)
+
+        # Each loader builds one component and loads its model exactly once
+        loaders = [
+            ('face_detector', load_detector),
+            ('face_aligner', FaceAligner),  # Will use default path
+            ('feature_extractor', load_feature_extractor),
+            ('face_database', load_database),
+        ]
+        self.lock = threading.Lock()
+        self.states = {name: 'loading' for name, _ in loaders}
+        self.error = None  # first load failure, re-raised by wait()
+
+        if not parallel:
+            for name, loader in loaders:
+                self._load(name, loader)
+            self.futures = {}
+            return
+
+        executor = ThreadPoolExecutor(max_workers=len(loaders), thread_name_prefix='load')
+        self.futures = {name: executor.submit(self._load, name, loader) for name, loader in loaders}
+        executor.shutdown(wait=False)
+        if not background:
+            self.wait()
+
+    def _load(self, name, loader):
+        try:
+            with self.startup_timer.stage(name):
+                component = loader()
+        except Exception as e:
+            with self.lock:
+                self.states[name] = 'failed'
+                if self.error is None:
+                    self.error = e
+            print(f"Error loading {name}: {str(e)}")
+            raise
+        setattr(self, name, component)
+        with self.lock:
+            self.states[name] = 'ready'
+
+    def ready(self):
+        """True once every component is loaded"""
+        with self.lock:
+            return all(state == 'ready' for state in self.states.values())
+
+    def wait(self, timeout=None):
+        """
+        Wait for the components to finish loading
+
+        Args:
+            timeout: seconds to wait at most (None: until done)
+
+        Returns:
+            True if all components are loaded, False on timeout
+
+        Raises:
+            the exception of the first component that failed to load
+        """
+        wait_futures(list(self.futures.values()), timeout)
+        if self.error is not None:
+            raise self.error
+        return self.ready()
+
+    def status(self):
+        """Load state of each component: 'loading', 'ready' or 'failed'"""
+        with self.lock:
+            return dict(self.states)
+
+    def status_text(self):
+        """One-line readiness summary for a status bar or overlay"""
+        states = self.status()
+        failed = [name for name, state in states.items() if state == 'failed']
+        if failed:
+            return f"Failed to load {', '.join(failed)}: {self.error}"
+        loading = [name for name, state in states.items() if state == 'loading']
+        if loading:
+            return f"Loading {', '.join(loading)}..."
+        return "Models ready"
+
+    def close(self):
+        """Stop the search shard processes, if any"""
+        if isinstance(self.face_database, ShardedFaceDatabase):
+            self.face_database.stop()
+
+    def create_recognizer(self, quality_gate=True, tracking=True, refresh_interval=30):
+        """
+        Create a FrameRecognizer for one video stream
+
+        The models are shared; the quality gate counters, tracker and cache
+        belong to the new recognizer. Waits for the components if they are
+        still loading.
+
+        Args:
+            quality_gate: skip tiny, blurry, dark or turned faces before embedding
+            tracking: reuse the identity of tracked faces instead of re-embedding them
+            refresh_interval: processed frames after which a tracked face is re-embedded
+        """
+        self.wait()
+        return FrameRecognizer(
+            self.face_detector, self.face_aligner, self.feature_extractor, self.face_database,
+            quality_gate=FaceQualityGate() if quality_gate else None,
+            tracker=FaceTracker() if tracking else None,
+            cache=RecognitionCache(refresh_interval=refresh_interval) if tracking else None)
@@ -0,0 +1,154 @@
+import time
+from src.utils.buffer_pool import buffer_pool
+from src.utils.metrics import metrics
+
+class FrameRecognizer:
+    def __init__(self, face_detector, face_aligner, feature_extractor, face_database,
+                 quality_gate=None, tracker=None, cache=None, threshold=0.6):
+        """
+        Run detection, quality gating, alignment, embedding and search on frames
+
+        The model components can be shared between several recognizers (e.g.
+        one per camera); the tracker and cache hold per-stream state and must
+        not be shared.
+
+        Args:
+            face_detector: FaceDetector
+            face_aligner: FaceAligner
+            feature_extractor: FeatureExtractor
+            face_database: FaceDatabase
+            quality_gate: optional FaceQualityGate
+            tracker: optional FaceTracker; required for the cache
+            cache: optional RecognitionCache keyed by track ID
+            threshold: similarity threshold for a database match
+        """
+        if cache is not None and tracker is None:
+            raise ValueError("A recognition cache needs a tracker to key its entries")
+        self.face_detector = face_detector
+        self.face_aligner = face_aligner
+        self.feature_extractor = feature_extractor
+        self.face_database = face_database
+        self.quality_gate = quality_gate
+        self.tracker = tracker
+        self.cache = cache
+        self.threshold = threshold
+        self.frame_index = 0
+        self.stage_times = {}  # stage name -> accumulated seconds
+
+    def _add_time(self, stage, started_at):
+        """Add the time since `started_at` to a stage and return the current time"""
+        now = time.perf_counter()
+        self.stage_times[stage] = self.stage_times.get(stage, 0.0) + now - started_at
+        return now
+
+    def _identify(self, frame, face, landmarks):
+        """Embed a face and search the database; returns (extracted, match or None)"""
+        started_at = time.perf_counter()
+        # The aligned crop is embedded right away, so it can live in a reused buffer
+        width, height = self.face_aligner.desired_size
+        dst = buffer_pool.get((height, width) + frame.shape[2:], frame.dtype, 'aligned')
+        aligned_face = self.face_aligner.align_face(frame, face, landmarks, dst=dst)
+        started_at = self._add_time('align', started_at)
+        features = self.feature_extractor.extract_features(aligned_face)
+        started_at = self._add_time('embed', started_at)
+        if features is None:
+            return False, None
+        match = self.face_database.search_face(
+            features, self.threshold, model_name=self.feature_extractor.model_name)
+        self._add_time('search', started_at)
+        return True, match
+
+    @metrics.timed('frame')
+    def recognize(self, frame):
+        """
+        Recognize all faces in a frame
+
+        Args:
+            frame: numpy array of the image in BGR format
+
+        Returns:
+            list of dicts with 'face' (dlib rectangle), 'box' (x, y, w, h),
+            'track_id', 'person_id', 'name', 'similarity', 'quality' and
+            'cached' (True when the identity was reused from the cache)
+        """
+        self.frame_index += 1
+        started_at = time.perf_counter()
+        faces = self.face_detector.detect_faces(frame)
+        started_at = self._add_time('detect', started_at)
+        boxes = [(face.left(), face.top(), face.right() - face.left(), face.bottom() - face.top())
+                 for face in faces]
+
+        if self.tracker is not None:
+            track_ids, ended_track_ids = self.tracker.update(boxes)
+            if self.cache is not None:
+                self.cache.expire(ended_track_ids)
+        else:
+            track_ids = [None] * len(faces)
+
+        # Score all faces first so unusable crops never reach the CNN
+        landmarks = [self.face_aligner.get_landmarks(frame, face) for face in faces]
+        started_at = self._add_time('landmarks', started_at)
+        if self.quality_gate is not None:
+            qualities = self.quality_gate.assess(frame, faces, landmarks)
+            self._add_time('quality', started_at)
+        else:
+            qualities = [None] * len(faces)
+
+        metrics.inc('frames')
+        metrics.inc('faces', len(faces))
+        results = []
+        for face, box, track_id, face_landmarks, quality in zip(faces, boxes, track_ids, landmarks, qualities):
+            result = {
+                'face': face,
+                'box': box,
+                'track_id': track_id,
+                'person_id': None,
+                'name': "Unknown",
+                'similarity': 0.0,
+                'quality': quality,
+                'cached': False
+            }
+            quality_score = self.quality_gate.score(quality) if quality is not None else 0.0
+            entry = self.cache.get(track_id) if self.cache is not None else None
+
+            if quality is not None and not quality['passed']:
+                # Defer: keep showing the last identity of this track, if any
+                if entry is not None:
+                    result.update(person_id=entry['person_id'], name=entry['name'],
+                                  similarity=entry['similarity'], cached=True)
+                else:
+                    result.update(name="Low quality", similarity=None)
+                metrics.inc('faces_low_quality')
+                results.append(result)
+                continue
+
+            if self.cache is not None:
+                entry = self.cache.lookup(track_id, self.frame_index, quality_score)
+                if entry is not None:
+                    result.update(person_id=entry['person_id'], name=entry['name'],
+                                  similarity=entry['similarity'], cached=True)
+                    metrics.inc('faces_cached')
+                    results.append(result)
+                    continue
+
+            extracted, match = self._identify(frame, face, face_landmarks)
+            metrics.inc('faces_embedded')
+            if not extracted:
+                continue
+            if self.cache is not None:
+                self.cache.update(track_id, self.frame_index, match, quality_score)
+            if match:
+                person_id, name, similarity = match
+                result.update(person_id=person_id, name=name, similarity=similarity)
+            results.append(result)
+
+        return results
+
+    def report(self):
+        """Summary lines of the quality gate and cache counters"""
+        lines = []
+        if self.quality_gate is not None:
+            lines.append(self.quality_gate.report())
+        if self.cache is not None:
+            lines.append(self.cache.report())
+        return "\n".join(lines)
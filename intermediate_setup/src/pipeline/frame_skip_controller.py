@@ -0,0 +1,141 @@
+import math
+import threading
+from collections import deque
+
+class AdaptiveFrameSkipController:
+    def __init__(self, target_latency_ms=None, target_cpu=0.6, min_interval=1, max_interval=15,
+                 initial_interval=3, window=10, hysteresis=0.2):
+        """
+        Choose how many frames to skip between recognitions at runtime
+
+        A fixed "process every 3rd frame" wastes a fast machine and overloads
+        a slow one or a crowded scene. The controller measures recent
+        recognition runs and moves the interval toward a target:
+
+        - target_latency_ms: mean capture-to-result latency of recognized frames
+        - target_cpu: duty cycle of the recognition thread, i.e. the fraction
+          of wall time it spends inside process_frame (used when no latency
+          target is given)
+
+        The interval only changes when the measurement leaves the band
+        target * (1 +/- hysteresis), and a new measurement window is collected
+        after every change, so it does not oscillate.
+
+        Args:
+            target_latency_ms: latency target in milliseconds
+            target_cpu: duty cycle target between 0 and 1
+            min_interval: process at most every min_interval-th frame
+            max_interval: process at least every max_interval-th frame
+            initial_interval: interval before the first adjustment
+            window: recognitions measured before each adjustment
+            hysteresis: relative dead band around the target
+        """
+        if target_latency_ms is None and target_cpu is None:
+            raise ValueError("Either target_latency_ms or target_cpu is required")
+        if min_interval < 1 or max_interval < min_interval:
+            raise ValueError("Need 1 <= min_interval <= max_interval")
+        self.target_latency_ms = target_latency_ms
+        self.target_cpu = target_cpu
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.hysteresis = hysteresis
+        self.lock = threading.Lock()
+        self.samples = deque(maxlen=window)  # (started_at, finished_at, latency_s)
+        self.interval = min(max(initial_interval, min_interval), max_interval)
+        self.last_processed_id = None
+        self.adjustments = 0
+
+    @classmethod
+    def fixed(cls, interval):
+        """Controller that always processes every `interval`-th frame"""
+        return cls(min_interval=interval, max_interval=interval, initial_interval=interval)
+
+    @property
+    def adaptive(self):
+        return self.min_interval != self.max_interval
+
+    def should_process(self, frame_id):
+        """True if `frame_id` is far enough from the last processed frame"""
+        with self.lock:
+            if self.last_processed_id is not None and frame_id - self.last_processed_id < self.interval:
+                return False
+            self.last_processed_id = frame_id
+            return True
+
+    def reset(self):
+        """Forget the last processed frame, e.g. when frame IDs restart"""
+        with self.lock:
+            self.last_processed_id = None
+            self.samples.clear()
+
+    def record(self, started_at, finished_at, captured_at=None):
+        """
+        Report one recognition run and adapt the interval
+
+        Args:
+            started_at: perf_counter() when processing started
+            finished_at: perf_counter() when processing finished
+            captured_at: perf_counter() when the frame was captured (defaults
+                to started_at)
+        """
+        captured_at = started_at if captured_at is None else captured_at
+        with self.lock:
+            self.samples.append((started_at, finished_at, finished_at - captured_at))
+            if not self.adaptive or len(self.samples) < self.samples.maxlen:
+                return
+            ratio = self._load_ratio()
+            if ratio is None or (1 - self.hysteresis) <= ratio <= (1 + self.hysteresis):
+                return
+
+            # Proportional step, at least one frame, clamped to the allowed range
+            if ratio > 1:
+                interval = max(self.interval + 1, math.ceil(self.interval * ratio))
+            else:
+                interval = min(self.interval - 1, math.floor(self.interval * ratio))
+            interval = min(max(interval, self.min_interval), self.max_interval)
+            if interval != self.interval:
+                self.interval = interval
+                self.adjustments += 1
+                self.samples.clear()
+
+    def _load_ratio(self):
+        """Measurement divided by target (call with the lock held)"""
+        if self.target_latency_ms is not None:
+            mean_latency = sum(s[2] for s in self.samples) / len(self.samples)
+            return mean_latency * 1000 / self.target_latency_ms
+        elapsed = self.samples[-1][1] - self.samples[0][0]
+        if elapsed <= 0:
+            return None
+        return self.cpu_usage() / self.target_cpu
+
+    def cpu_usage(self):
+        """Recent duty cycle of the recognition thread (0 to 1)"""
+        samples = list(self.samples)
+        if len(samples) < 2:
+            return 0.0
+        elapsed = samples[-1][1] - samples[0][0]
+        busy = sum(finished - started for started, finished, _ in samples)
+        return min(busy / elapsed, 1.0) if elapsed > 0 else 0.0
+
+    def latency_ms(self):
+        """Mean capture-to-result latency of the recent recognitions"""
+        samples = list(self.samples)
+        if not samples:
+            return 0.0
+        return sum(s[2] for s in samples) / len(samples) * 1000
+
+    def status_text(self):
+        """Short description for an on-screen overlay"""
+        return f"1/{self.interval} frames"
+
+    def report(self):
+        """One-line summary of the current rate and target"""
+        if not self.adaptive:
+            return f"Frame skip (fixed): every {self.interval} frame(s)"
+        if self.target_latency_ms is not None:
+            target = f"target latency {self.target_latency_ms:.0f} ms"
+        else:
+            target = f"target CPU {self.target_cpu * 100:.0f}%"
+        return (f"Frame skip (adaptive, {target}): every {self.interval} frame(s), "
+                f"{self.adjustments} adjustment(s), latency {self.latency_ms():.0f} ms, "
+                f"CPU {self.cpu_usage() * 100:.0f}%")
@@ -0,0 +1,65 @@
+import threading
+from collections import deque
+
+class LatestFrameQueue:
+    def __init__(self, maxsize=1):
+        """
+        Bounded queue that drops the oldest item when full
+
+        A slow consumer therefore always gets the most recent frame instead
+        of working through a backlog of stale ones.
+
+        Args:
+            maxsize: number of items kept
+        """
+        self.items = deque(maxlen=maxsize)
+        self.condition = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        """
+        Add an item, discarding the oldest one if the queue is full
+
+        Returns:
+            True if an older item was dropped
+        """
+        with self.condition:
+            dropped = len(self.items) == self.items.maxlen
+            if dropped:
+                self.dropped += 1
+            self.items.append(item)
+            self.condition.notify()
+            return dropped
+
+    def get(self, timeout=None):
+        """
+        Remove and return the oldest item
+
+        Args:
+            timeout: seconds to wait for an item (None waits forever)
+
+        Returns:
+            the item, or None on timeout or once the queue is closed and empty
+        """
+        with self.condition:
+            if not self.items and not self.closed:
+                self.condition.wait(timeout)
+            if self.items:
+                return self.items.popleft()
+            return None
+
+    def close(self):
+        """Wake up all waiting consumers; get() returns None from now on once empty"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def reopen(self):
+        with self.condition:
+            self.closed = False
+            self.items.clear()
+
+    def __len__(self):
+        with self.condition:
+            return len(self.items)
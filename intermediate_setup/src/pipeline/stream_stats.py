@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+
+class StreamStats:
+    def __init__(self, window=120):
+        """
+        Rolling frame rates and latencies of a video stream
+
+        Args:
+            window: number of recent events kept per measurement
+        """
+        self.window = window
+        self.lock = threading.Lock()
+        self.events = {}     # name -> deque of event timestamps
+        self.latencies = {}  # name -> deque of latencies in milliseconds
+        self.counts = {}     # name -> total number of events
+
+    def tick(self, name, timestamp=None):
+        """Record one event (e.g. 'captured', 'recognized', 'displayed')"""
+        timestamp = time.perf_counter() if timestamp is None else timestamp
+        with self.lock:
+            self.events.setdefault(name, deque(maxlen=self.window)).append(timestamp)
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def add_latency(self, name, seconds):
+        """Record a latency measurement"""
+        with self.lock:
+            self.latencies.setdefault(name, deque(maxlen=self.window)).append(seconds * 1000)
+
+    def fps(self, name):
+        """Events per second over the window, 0.0 if unknown"""
+        with self.lock:
+            events = self.events.get(name)
+            if not events or len(events) < 2:
+                return 0.0
+            elapsed = events[-1] - events[0]
+            return (len(events) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def latency_ms(self, name, percentile=50):
+        """Latency percentile over the window in milliseconds, 0.0 if unknown"""
+        with self.lock:
+            latencies = self.latencies.get(name)
+            if not latencies:
+                return 0.0
+            return float(np.percentile(latencies, percentile))
+
+    def count(self, name):
+        with self.lock:
+            return self.counts.get(name, 0)
+
+    def summary(self):
+        """
+        Snapshot of all measurements
+
+        Returns:
+            dict with '<name>_fps', '<name>_count' and '<name>_ms_p50/p95'
+        """
+        summary = {}
+        for name in list(self.events):
+            summary[f"{name}_fps"] = self.fps(name)
+            summary[f"{name}_count"] = self.count(name)
+        for name in list(self.latencies):
+            summary[f"{name}_ms_p50"] = self.latency_ms(name, 50)
+            summary[f"{name}_ms_p95"] = self.latency_ms(name, 95)
+        return summary
@@ -0,0 +1,182 @@
+import threading
+import time
+from src.pipeline.frame_skip_controller import AdaptiveFrameSkipController
+from src.pipeline.latest_frame_queue import LatestFrameQueue
+from src.pipeline.stream_stats import StreamStats
+from src.utils.metrics import metrics
+
+class ThreadedPipeline:
+    def __init__(self, capture, process_fn, process_every_n_frames=1, queue_size=1,
+                 frame_skip=None):
+        """
+        Capture, recognition and rendering decoupled by latest-frame-wins queues
+
+        A capture thread reads the camera as fast as it delivers frames and
+        hands each one to both the display queue and the recognition queue.
+        A recognition thread always works on the newest frame, so a slow
+        frame never stalls capture and stale frames never pile up. Rendering
+        happens in the caller's thread (OpenCV/Qt windows must be driven from
+        the main thread) via next_frame().
+
+        Args:
+            capture: object with read() -> (ret, frame), e.g. cv2.VideoCapture
+            process_fn: callable(frame) -> results, run on the recognition thread
+            process_every_n_frames: only recognize frames whose index is at least
+                this far from the last recognized one (ignored with frame_skip)
+            queue_size: capacity of each queue
+            frame_skip: AdaptiveFrameSkipController that picks the interval at
+                runtime instead of process_every_n_frames
+        """
+        self.capture = capture
+        self.process_fn = process_fn
+        self.frame_skip = frame_skip or AdaptiveFrameSkipController.fixed(process_every_n_frames)
+        self.display_queue = LatestFrameQueue(queue_size)
+        self.recognition_queue = LatestFrameQueue(queue_size)
+        self.stats = StreamStats()
+
+        self.results_lock = threading.Lock()
+        self.latest_results = None
+        self.latest_results_frame_id = None
+
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.error = None
+
+    def start(self):
+        """
+        Start the capture and recognition threads
+
+        Raises:
+            RuntimeError: if the threads of an earlier stop() have still not exited
+        """
+        if self.threads:
+            if not self.stop_event.is_set():
+                return
+            if not self.stop():
+                raise RuntimeError("The previous capture thread is still running")
+        self.stop_event.clear()
+        self.frame_skip.reset()  # frame IDs restart at 1
+        self.display_queue.reopen()
+        self.recognition_queue.reopen()
+        self.threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._recognition_loop, name="recognition", daemon=True)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, timeout=2.0):
+        """
+        Stop both threads and wait for them to finish
+
+        Returns:
+            True once both have exited. False if one is still running after
+            `timeout` seconds (e.g. the capture thread is stuck in read()):
+            it stays in self.threads, and the capture must not be read or
+            released until a later stop() returns True.
+        """
+        self.stop_event.set()
+        self.display_queue.close()
+        self.recognition_queue.close()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = [thread for thread in self.threads if thread.is_alive()]
+        return not self.threads
+
+    @property
+    def running(self):
+        return bool(self.threads) and not self.stop_event.is_set()
+
+    def _capture_loop(self):
+        frame_id = 0
+        while not self.stop_event.is_set():
+            ret, frame = self.capture.read()
+            if not ret:
+                time.sleep(0.005)
+                continue
+            frame_id += 1
+            captured_at = time.perf_counter()
+            self.stats.tick('captured', captured_at)
+
+            item = (frame_id, captured_at, frame)
+            self.display_queue.put(item)
+            if self.recognition_queue.put(item):
+                metrics.inc('frames_dropped')
+
+    def _recognition_loop(self):
+        while not self.stop_event.is_set():
+            item = self.recognition_queue.get(timeout=0.1)
+            if item is None:
+                continue
+            frame_id, captured_at, frame = item
+            if not self.frame_skip.should_process(frame_id):
+                metrics.inc('frames_skipped')
+                continue
+
+            started_at = time.perf_counter()
+            try:
+                results = self.process_fn(frame)
+            except Exception as e:
+                # Keep the UI alive; the error is reported by the caller
+                self.error = e
+                print(f"Error in recognition thread: {str(e)}")
+                continue
+
+            done_at = time.perf_counter()
+            self.frame_skip.record(started_at, done_at, captured_at)
+            metrics.observe('recognition_latency', done_at - captured_at)
+            metrics.set('frame_skip_interval', self.frame_skip.interval)
+            with self.results_lock:
+                self.latest_results = results
+                self.latest_results_frame_id = frame_id
+            self.stats.tick('recognized', done_at)
+            self.stats.add_latency('recognition', done_at - captured_at)
+
+    def next_frame(self, timeout=1.0):
+        """
+        Get the newest captured frame and the newest recognition results
+
+        Call from the render thread, then report the frame as shown with
+        frame_displayed() so end-to-end latency is measured.
+
+        Returns:
+            (frame_id, captured_at, frame, results), or None on timeout
+        """
+        item = self.display_queue.get(timeout)
+        if item is None:
+            return None
+        frame_id, captured_at, frame = item
+        with self.results_lock:
+            results = self.latest_results
+        return frame_id, captured_at, frame, results
+
+    def frame_displayed(self, captured_at):
+        """Record that a frame captured at `captured_at` is now on screen"""
+        displayed_at = time.perf_counter()
+        metrics.observe('end_to_end_latency', displayed_at - captured_at)
+        self.stats.tick('displayed', displayed_at)
+        self.stats.add_latency('end_to_end', displayed_at - captured_at)
+
+    def status_text(self):
+        """Short status line for an on-screen overlay"""
+        return (f"Display {self.stats.fps('displayed'):.0f} fps | "
+                f"Recognition {self.stats.fps('recognized'):.1f} fps | "
+                f"Latency {self.stats.latency_ms('recognition'):.0f} ms | "
+                f"{self.frame_skip.status_text()}")
+
+    def report(self):
+        """Multi-line summary of rates, latencies and dropped frames"""
+        stats = self.stats
+        return "\n".join([
+            "Pipeline:",
+            f"  capture      {stats.fps('captured'):6.1f} fps",
+            f"  display      {stats.fps('displayed'):6.1f} fps",
+            f"  recognition  {stats.fps('recognized'):6.1f} fps",
+            f"  recognition latency  p50 {stats.latency_ms('recognition', 50):7.1f} ms  "
+            f"p95 {stats.latency_ms('recognition', 95):7.1f} ms",
+            f"  end-to-end latency   p50 {stats.latency_ms('end_to_end', 50):7.1f} ms  "
+            f"p95 {stats.latency_ms('end_to_end', 95):7.1f} ms",
+            f"  frames dropped: display {self.display_queue.dropped}, "
+            f"recognition {self.recognition_queue.dropped}",
+            f"  {self.frame_skip.report()}"
+        ])
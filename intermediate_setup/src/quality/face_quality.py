@@ -0,0 +1,176 @@
+import cv2
+import numpy as np
+from src.utils.buffer_pool import buffer_pool
+
+class FaceQualityGate:
+    def __init__(self, min_face_size=60, min_sharpness=100.0, min_brightness=40.0,
+                 max_brightness=220.0, max_yaw=0.35, max_roll=25.0, patch_size=64):
+        """
+        Score detected faces and decide which are worth sending to the embedding model
+
+        Brightness and sharpness use the same measures (and default limits) as
+        `validate_face_image` in the beginner setup, computed on a fixed-size
+        grayscale patch so the limits do not depend on the face resolution.
+
+        Args:
+            min_face_size: minimum face width and height in pixels
+            min_sharpness: minimum variance of the Laplacian of the face patch
+            min_brightness: minimum mean gray level of the face patch
+            max_brightness: maximum mean gray level of the face patch
+            max_yaw: maximum horizontal nose offset from the eye midpoint,
+                as a fraction of the distance between the eyes
+            max_roll: maximum in-plane head rotation in degrees
+            patch_size: side of the square patch used for blur and brightness
+        """
+        self.min_face_size = min_face_size
+        self.min_sharpness = min_sharpness
+        self.min_brightness = min_brightness
+        self.max_brightness = max_brightness
+        self.max_yaw = max_yaw
+        self.max_roll = max_roll
+        self.patch_size = patch_size
+
+        # Counters for reporting how many CNN passes the gate saved
+        self.faces_seen = 0
+        self.faces_skipped = 0
+
+    def _face_boxes(self, faces):
+        """Convert dlib rectangles or (x, y, w, h) tuples to an (N, 4) array"""
+        boxes = []
+        for face in faces:
+            if hasattr(face, 'left'):
+                boxes.append((face.left(), face.top(),
+                              face.right() - face.left(), face.bottom() - face.top()))
+            else:
+                boxes.append(tuple(face))
+        return np.array(boxes, dtype=np.int64).reshape(-1, 4)
+
+    def _face_patches(self, gray, boxes):
+        """Crop every face and resize it to a patch_size x patch_size stack"""
+        patches = np.zeros((len(boxes), self.patch_size, self.patch_size), dtype=np.float32)
+        valid = np.zeros(len(boxes), dtype=bool)
+        img_h, img_w = gray.shape[:2]
+        for i, (x, y, w, h) in enumerate(boxes):
+            x0, y0 = max(0, x), max(0, y)
+            x1, y1 = min(img_w, x + w), min(img_h, y + h)
+            if x1 - x0 < 2 or y1 - y0 < 2:
+                continue
+            patches[i] = cv2.resize(gray[y0:y1, x0:x1], (self.patch_size, self.patch_size),
+                                    interpolation=cv2.INTER_AREA)
+            valid[i] = True
+        return patches, valid
+
+    def _pose(self, landmarks):
+        """
+        Estimate yaw and roll for a stack of 68-point landmark sets
+
+        Args:
+            landmarks: (N, 68, 2) array
+
+        Returns:
+            (yaw, roll) arrays; yaw is the nose offset ratio, roll is in degrees
+        """
+        left_eye = landmarks[:, 36:42].mean(axis=1)
+        right_eye = landmarks[:, 42:48].mean(axis=1)
+        nose_tip = landmarks[:, 30]
+
+        eye_vector = right_eye - left_eye
+        eye_distance = np.maximum(np.linalg.norm(eye_vector, axis=1), 1e-6)
+        roll = np.degrees(np.arctan2(eye_vector[:, 1], eye_vector[:, 0]))
+
+        # Project the nose onto the eye axis: 0 when frontal, +-0.5 near profile
+        eyes_center = (left_eye + right_eye) / 2
+        yaw = np.sum((nose_tip - eyes_center) * eye_vector, axis=1) / (eye_distance ** 2)
+        return yaw, roll
+
+    def assess(self, image, faces, landmarks=None):
+        """
+        Score all faces of a frame in one pass
+
+        Args:
+            image: numpy array of the image in BGR format
+            faces: list of dlib rectangles or (x, y, w, h) tuples
+            landmarks: optional list of (68, 2) landmark arrays, one per face
+
+        Returns:
+            list of dicts with 'size', 'sharpness', 'brightness', 'yaw',
+            'roll', 'passed' and 'reasons' for each face
+        """
+        boxes = self._face_boxes(faces)
+        if len(boxes) == 0:
+            return []
+
+        if image.ndim == 3:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY,
+                                dst=buffer_pool.like(image, channels=1, tag='quality_gray'))
+        else:
+            gray = image
+        patches, valid = self._face_patches(gray, boxes)
+
+        size = np.minimum(boxes[:, 2], boxes[:, 3])
+        brightness = patches.mean(axis=(1, 2))
+
+        # 4-neighbour Laplacian over the whole stack at once
+        laplacian = (4 * patches[:, 1:-1, 1:-1] - patches[:, :-2, 1:-1] - patches[:, 2:, 1:-1]
+                     - patches[:, 1:-1, :-2] - patches[:, 1:-1, 2:])
+        sharpness = laplacian.var(axis=(1, 2))
+
+        if landmarks is not None and len(landmarks) == len(boxes):
+            yaw, roll = self._pose(np.asarray(landmarks, dtype=np.float64))
+        else:
+            yaw = np.zeros(len(boxes))
+            roll = np.zeros(len(boxes))
+
+        results = []
+        for i in range(len(boxes)):
+            reasons = []
+            if not valid[i]:
+                reasons.append("outside frame")
+            if size[i] < self.min_face_size:
+                reasons.append("too small")
+            if sharpness[i] < self.min_sharpness:
+                reasons.append("too blurry")
+            if brightness[i] < self.min_brightness:
+                reasons.append("too dark")
+            elif brightness[i] > self.max_brightness:
+                reasons.append("too bright")
+            if abs(yaw[i]) > self.max_yaw or abs(roll[i]) > self.max_roll:
+                reasons.append("head turned")
+
+            results.append({
+                'size': int(size[i]),
+                'sharpness': float(sharpness[i]),
+                'brightness': float(brightness[i]),
+                'yaw': float(yaw[i]),
+                'roll': float(roll[i]),
+                'passed': not reasons,
+                'reasons': reasons
+            })
+
+        self.faces_seen += len(results)
+        self.faces_skipped += sum(1 for r in results if not r['passed'])
+        return results
+
+    def score(self, quality):
+        """
+        Collapse a quality dict into a single number in [0, 1]
+
+        Used to decide whether a new crop of the same person is better than
+        the one that was embedded before.
+        """
+        size_score = min(quality['size'] / (2.0 * self.min_face_size), 1.0)
+        sharpness_score = min(quality['sharpness'] / (4.0 * self.min_sharpness), 1.0)
+        pose_score = max(0.0, 1.0 - abs(quality['yaw']) / (2.0 * self.max_yaw))
+        return (size_score + sharpness_score + pose_score) / 3.0
+
+    @property
+    def cnn_calls_saved(self):
+        return self.faces_skipped
+
+    def report(self):
+        """One-line summary of how many faces were skipped"""
+        if self.faces_seen == 0:
+            return "Quality gate: no faces seen"
+        percent = 100.0 * self.faces_skipped / self.faces_seen
+        return (f"Quality gate: skipped {self.faces_skipped} of {self.faces_seen} faces "
+                f"({percent:.1f}%), {self.cnn_calls_saved} embedding calls saved")
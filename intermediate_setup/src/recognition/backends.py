@@ -0,0 +1,150 @@
+import numpy as np
+from src.utils.lazy_import import LazyModule
+
+DeepFace = LazyModule('deepface.DeepFace')
+face_recognition = LazyModule('face_recognition')
+
+
+class EmbeddingBackend:
+    """
+    Base class for the models that turn an aligned face into an embedding
+
+    Subclasses set `name` and `dimension` and implement `_build` and
+    `represent`. The model is built once, on the first `load()` call.
+    """
+
+    name = None
+    dimension = None
+
+    def __init__(self):
+        self._model = None
+
+    def _build(self):
+        raise NotImplementedError
+
+    def load(self):
+        """Build the model (only the first call does any work)"""
+        if self._model is None:
+            self._model = self._build()
+        return self
+
+    @property
+    def is_loaded(self):
+        return self._model is not None
+
+    def represent(self, face_image):
+        """
+        Compute the embedding of a face
+
+        Args:
+            face_image: numpy array of the aligned face image in RGB format
+
+        Returns:
+            1-D numpy array of length `dimension`
+        """
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Run one inference on a dummy 150x150 crop"""
+        raise NotImplementedError
+
+
+class DeepFaceBackend(EmbeddingBackend):
+    """Models served by DeepFace (TensorFlow)"""
+
+    def __init__(self, model_name, dimension, detector_backend="opencv"):
+        super().__init__()
+        self.name = model_name
+        self.dimension = dimension
+        self.detector_backend = detector_backend
+
+    def _build(self):
+        # DeepFace caches built models, so represent() reuses this instance
+        return DeepFace.build_model(self.name)
+
+    def represent(self, face_image):
+        self.load()
+        result = DeepFace.represent(
+            face_image,
+            model_name=self.name,
+            detector_backend=self.detector_backend,
+            enforce_detection=True,
+            align=True
+        )
+
+        if isinstance(result, list):
+            result = result[0]
+
+        return np.array(result['embedding'])
+
+    def warm_up(self):
+        self.load()
+        dummy_face = np.zeros((150, 150, 3), dtype=np.uint8)
+        DeepFace.represent(
+            dummy_face,
+            model_name=self.name,
+            detector_backend="skip",
+            enforce_detection=False,
+            align=False
+        )
+
+
+class DlibResNetBackend(EmbeddingBackend):
+    """dlib's ResNet 128-d encoder, as used by the face_recognition package"""
+
+    name = "Dlib-ResNet"
+    dimension = 128
+
+    def _build(self):
+        # face_recognition loads its dlib models at import time
+        return face_recognition.api
+
+    def represent(self, face_image):
+        self.load()
+        # The crop is already a face: pass its box so dlib does not re-detect
+        h, w = face_image.shape[:2]
+        encodings = face_recognition.face_encodings(
+            face_image, known_face_locations=[(0, w, h, 0)])
+        return np.array(encodings[0])
+
+    def warm_up(self):
+        self.represent(np.zeros((150, 150, 3), dtype=np.uint8))
+
+
+# Registry of embedding backends: name -> factory returning a new backend
+BACKENDS = {}
+
+def register_backend(name, factory):
+    """
+    Register an embedding backend
+
+    Args:
+        name: model name used by FeatureExtractor and stored in FaceDatabase
+        factory: callable returning a new EmbeddingBackend
+    """
+    BACKENDS[name] = factory
+
+def available_backends():
+    """Names of all registered backends"""
+    return sorted(BACKENDS)
+
+def get_backend(name):
+    """
+    Create the backend registered under `name`
+
+    Raises:
+        ValueError: if no backend is registered under that name
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding model '{name}'. "
+                         f"Available models: {', '.join(available_backends())}")
+    return BACKENDS[name]()
+
+
+# Ordered roughly from most accurate/slowest to fastest
+register_backend("VGG-Face", lambda: DeepFaceBackend("VGG-Face", 4096))
+register_backend("ArcFace", lambda: DeepFaceBackend("ArcFace", 512))
+register_backend("Facenet512", lambda: DeepFaceBackend("Facenet512", 512))
+register_backend("Facenet", lambda: DeepFaceBackend("Facenet", 128))
+register_backend("SFace", lambda: DeepFaceBackend("SFace", 128))
+register_backend("Dlib-ResNet", DlibResNetBackend)
@@ -1,19 +1,72 @@
-from deepface import DeepFace
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import os
 import cv2
+from src.utils.buffer_pool import buffer_pool
+from src.utils.lazy_import import LazyModule
+from src.recognition.backends import get_backend
+from src.recognition.onnx_engine import create_onnx_backend
+from src.utils.metrics import metrics
+
+pairwise = LazyModule('sklearn.metrics.pairwise')
+
+# Cascades copied by OpenCVSetup, used when OPENCV_DATA_PATH is not set
+DEFAULT_OPENCV_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'models', 'opencv')
 
 class FeatureExtractor:
-    def __init__(self):
+    def __init__(self, model_name="VGG-Face", preload=True, engine="tensorflow",
+                 onnx_threads=None, quantize=False):
+        """
+        Initialize the feature extractor
+
+        Args:
+            model_name: embedding backend to use, see backends.available_backends()
+            preload: build the model now; if False it is built on first use
+            engine: "tensorflow" (DeepFace) or "onnx" (ONNX Runtime on the CPU)
+            onnx_threads: intra-op threads for the ONNX engine (None = all cores)
+            quantize: use the int8-quantized model with the ONNX engine
+        """
+        if engine == "tensorflow":
+            self.backend = get_backend(model_name)
+        elif engine == "onnx":
+            self.backend = create_onnx_backend(model_name, intra_op_threads=onnx_threads,
+                                               quantize=quantize)
+        else:
+            raise ValueError(f"Unknown inference engine '{engine}', expected 'tensorflow' or 'onnx'")
+        self.model_name = model_name
+        self.engine = engine
+        self.embedding_dim = self.backend.dimension
+
         # Get the Haar Cascade path from environment variable
-        self.cascade_path = os.path.join(os.environ.get('OPENCV_DATA_PATH', ''), 'haarcascade_frontalface_default.xml')
+        opencv_data_path = os.environ.get('OPENCV_DATA_PATH') or DEFAULT_OPENCV_DATA_PATH
+        self.cascade_path = os.path.join(opencv_data_path, 'haarcascade_frontalface_default.xml')
         if not os.path.exists(self.cascade_path):
             raise FileNotFoundError(f"Haar Cascade file not found at {self.cascade_path}")
         
         # Set the OpenCV data path for DeepFace
         os.environ['OPENCV_DATA_PATH'] = os.path.dirname(self.cascade_path)
+
+        if preload:
+            self.load()
+
+    def load(self):
+        """Build the embedding model (only the first call does any work)"""
+        self.backend.load()
+        return self
+
+    @property
+    def is_loaded(self):
+        return self.backend.is_loaded
+
+    def warm_up(self):
+        """
+        Run one inference on a dummy 150x150 crop
+
+        The first forward pass pays for graph tracing and memory allocation;
+        doing it at start-up keeps that cost off the first real frame.
+        """
+        self.backend.warm_up()
         
+    @metrics.timed('embed')
     def extract_features(self, face_image):
         """
         Extract facial features from an image
@@ -29,21 +82,11 @@ class FeatureExtractor:
             if isinstance(face_image, np.ndarray):
                 # Convert to RGB if needed
                 if len(face_image.shape) == 3 and face_image.shape[2] == 3:
-                    face_image = cv2.cvtColor(face_image, cv2.COLOR_BGR2RGB)
-            
-            # Extract features using DeepFace
-            result = DeepFace.represent(
-                face_image,
-                model_name="VGG-Face",
-                detector_backend="opencv",
-                enforce_detection=True,
-                align=True
-            )
+                    face_image = cv2.cvtColor(face_image, cv2.COLOR_BGR2RGB,
+                                              dst=buffer_pool.like(face_image, tag='embed_rgb'))
             
-            if isinstance(result, list):
-                result = result[0]
-                
-            return np.array(result['embedding'])
+            # Extract features using the selected backend
+            return self.backend.represent(face_image)
             
         except Exception as e:
             print(f"Error extracting features: {str(e)}")
@@ -68,7 +111,7 @@ class FeatureExtractor:
         face2_features = face2_features.reshape(1, -1)
         
         # Calculate cosine similarity
-        similarity = cosine_similarity(face1_features, face2_features)[0][0]
+        similarity = pairwise.cosine_similarity(face1_features, face2_features)[0][0]
         
         return float(similarity)
     
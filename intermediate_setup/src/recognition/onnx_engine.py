@@ -0,0 +1,165 @@
+import argparse
+import os
+import sys
+import cv2
+import numpy as np
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.lazy_import import LazyModule
+from src.recognition.backends import EmbeddingBackend, DeepFaceBackend, get_backend
+
+ort = LazyModule('onnxruntime')
+ort_quantization = LazyModule('onnxruntime.quantization')
+tf2onnx = LazyModule('tf2onnx')
+tf = LazyModule('tensorflow')
+
+DEFAULT_ONNX_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'models', 'onnx')
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    Run a DeepFace embedding network with ONNX Runtime on the CPU
+
+    The Keras model behind a DeepFaceBackend is exported to ONNX the first
+    time it is needed and stored under `onnx_dir`; later runs load the file
+    directly and never import TensorFlow. With `quantize=True` a dynamically
+    int8-quantized copy is created from the fp32 export and used instead.
+
+    Unlike DeepFaceBackend, the crop is not re-detected by DeepFace: it is
+    resized to the network input and scaled to [0, 1], which is what DeepFace
+    does after its own detection step with detector_backend="skip".
+    """
+
+    def __init__(self, source_backend, onnx_dir=None, intra_op_threads=None, quantize=False):
+        """
+        Args:
+            source_backend: DeepFaceBackend whose network is exported
+            onnx_dir: directory for the exported models
+            intra_op_threads: ONNX Runtime intra-op threads (None = all cores)
+            quantize: use the dynamic int8-quantized model
+        """
+        super().__init__()
+        self.source_backend = source_backend
+        self.name = source_backend.name
+        self.dimension = source_backend.dimension
+        self.onnx_dir = onnx_dir or DEFAULT_ONNX_DIR
+        self.intra_op_threads = intra_op_threads
+        self.quantize = quantize
+        self.input_size = None  # (width, height), read from the model
+
+    @property
+    def fp32_path(self):
+        return os.path.join(self.onnx_dir, f"{self.name}.onnx")
+
+    @property
+    def int8_path(self):
+        return os.path.join(self.onnx_dir, f"{self.name}.int8.onnx")
+
+    @property
+    def model_path(self):
+        return self.int8_path if self.quantize else self.fp32_path
+
+    def export(self, opset=13):
+        """Export the Keras network to ONNX (skipped if the file exists)"""
+        if os.path.exists(self.fp32_path):
+            return self.fp32_path
+
+        os.makedirs(self.onnx_dir, exist_ok=True)
+        print(f"Exporting {self.name} to ONNX at {self.fp32_path}")
+        client = self.source_backend.load()._model
+        keras_model = getattr(client, 'model', client)
+        input_signature = [tf.TensorSpec(keras_model.inputs[0].shape, tf.float32, name="input")]
+
+        # Write to a temporary name so an interrupted export is never picked up
+        temp_path = self.fp32_path + ".tmp"
+        tf2onnx.convert.from_keras(keras_model, input_signature=input_signature,
+                                   opset=opset, output_path=temp_path)
+        os.replace(temp_path, self.fp32_path)
+        return self.fp32_path
+
+    def quantize_model(self):
+        """Create the dynamic int8 model from the fp32 export (skipped if it exists)"""
+        if os.path.exists(self.int8_path):
+            return self.int8_path
+
+        self.export()
+        print(f"Quantizing {self.name} to int8 at {self.int8_path}")
+        temp_path = self.int8_path + ".tmp"
+        ort_quantization.quantize_dynamic(self.fp32_path, temp_path,
+                                          weight_type=ort_quantization.QuantType.QInt8)
+        os.replace(temp_path, self.int8_path)
+        return self.int8_path
+
+    def _build(self):
+        if self.quantize:
+            self.quantize_model()
+        else:
+            self.export()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.intra_op_threads:
+            options.intra_op_num_threads = self.intra_op_threads
+        session = ort.InferenceSession(self.model_path, sess_options=options,
+                                       providers=["CPUExecutionProvider"])
+
+        # Input is NHWC; height and width are fixed by the network
+        _, height, width, _ = session.get_inputs()[0].shape
+        self.input_size = (int(width), int(height))
+        self.input_name = session.get_inputs()[0].name
+        return session
+
+    def _preprocess(self, face_images):
+        batch = np.empty((len(face_images), self.input_size[1], self.input_size[0], 3), dtype=np.float32)
+        for i, face_image in enumerate(face_images):
+            resized = cv2.resize(face_image, self.input_size, interpolation=cv2.INTER_LINEAR)
+            np.multiply(resized, 1.0 / 255.0, out=batch[i], casting='unsafe')
+        return batch
+
+    def represent_batch(self, face_images):
+        """
+        Compute embeddings for several faces in one inference call
+
+        Args:
+            face_images: list of aligned face images in RGB format
+
+        Returns:
+            numpy array of shape (len(face_images), dimension)
+        """
+        session = self.load()._model
+        batch = self._preprocess(face_images)
+        embeddings = session.run(None, {self.input_name: batch})[0]
+        return embeddings.reshape(len(face_images), -1)
+
+    def represent(self, face_image):
+        return self.represent_batch([face_image])[0]
+
+    def warm_up(self):
+        self.represent(np.zeros((150, 150, 3), dtype=np.uint8))
+
+
+def create_onnx_backend(model_name, onnx_dir=None, intra_op_threads=None, quantize=False):
+    """
+    Create an ONNX Runtime backend for a registered DeepFace model
+
+    Raises:
+        ValueError: if the model is not served by DeepFace
+    """
+    source_backend = get_backend(model_name)
+    if not isinstance(source_backend, DeepFaceBackend):
+        raise ValueError(f"The ONNX engine only supports DeepFace models, not '{model_name}'")
+    return OnnxBackend(source_backend, onnx_dir, intra_op_threads, quantize)
+
+def main():
+    parser = argparse.ArgumentParser(description='Export an embedding model to ONNX')
+    parser.add_argument('--model', default='VGG-Face', help='Embedding model (default: VGG-Face)')
+    parser.add_argument('--int8', action='store_true', help='Also create the int8-quantized model')
+    args = parser.parse_args()
+
+    backend = create_onnx_backend(args.model, quantize=args.int8)
+    path = backend.quantize_model() if args.int8 else backend.export()
+    print(f"ONNX model ready at {path}")
+
+if __name__ == "__main__":
+    main()
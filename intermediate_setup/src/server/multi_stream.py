@@ -0,0 +1,222 @@
+import threading
+import time
+import cv2
+from src.capture.frame_source import open_capture, is_live_source, ReplaySource
+from src.pipeline.latest_frame_queue import LatestFrameQueue
+from src.pipeline.stream_stats import StreamStats
+from src.utils.metrics import metrics
+
+class VideoStream:
+    def __init__(self, name, source, capture, recognizer, realtime=True):
+        """
+        State of one input of the MultiStreamRunner
+
+        Args:
+            name: label used in stats and results
+            source: original source specification
+            capture: opened cv2.VideoCapture (or compatible object)
+            recognizer: FrameRecognizer owned by this stream
+            realtime: pace video files at their native frame rate
+        """
+        self.name = name
+        self.source = source
+        self.capture = capture
+        self.recognizer = recognizer
+        self.queue = LatestFrameQueue(1)
+        self.stats = StreamStats()
+        self.finished = False
+        self.busy = False  # a stream is processed by one worker at a time
+
+        self.frame_interval = 0.0
+        # A ReplaySource paces itself
+        if realtime and not is_live_source(source) and not isinstance(capture, ReplaySource):
+            fps = capture.get(cv2.CAP_PROP_FPS)
+            if fps and fps > 0:
+                self.frame_interval = 1.0 / fps
+
+class MultiStreamRunner:
+    def __init__(self, sources, components, num_workers=4, on_result=None,
+                 quality_gate=True, tracking=True, refresh_interval=30, realtime=True,
+                 replay_speed=None):
+        """
+        Recognize faces on several video sources with one set of models
+
+        Every source gets a capture thread feeding a latest-frame-wins queue
+        and its own FrameRecognizer (tracker, cache and quality counters),
+        while the detector, aligner, extractor and database in `components`
+        are shared. A pool of worker threads takes frames from the streams in
+        round-robin order, so a busy camera cannot starve the others.
+
+        Args:
+            sources: list of device indexes, video file paths or stream URLs
+            components: RecognitionComponents, preferably created with
+                thread_safe_detector=True
+            num_workers: number of recognition worker threads
+            on_result: optional callable(stream_name, frame_id, captured_at, results)
+            quality_gate, tracking, refresh_interval: see RecognitionComponents.create_recognizer
+            realtime: pace video files at their native frame rate
+            replay_speed: play video files as ReplaySources at this speed
+                (recorded timing, 0 = as fast as possible) instead
+        """
+        self.components = components
+        self.num_workers = num_workers
+        self.on_result = on_result
+        self.streams = []
+        try:
+            for index, source in enumerate(sources):
+                recognizer = components.create_recognizer(quality_gate=quality_gate, tracking=tracking,
+                                                          refresh_interval=refresh_interval)
+                capture = open_capture(source, replay_speed=replay_speed)
+                self.streams.append(VideoStream(f"stream{index}:{source}", source, capture,
+                                                recognizer, realtime=realtime))
+        except BaseException:
+            # Do not keep the cameras opened so far
+            for stream in self.streams:
+                stream.capture.release()
+            raise
+
+        self.schedule_lock = threading.Condition()
+        self.next_stream = 0
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        """Start one capture thread per stream and the worker pool"""
+        self.stop_event.clear()
+        for stream in self.streams:
+            self.threads.append(threading.Thread(target=self._capture_loop, args=(stream,),
+                                                 name=f"capture-{stream.name}", daemon=True))
+        for index in range(self.num_workers):
+            self.threads.append(threading.Thread(target=self._worker_loop,
+                                                 name=f"worker-{index}", daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stop all threads and release the captures"""
+        self.stop_event.set()
+        with self.schedule_lock:
+            self.schedule_lock.notify_all()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+        for stream in self.streams:
+            stream.capture.release()
+
+    @property
+    def finished(self):
+        """True once every stream has ended and all queued frames were processed"""
+        with self.schedule_lock:
+            return all(s.finished and len(s.queue) == 0 and not s.busy for s in self.streams)
+
+    def _capture_loop(self, stream):
+        frame_id = 0
+        failures = 0
+        next_read = time.perf_counter()
+        while not self.stop_event.is_set():
+            if stream.frame_interval:
+                delay = next_read - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_read += stream.frame_interval
+
+            ret, frame = stream.capture.read()
+            if not ret:
+                failures += 1
+                # Files end; cameras and streams may just hiccup
+                if not is_live_source(stream.source) or failures > 100:
+                    break
+                time.sleep(0.01)
+                continue
+            failures = 0
+            frame_id += 1
+            captured_at = time.perf_counter()
+            stream.stats.tick('captured', captured_at)
+            if stream.queue.put((frame_id, captured_at, frame)):
+                metrics.inc('frames_dropped')
+            with self.schedule_lock:
+                self.schedule_lock.notify()
+
+        stream.finished = True
+        with self.schedule_lock:
+            self.schedule_lock.notify_all()
+
+    def _next_job(self):
+        """Take a frame from the next stream in round-robin order (call with the lock held)"""
+        count = len(self.streams)
+        for offset in range(count):
+            index = (self.next_stream + offset) % count
+            stream = self.streams[index]
+            if stream.busy or len(stream.queue) == 0:
+                continue
+            item = stream.queue.get(timeout=0)
+            if item is None:
+                continue
+            stream.busy = True
+            self.next_stream = (index + 1) % count
+            return stream, item
+        return None, None
+
+    def _worker_loop(self):
+        while not self.stop_event.is_set():
+            with self.schedule_lock:
+                stream, item = self._next_job()
+                if stream is None:
+                    self.schedule_lock.wait(0.1)
+                    continue
+
+            frame_id, captured_at, frame = item
+            try:
+                results = stream.recognizer.recognize(frame)
+                done_at = time.perf_counter()
+                stream.stats.tick('processed', done_at)
+                stream.stats.add_latency('latency', done_at - captured_at)
+                metrics.observe('recognition_latency', done_at - captured_at)
+                # Still marked busy, so results of a stream are reported in order
+                if self.on_result is not None:
+                    self.on_result(stream.name, frame_id, captured_at, results)
+            except Exception as e:
+                print(f"Error processing {stream.name}: {str(e)}")
+            finally:
+                with self.schedule_lock:
+                    stream.busy = False
+                    self.schedule_lock.notify()
+
+    def stats_lines(self):
+        """One line per stream with capture/processing FPS, latency and drops"""
+        lines = []
+        for stream in self.streams:
+            stats = stream.stats
+            lines.append(f"{stream.name}: capture {stats.fps('captured'):5.1f} fps, "
+                         f"processed {stats.fps('processed'):5.1f} fps, "
+                         f"latency p50 {stats.latency_ms('latency', 50):6.1f} ms "
+                         f"p95 {stats.latency_ms('latency', 95):6.1f} ms, "
+                         f"dropped {stream.queue.dropped}"
+                         + (" (ended)" if stream.finished else ""))
+        return lines
+
+    def run(self, stats_interval=5.0, duration=None):
+        """
+        Run until all streams end, `duration` seconds pass or Ctrl+C
+
+        Args:
+            stats_interval: seconds between per-stream stats lines
+            duration: optional run time limit in seconds
+        """
+        self.start()
+        started = time.perf_counter()
+        next_stats = started + stats_interval
+        try:
+            while not self.finished:
+                time.sleep(0.1)
+                now = time.perf_counter()
+                if duration is not None and now - started >= duration:
+                    break
+                if now >= next_stats:
+                    print("\n".join(self.stats_lines()))
+                    next_stats = now + stats_interval
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+        print("\n".join(self.stats_lines()))
@@ -0,0 +1,330 @@
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+import numpy as np
+
+class SharedFrameRing:
+    def __init__(self, num_slots, max_frame_shape, dtype=np.uint8, name=None):
+        """
+        Fixed set of frame slots in one shared memory block
+
+        The producer copies a frame into a free slot once; worker processes
+        map the same block and read the slot in place, so only the slot index
+        and frame shape travel through the task queue.
+
+        Args:
+            num_slots: number of frames that can be in flight
+            max_frame_shape: largest frame shape, e.g. (1080, 1920, 3)
+            dtype: frame dtype
+            name: attach to an existing block instead of creating one
+        """
+        self.num_slots = num_slots
+        self.max_frame_shape = tuple(max_frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.slot_bytes = int(np.prod(self.max_frame_shape)) * self.dtype.itemsize
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * num_slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def view(self, slot, shape):
+        """Numpy view of the first prod(shape) elements of a slot (no copy)"""
+        count = int(np.prod(shape))
+        if count * self.dtype.itemsize > self.slot_bytes:
+            raise ValueError(f"Frame of shape {shape} does not fit a slot of {self.max_frame_shape}")
+        return np.ndarray(shape, dtype=self.dtype, buffer=self.shm.buf,
+                          offset=slot * self.slot_bytes)
+
+    def write(self, slot, frame):
+        """Copy a frame into a slot and return its shape"""
+        np.copyto(self.view(slot, frame.shape), frame, casting='no')
+        return frame.shape
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        if self.owner:
+            self.shm.unlink()
+
+def create_components(component_options):
+    """Default worker factory: load the full pipeline inside the worker process"""
+    from src.pipeline.components import RecognitionComponents
+    return RecognitionComponents(**component_options)
+
+def compact_result(result):
+    """Reduce a FrameRecognizer result dict to plain, cheaply picklable values"""
+    return {
+        'box': tuple(int(v) for v in result['box']),
+        'track_id': result['track_id'],
+        'person_id': result['person_id'],
+        'name': result['name'],
+        'similarity': result['similarity'],
+        'cached': result['cached']
+    }
+
+def _worker_main(worker_index, ring_name, num_slots, max_frame_shape, dtype, task_queue,
+                 result_queue, factory, component_options, threads_per_worker):
+    # Keep every process to its own core(s) instead of oversubscribing the machine
+    for variable in ('OMP_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS'):
+        os.environ[variable] = str(threads_per_worker)
+
+    ring = SharedFrameRing(num_slots, max_frame_shape, dtype, name=ring_name)
+    try:
+        components = factory(component_options)
+        result_queue.put(('ready', worker_index, None, None))
+    except Exception as e:
+        result_queue.put(('error', worker_index, None, f"Worker {worker_index} failed to load: {e}"))
+        ring.close()
+        return
+
+    recognizers = {}  # stream_id -> FrameRecognizer (own tracker and cache)
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        request_id, slot, shape, stream_id, recognizer_options = task
+        try:
+            recognizer = recognizers.get(stream_id)
+            if recognizer is None:
+                recognizer = components.create_recognizer(**recognizer_options)
+                recognizers[stream_id] = recognizer
+            frame = ring.view(slot, shape)
+            results = [compact_result(r) for r in recognizer.recognize(frame)]
+            result_queue.put(('result', request_id, slot, results))
+        except Exception as e:
+            result_queue.put(('failed', request_id, slot, str(e)))
+    ring.close()
+
+class RecognitionWorkerPool:
+    def __init__(self, num_workers=None, max_frame_shape=(1080, 1920, 3), num_slots=None,
+                 component_options=None, factory=create_components, threads_per_worker=1):
+        """
+        Recognition in worker processes with shared-memory frame transport
+
+        Each worker process loads its own detector, aligner, extractor and
+        database connection, so detection and embedding run truly in
+        parallel instead of contending for the GIL. Frames are written once
+        into a SharedFrameRing; workers receive only slot indexes and send
+        back compact result records.
+
+        All frames of a stream go to the same worker, which keeps the
+        stream's tracker and cache; streams are spread over the workers.
+
+        Args:
+            num_workers: worker processes (default: CPU count)
+            max_frame_shape: largest frame shape that will be submitted
+            num_slots: frames in flight (default: 2 per worker)
+            component_options: keyword arguments for RecognitionComponents
+            factory: module-level callable(component_options) returning an
+                object with create_recognizer(**options)
+            threads_per_worker: math library threads per worker process
+        """
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.max_frame_shape = tuple(max_frame_shape)
+        self.num_slots = num_slots or 2 * self.num_workers
+        self.component_options = dict(component_options or {})
+        self.factory = factory
+        self.threads_per_worker = threads_per_worker
+
+        self.ring = None
+        self.processes = []
+        self.task_queues = []
+        self.result_queue = None
+        self.free_slots = queue.Queue()
+        self.pending = {}  # request_id -> (Future, worker index, slot)
+        self.pending_lock = threading.Lock()
+        self.request_ids = itertools.count()
+        self.stream_ids = itertools.count()
+        self.collector = None
+        self.ready_count = 0
+        self.ready_event = threading.Event()
+        self.startup_errors = []
+        self.dead_workers = set()
+        self.stopping = False
+
+    def start(self, timeout=None):
+        """
+        Start the worker processes and wait until their models are loaded
+
+        Raises:
+            RuntimeError: if a worker fails to load its models, dies, or the
+                workers are not ready within `timeout` seconds
+        """
+        # 'spawn' avoids forking a parent that may already hold TensorFlow state
+        context = mp.get_context('spawn')
+        self.ring = SharedFrameRing(self.num_slots, self.max_frame_shape)
+        for slot in range(self.num_slots):
+            self.free_slots.put(slot)
+        self.result_queue = context.Queue()
+        for index in range(self.num_workers):
+            task_queue = context.Queue()
+            process = context.Process(
+                target=_worker_main, name=f"recognition-worker-{index}", daemon=True,
+                args=(index, self.ring.name, self.num_slots, self.max_frame_shape, self.ring.dtype.str,
+                      task_queue, self.result_queue, self.factory, self.component_options,
+                      self.threads_per_worker))
+            process.start()
+            self.task_queues.append(task_queue)
+            self.processes.append(process)
+
+        self.collector = threading.Thread(target=self._collect_results, name="pool-collector", daemon=True)
+        self.collector.start()
+
+        if not self.ready_event.wait(timeout):
+            self.stop()
+            raise RuntimeError(f"Recognition workers not ready after {timeout} s")
+        if self.startup_errors:
+            self.stop()
+            raise RuntimeError("; ".join(self.startup_errors))
+        return self
+
+    def stop(self, timeout=5.0):
+        """Stop the workers and free the shared memory"""
+        self.stopping = True
+        for task_queue in self.task_queues:
+            task_queue.put(None)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        if self.result_queue is not None:
+            self.result_queue.put(None)
+        if self.collector is not None:
+            self.collector.join(timeout)
+        with self.pending_lock:
+            for future, _, _ in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
+        self.processes = []
+        self.task_queues = []
+
+    def _collect_results(self, liveness_interval=0.5):
+        while True:
+            try:
+                message = self.result_queue.get(timeout=liveness_interval)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if message is None:
+                break
+            kind, key, slot, payload = message
+            if kind in ('ready', 'error'):
+                if kind == 'error':
+                    self.startup_errors.append(payload)
+                self.ready_count += 1
+                if self.ready_count == self.num_workers or kind == 'error':
+                    self.ready_event.set()
+                continue
+
+            with self.pending_lock:
+                entry = self.pending.pop(key, None)
+            if entry is None:
+                continue  # already failed because its worker died
+            future = entry[0]
+            # The worker is done with the slot: hand it back before resolving
+            self.free_slots.put(slot)
+            if kind == 'result':
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+
+    def _check_workers(self):
+        """Fail the pending frames of worker processes that have died"""
+        if self.stopping:
+            return
+        for index, process in enumerate(self.processes):
+            if index in self.dead_workers or process.is_alive():
+                continue
+            self.dead_workers.add(index)
+            error = f"Worker {index} exited unexpectedly (exit code {process.exitcode})"
+            print(f"Error: {error}")
+            if not self.ready_event.is_set():
+                self.startup_errors.append(error)
+                self.ready_event.set()
+            with self.pending_lock:
+                lost = [(key, entry) for key, entry in self.pending.items() if entry[1] == index]
+                for key, _ in lost:
+                    del self.pending[key]
+            for _, (future, _, slot) in lost:
+                # Nothing reads the slot any more
+                self.free_slots.put(slot)
+                future.set_exception(RuntimeError(error))
+
+    def submit(self, frame, stream_id=0, recognizer_options=None, timeout=None):
+        """
+        Queue a frame for recognition
+
+        Args:
+            frame: BGR frame no larger than max_frame_shape
+            stream_id: frames with the same ID go to the same worker
+            recognizer_options: keyword arguments for create_recognizer
+            timeout: seconds to wait for a free slot (None waits forever)
+
+        Returns:
+            Future resolving to a list of compact result dicts
+
+        Raises:
+            queue.Empty: if no slot became free within `timeout`
+            ValueError: if the frame is larger than a slot or not of the ring's dtype
+            RuntimeError: if the stream's worker process has died
+        """
+        worker = stream_id % self.num_workers
+        if worker in self.dead_workers:
+            raise RuntimeError(f"Worker {worker} for stream {stream_id} is not running")
+        slot = self.free_slots.get(timeout=timeout)
+        try:
+            shape = self.ring.write(slot, frame)
+        except Exception:
+            self.free_slots.put(slot)
+            raise
+        request_id = next(self.request_ids)
+        future = Future()
+        with self.pending_lock:
+            self.pending[request_id] = (future, worker, slot)
+        self.task_queues[worker].put((request_id, slot, shape, stream_id,
+                                      dict(recognizer_options or {})))
+        return future
+
+    def recognize(self, frame, stream_id=0, recognizer_options=None):
+        """Submit a frame and wait for its results"""
+        return self.submit(frame, stream_id, recognizer_options).result()
+
+    def create_recognizer(self, **recognizer_options):
+        """
+        Recognizer-like handle for one stream, so the pool can stand in for
+        RecognitionComponents in MultiStreamRunner
+        """
+        return PooledRecognizer(self, next(self.stream_ids), recognizer_options)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+class PooledRecognizer:
+    def __init__(self, pool, stream_id, recognizer_options):
+        """Forward the frames of one stream to its worker process"""
+        self.pool = pool
+        self.stream_id = stream_id
+        self.recognizer_options = recognizer_options
+
+    def recognize(self, frame):
+        return self.pool.recognize(frame, self.stream_id, self.recognizer_options)
+
+    def report(self):
+        return ""
@@ -0,0 +1,91 @@
+import numpy as np
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Intersection over union of every pair of boxes
+
+    Args:
+        boxes_a: (N, 4) array of (x, y, w, h)
+        boxes_b: (M, 4) array of (x, y, w, h)
+
+    Returns:
+        (N, M) array of IoU values
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+
+    ax0, ay0 = boxes_a[:, 0:1], boxes_a[:, 1:2]
+    ax1, ay1 = ax0 + boxes_a[:, 2:3], ay0 + boxes_a[:, 3:4]
+    bx0, by0 = boxes_b[:, 0], boxes_b[:, 1]
+    bx1, by1 = bx0 + boxes_b[:, 2], by0 + boxes_b[:, 3]
+
+    inter_w = np.clip(np.minimum(ax1, bx1) - np.maximum(ax0, bx0), 0, None)
+    inter_h = np.clip(np.minimum(ay1, by1) - np.maximum(ay0, by0), 0, None)
+    intersection = inter_w * inter_h
+    union = (boxes_a[:, 2:3] * boxes_a[:, 3:4]) + (boxes_b[:, 2] * boxes_b[:, 3]) - intersection
+    return intersection / np.maximum(union, 1e-9)
+
+class FaceTracker:
+    def __init__(self, iou_threshold=0.3, max_missed=5):
+        """
+        Associate face boxes across frames by greedy IoU matching
+
+        Args:
+            iou_threshold: minimum IoU for a box to continue a track
+            max_missed: number of consecutive updates a track may go unseen
+                before it is ended
+        """
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks = {}  # track_id -> {'box': (x, y, w, h), 'missed': int}
+        self.next_track_id = 1
+
+    def update(self, boxes):
+        """
+        Assign a track ID to every box of the new frame
+
+        Args:
+            boxes: list of (x, y, w, h) tuples
+
+        Returns:
+            (track_ids, ended_track_ids): one ID per box, in the same order,
+            and the IDs of tracks that ended with this update
+        """
+        track_ids = [None] * len(boxes)
+        existing_ids = list(self.tracks)
+
+        if boxes and existing_ids:
+            iou = box_iou([self.tracks[t]['box'] for t in existing_ids], boxes)
+            # Greedily take the best remaining pair until nothing overlaps enough
+            while True:
+                track_index, box_index = np.unravel_index(np.argmax(iou), iou.shape)
+                if iou[track_index, box_index] < self.iou_threshold:
+                    break
+                track_ids[box_index] = existing_ids[track_index]
+                iou[track_index, :] = -1
+                iou[:, box_index] = -1
+
+        matched = set()
+        for i, box in enumerate(boxes):
+            if track_ids[i] is None:
+                track_ids[i] = self.next_track_id
+                self.next_track_id += 1
+            self.tracks[track_ids[i]] = {'box': tuple(box), 'missed': 0}
+            matched.add(track_ids[i])
+
+        ended_track_ids = []
+        for track_id in existing_ids:
+            if track_id in matched:
+                continue
+            self.tracks[track_id]['missed'] += 1
+            if self.tracks[track_id]['missed'] > self.max_missed:
+                del self.tracks[track_id]
+                ended_track_ids.append(track_id)
+
+        return track_ids, ended_track_ids
+
+    def reset(self):
+        """End all tracks"""
+        ended_track_ids = list(self.tracks)
+        self.tracks.clear()
+        return ended_track_ids
@@ -0,0 +1,101 @@
+class RecognitionCache:
+    def __init__(self, refresh_interval=30, min_confidence=0.75,
+                 low_confidence_interval=5, quality_margin=0.15):
+        """
+        Remember the identity of each tracked face so it is not re-embedded every frame
+
+        Args:
+            refresh_interval: frames after which a confident identity is re-checked
+            min_confidence: similarity below which an identity counts as uncertain
+            low_confidence_interval: frames after which an uncertain identity
+                (including "Unknown") is re-checked
+            quality_margin: quality score increase that triggers a re-embed
+        """
+        self.refresh_interval = refresh_interval
+        self.min_confidence = min_confidence
+        self.low_confidence_interval = low_confidence_interval
+        self.quality_margin = quality_margin
+        self.entries = {}  # track_id -> dict, see update()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, track_id):
+        """Cached entry for a track, or None"""
+        return self.entries.get(track_id)
+
+    def needs_refresh(self, track_id, frame_index, quality_score=0.0):
+        """
+        Decide whether the face of a track has to be embedded again
+
+        Args:
+            track_id: ID from FaceTracker
+            frame_index: index of the current frame
+            quality_score: FaceQualityGate.score() of the current crop
+
+        Returns:
+            True if the face must be embedded and searched
+        """
+        entry = self.entries.get(track_id)
+        if entry is None:
+            return True
+
+        age = frame_index - entry['frame_index']
+        if age >= self.refresh_interval:
+            return True
+        if entry['similarity'] < self.min_confidence and age >= self.low_confidence_interval:
+            return True
+        if quality_score >= entry['quality_score'] + self.quality_margin:
+            return True
+        return False
+
+    def lookup(self, track_id, frame_index, quality_score=0.0):
+        """
+        Return the cached entry if it is still valid, counting hits and misses
+
+        Returns:
+            cached entry dict, or None if the face must be embedded
+        """
+        if self.needs_refresh(track_id, frame_index, quality_score):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.entries[track_id]
+
+    def update(self, track_id, frame_index, match, quality_score=0.0):
+        """
+        Store the result of embedding and searching a tracked face
+
+        Args:
+            track_id: ID from FaceTracker
+            frame_index: index of the current frame
+            match: (person_id, name, similarity) from FaceDatabase.search_face, or None
+            quality_score: FaceQualityGate.score() of the embedded crop
+        """
+        if match:
+            person_id, name, similarity = match
+        else:
+            person_id, name, similarity = None, "Unknown", 0.0
+        self.entries[track_id] = {
+            'person_id': person_id,
+            'name': name,
+            'similarity': similarity,
+            'frame_index': frame_index,
+            'quality_score': quality_score
+        }
+
+    def expire(self, track_ids):
+        """Drop the entries of tracks that have ended"""
+        for track_id in track_ids:
+            self.entries.pop(track_id, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def report(self):
+        """One-line summary of the cache hit rate"""
+        total = self.hits + self.misses
+        if total == 0:
+            return "Recognition cache: no lookups"
+        return (f"Recognition cache: {self.hits} of {total} faces reused "
+                f"({100.0 * self.hits / total:.1f}%), {self.misses} embedded")
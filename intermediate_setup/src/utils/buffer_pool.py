@@ -0,0 +1,109 @@
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+BUFFER_POOL_ENV = 'FACE_BUFFER_POOL'  # "0" turns the pool off (every get() allocates)
+
+class BufferPool:
+    def __init__(self, max_buffers=16, enabled=True):
+        """
+        Reusable numpy buffers for per-frame intermediate images
+
+        The pipeline stages convert every frame (BGR->RGB, BGR->gray), warp
+        every face and copy every frame for drawing. Without a pool each of
+        those is a fresh array, at 1080p and 30 FPS hundreds of MB/s of
+        allocator churn. With it the stages write into buffers that are
+        allocated once per (tag, shape, dtype) and passed to OpenCV as dst=.
+
+        Buffers are kept per thread, so stages running on different threads
+        (capture, recognition, rendering, one recognizer per camera) never
+        share one. A buffer returned by get() stays valid until the same
+        thread asks for the same tag, shape and dtype again: use it for
+        results that are consumed before the next frame, never for results
+        that are stored.
+
+        Args:
+            max_buffers: buffers kept per thread; the least recently used one
+                is dropped when a new shape shows up (e.g. after a resolution
+                change)
+            enabled: if False, get() always allocates (for comparisons)
+        """
+        self.max_buffers = max_buffers
+        self.enabled = enabled
+        self.local = threading.local()
+        self.allocations = 0  # arrays allocated by get()
+        self.reuses = 0       # get() calls served from the pool
+
+    def _buffers(self):
+        buffers = getattr(self.local, 'buffers', None)
+        if buffers is None:
+            buffers = self.local.buffers = OrderedDict()
+        return buffers
+
+    def get(self, shape, dtype=np.uint8, tag=None):
+        """
+        Get a buffer of the given shape and dtype for the calling thread
+
+        Args:
+            shape: array shape
+            dtype: numpy dtype
+            tag: name of the use (e.g. 'detect_rgb'), so that two stages with
+                same-shaped outputs do not overwrite each other
+
+        Returns:
+            C-contiguous numpy array with undefined contents
+        """
+        shape = tuple(int(n) for n in shape)
+        if not self.enabled:
+            self.allocations += 1
+            return np.empty(shape, dtype=dtype)
+        key = (tag, shape, np.dtype(dtype).str)
+        buffers = self._buffers()
+        buffer = buffers.get(key)
+        if buffer is not None:
+            buffers.move_to_end(key)
+            self.reuses += 1
+            return buffer
+
+        buffer = np.empty(shape, dtype=dtype)
+        buffers[key] = buffer
+        self.allocations += 1
+        while len(buffers) > self.max_buffers:
+            buffers.popitem(last=False)
+        return buffer
+
+    def like(self, array, channels=None, tag=None):
+        """
+        Buffer with the height and width of `array`
+
+        Args:
+            array: reference image
+            channels: channel count of the buffer (None: same shape as array,
+                1: a 2-D single-channel image)
+            tag: see get()
+        """
+        if channels is None:
+            shape = array.shape
+        elif channels == 1:
+            shape = array.shape[:2]
+        else:
+            shape = array.shape[:2] + (channels,)
+        return self.get(shape, array.dtype, tag)
+
+    def copy(self, array, tag=None):
+        """Copy `array` into a pooled buffer (e.g. a frame to draw on)"""
+        buffer = self.like(array, tag=tag)
+        np.copyto(buffer, array)
+        return buffer
+
+    def clear(self):
+        """Drop the calling thread's buffers"""
+        self._buffers().clear()
+
+    def stats(self):
+        """Allocation counters, for benchmarks and reports"""
+        return {'allocations': self.allocations, 'reuses': self.reuses}
+
+# Shared by all pipeline stages
+buffer_pool = BufferPool(enabled=os.environ.get(BUFFER_POOL_ENV, '1') != '0')
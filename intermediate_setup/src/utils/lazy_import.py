@@ -0,0 +1,41 @@
+import importlib
+
+
+class LazyModule:
+    """
+    Module proxy that defers the real import until an attribute is used
+
+    Heavy dependencies (dlib, DeepFace/TensorFlow, scikit-learn, PyQt5) take
+    seconds to import. Wrapping them in a LazyModule keeps `import` of our own
+    modules cheap, so the cost is only paid by code paths that need them.
+
+    Example:
+        dlib = LazyModule('dlib')
+        detector = dlib.get_frontal_face_detector()  # dlib is imported here
+    """
+
+    def __init__(self, module_name):
+        self.__dict__['_module_name'] = module_name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_module_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    @property
+    def is_loaded(self):
+        """True once the underlying module has been imported"""
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<LazyModule '{self.__dict__['_module_name']}' ({state})>"
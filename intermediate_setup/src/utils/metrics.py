@@ -0,0 +1,298 @@
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_ENV = 'FACE_METRICS'                    # "1" enables instrumentation
+METRICS_FILE_ENV = 'FACE_METRICS_FILE'          # Prometheus text file to write
+METRICS_INTERVAL_ENV = 'FACE_METRICS_INTERVAL'  # seconds between log lines / file writes
+
+PREFIX = 'face_recognition_'
+
+# Latency buckets from 10 us to ~2 min, each 1.5x the previous one
+BUCKET_BOUNDS = [1e-5 * 1.5 ** i for i in range(41)]
+
+class Histogram:
+    """Latency histogram with fixed logarithmic buckets (seconds)"""
+
+    def __init__(self, name, help_text=""):
+        self.name = name
+        self.help_text = help_text
+        self.lock = threading.Lock()
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(BUCKET_BOUNDS, seconds)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+    def percentile(self, percentile):
+        """
+        Estimate a percentile by interpolating inside its bucket
+
+        Args:
+            percentile: 0 to 100
+
+        Returns:
+            seconds, 0.0 if nothing was observed
+        """
+        with self.lock:
+            counts = list(self.counts)
+            total = self.count
+        if total == 0:
+            return 0.0
+        rank = percentile / 100.0 * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                lower = BUCKET_BOUNDS[index - 1] if index > 0 else 0.0
+                upper = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else lower
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return BUCKET_BOUNDS[-1]
+
+    def prometheus_lines(self):
+        full_name = PREFIX + self.name + '_seconds'
+        with self.lock:
+            counts = list(self.counts)
+            total, total_sum = self.count, self.sum
+        lines = [f"# HELP {full_name} {self.help_text or self.name}",
+                 f"# TYPE {full_name} histogram"]
+        cumulative = 0
+        for bound, count in zip(BUCKET_BOUNDS, counts):
+            cumulative += count
+            lines.append(f'{full_name}_bucket{{le="{bound:.6g}"}} {cumulative}')
+        lines.append(f'{full_name}_bucket{{le="+Inf"}} {total}')
+        lines.append(f"{full_name}_sum {total_sum:.6f}")
+        lines.append(f"{full_name}_count {total}")
+        return lines
+
+class Counter:
+    """Monotonic event counter"""
+
+    def __init__(self, name, help_text=""):
+        self.name = name
+        self.help_text = help_text
+        self.lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def prometheus_lines(self):
+        full_name = PREFIX + self.name + '_total'
+        return [f"# HELP {full_name} {self.help_text or self.name}",
+                f"# TYPE {full_name} counter",
+                f"{full_name} {self.value}"]
+
+class Gauge:
+    """Value that can go up and down, e.g. the current frame-skip interval"""
+
+    def __init__(self, name, help_text=""):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def prometheus_lines(self):
+        full_name = PREFIX + self.name
+        return [f"# HELP {full_name} {self.help_text or self.name}",
+                f"# TYPE {full_name} gauge",
+                f"{full_name} {self.value}"]
+
+class MetricsRegistry:
+    """
+    Named histograms, counters and gauges, switched on and off as a whole
+
+    While disabled, timed() and inc() return after a single attribute check,
+    so the instrumentation can stay in the hot paths.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+
+    def histogram(self, name, help_text=""):
+        with self.lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(name, help_text)
+            return self.histograms[name]
+
+    def counter(self, name, help_text=""):
+        with self.lock:
+            if name not in self.counters:
+                self.counters[name] = Counter(name, help_text)
+            return self.counters[name]
+
+    def gauge(self, name, help_text=""):
+        with self.lock:
+            if name not in self.gauges:
+                self.gauges[name] = Gauge(name, help_text)
+            return self.gauges[name]
+
+    def observe(self, name, seconds):
+        if self.enabled:
+            self.histogram(name).observe(seconds)
+
+    def inc(self, name, amount=1):
+        if self.enabled:
+            self.counter(name).inc(amount)
+
+    def set(self, name, value):
+        if self.enabled:
+            self.gauge(name).set(value)
+
+    @contextmanager
+    def timer(self, name):
+        """Time a block into the histogram `name`"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name).observe(time.perf_counter() - start)
+
+    def timed(self, name):
+        """Decorator that times every call into the histogram `name`"""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.histogram(name).observe(time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+            self.counters = {}
+            self.gauges = {}
+
+    def _snapshot(self):
+        """Sorted (name, metric) lists; metrics may be added by other threads meanwhile"""
+        with self.lock:
+            return (sorted(self.histograms.items()), sorted(self.counters.items()),
+                    sorted(self.gauges.items()))
+
+    def log_lines(self):
+        """One line per histogram (count, p50/p95/p99 in ms) and one for counters and gauges"""
+        histograms, counters, gauges = self._snapshot()
+        lines = []
+        for name, histogram in histograms:
+            lines.append(f"[metrics] {name:<18} n={histogram.count:<7d} "
+                         f"p50={histogram.percentile(50) * 1000:7.1f} ms  "
+                         f"p95={histogram.percentile(95) * 1000:7.1f} ms  "
+                         f"p99={histogram.percentile(99) * 1000:7.1f} ms")
+        values = counters + gauges
+        if values:
+            lines.append("[metrics] " + "  ".join(f"{name}={metric.value}" for name, metric in values))
+        return lines
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        histograms, counters, gauges = self._snapshot()
+        lines = []
+        for _, metric in histograms + counters + gauges:
+            lines.extend(metric.prometheus_lines())
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Write the metrics for the node exporter textfile collector
+
+        The file is written next to the target and renamed into place, so a
+        scrape never sees a half-written file.
+        """
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(self.render_prometheus())
+        os.replace(temp_path, path)
+
+class MetricsReporter:
+    def __init__(self, registry, interval=10.0, prometheus_path=None, log=True):
+        """
+        Periodically print metric log lines and/or write the Prometheus file
+
+        Args:
+            registry: MetricsRegistry to report
+            interval: seconds between reports
+            prometheus_path: optional *.prom file path
+            log: print the log lines
+        """
+        self.registry = registry
+        self.interval = interval
+        self.prometheus_path = prometheus_path
+        self.log = log
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def report_once(self):
+        if self.log:
+            for line in self.registry.log_lines():
+                print(line)
+        if self.prometheus_path:
+            try:
+                self.registry.write_prometheus(self.prometheus_path)
+            except OSError as e:
+                print(f"Error writing metrics to {self.prometheus_path}: {str(e)}")
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.report_once()
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._loop, name="metrics-reporter", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop reporting and write one final report"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.report_once()
+
+# Process-wide registry used by the instrumented components
+metrics = MetricsRegistry(enabled=os.environ.get(METRICS_ENV, '') not in ('', '0', 'false'))
+
+def start_reporting(enabled=False, prometheus_path=None, interval=None):
+    """
+    Enable the metrics from a CLI flag or the FACE_METRICS* variables and
+    start a reporter
+
+    Args:
+        enabled: enable even if FACE_METRICS is not set
+        prometheus_path: Prometheus file (default: $FACE_METRICS_FILE)
+        interval: report interval (default: $FACE_METRICS_INTERVAL or 10 s)
+
+    Returns:
+        running MetricsReporter, or None when metrics are disabled
+    """
+    prometheus_path = prometheus_path or os.environ.get(METRICS_FILE_ENV)
+    if enabled or prometheus_path:
+        metrics.enabled = True
+    if not metrics.enabled:
+        return None
+    interval = interval or float(os.environ.get(METRICS_INTERVAL_ENV, 10.0))
+    return MetricsReporter(metrics, interval, prometheus_path).start()
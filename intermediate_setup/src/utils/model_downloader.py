@@ -1,67 +1,78 @@
 import os
-import bz2
-import urllib.request
-import shutil
 from tqdm import tqdm
+from src.utils.model_store import ModelStore
 
 class ModelDownloader:
     def __init__(self):
         self.model_url = "https://github.com/davisking/dlib-models/raw/master/shape_predictor_68_face_landmarks.dat.bz2"
         self.models_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))), "models")
-        self.model_path = os.path.join(self.models_dir, "shape_predictor_68_face_landmarks.dat")
+        self.model_name = "shape_predictor_68_face_landmarks.dat"
+        self.model_path = os.path.join(self.models_dir, self.model_name)
+        self.store = ModelStore(self.models_dir)
         
-    def download_with_progress(self, url, filename):
-        """Download a file with a progress bar"""
-        with urllib.request.urlopen(url) as response, open(filename, 'wb') as out_file:
-            total_size = int(response.info().get('Content-Length', 0))
-            block_size = 1024 * 1024  # 1MB
-            
-            with tqdm(total=total_size, unit='B', unit_scale=True, desc=filename) as pbar:
-                while True:
-                    buffer = response.read(block_size)
-                    if not buffer:
-                        break
-                    out_file.write(buffer)
-                    pbar.update(len(buffer))
+    def download_with_progress(self, url, name):
+        """Download and install a model with a progress bar (resumes interrupted downloads)"""
+        with tqdm(unit='B', unit_scale=True, desc=name) as pbar:
+            def progress(done, total):
+                if total is not None:
+                    pbar.total = total
+                pbar.update(done - pbar.n)
+            return self.store.fetch(name, url, progress=progress)
     
     def download_model(self):
-        """Download and extract the face alignment model"""
-        # Create models directory if it doesn't exist
-        os.makedirs(self.models_dir, exist_ok=True)
-        
-        # Check if model already exists
-        if os.path.exists(self.model_path):
-            print(f"Model already exists at {self.model_path}")
+        """Download and extract the face alignment model (only a stat() when it is installed)"""
+        # Fast path: size and mtime match the manifest, nothing is read
+        try:
+            state = self.store.check(self.model_name)
+        except OSError as e:
+            print(f"Error reading model: {str(e)}")
+            return False
+        if state == 'ok':
+            return True
+            
+        # Installed before the manifest existed: record it once instead of downloading again
+        if state == 'unknown':
+            print(f"Recording existing model {self.model_path} in the manifest")
+            try:
+                self.store.adopt(self.model_name, source=self.model_url)
+            except OSError as e:
+                print(f"Error reading model: {str(e)}")
+                return False
             return True
             
-        # Download the compressed model
-        temp_file = self.model_path + ".bz2"
+        if state == 'modified':
+            print(f"Model {self.model_path} does not match its manifest checksum, installing it again")
         print(f"Downloading model from {self.model_url}")
         try:
-            self.download_with_progress(self.model_url, temp_file)
+            self.download_with_progress(self.model_url, self.model_name)
         except Exception as e:
             print(f"Error downloading model: {str(e)}")
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+            print("Run the command again to resume, or install a local copy with "
+                  "python download_model.py --archive shape_predictor_68_face_landmarks.dat.bz2")
             return False
             
-        # Extract the model
-        print("Extracting model...")
+        print(f"Model downloaded and extracted to {self.model_path}")
+        return True
+        
+    def install_from_archive(self, archive_path, expected_sha256=None):
+        """Install the model from a local .bz2 (or uncompressed) file, without network access"""
+        print(f"Installing model from {archive_path}")
         try:
-            with bz2.open(temp_file, 'rb') as source, open(self.model_path, 'wb') as dest:
-                shutil.copyfileobj(source, dest)
+            self.store.install_archive(self.model_name, archive_path, expected_sha256=expected_sha256)
         except Exception as e:
-            print(f"Error extracting model: {str(e)}")
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-            if os.path.exists(self.model_path):
-                os.remove(self.model_path)
+            print(f"Error installing model: {str(e)}")
             return False
-            
-        # Clean up
-        os.remove(temp_file)
-        print(f"Model downloaded and extracted to {self.model_path}")
+        print(f"Model installed to {self.model_path}")
         return True
+        
+    def verify(self):
+        """Re-hash the installed models; returns True if all match the manifest"""
+        results = self.store.verify()
+        for name, state in results.items():
+            print(f"  {name}: {state}")
+        if not results:
+            print("No models installed")
+        return bool(results) and all(state == 'ok' for state in results.values())
 
 def main():
     downloader = ModelDownloader()
@@ -71,4 +82,4 @@ def main():
         print("Model setup failed!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,312 @@
+import bz2
+import hashlib
+import http.client
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+
+MANIFEST_NAME = 'manifest.json'
+CHUNK_SIZE = 1 << 20  # 1 MB
+
+def file_sha256(path, chunk_size=CHUNK_SIZE):
+    """SHA-256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _bz2_chunks(source, chunk_size):
+    """Decompress a .bz2 file object in chunks of at most chunk_size bytes"""
+    decompressor = bz2.BZ2Decompressor()
+    new_stream = False
+    while True:
+        if decompressor.eof:
+            # pbzip2 and friends write several streams back to back
+            data = decompressor.unused_data or source.read(chunk_size)
+            if not data:
+                return
+            decompressor = bz2.BZ2Decompressor()
+            new_stream = True
+        elif decompressor.needs_input:
+            data = source.read(chunk_size)
+            if not data:
+                raise ValueError("Compressed model file is truncated")
+        else:
+            data = b''
+        try:
+            chunk = decompressor.decompress(data, max_length=chunk_size)
+        except OSError:
+            if new_stream:
+                return  # trailing data after the last stream, as bz2.open() ignores it
+            raise ValueError("Compressed model file is corrupt")
+        new_stream = False
+        if chunk:
+            yield chunk
+
+class ModelStore:
+    def __init__(self, models_dir):
+        """
+        Model files in one directory, described by a manifest
+
+        manifest.json records name, size, SHA-256, source (URL or archive)
+        and the file's mtime at install time for every model. Startup uses
+        is_installed(), which compares os.stat() with the manifest and never
+        reads the file; verify() re-hashes for a full integrity check.
+
+        Models are installed from a local archive (install_archive(),
+        decompressed while streaming, so a .bz2 never has to be unpacked in
+        memory or next to the model) or downloaded with fetch(), which
+        resumes an interrupted download with an HTTP Range request.
+
+        Args:
+            models_dir: directory holding the models and manifest.json
+        """
+        self.models_dir = models_dir
+        self.manifest_path = os.path.join(models_dir, MANIFEST_NAME)
+        self._manifest = None
+
+    def path(self, name):
+        return os.path.join(self.models_dir, name)
+
+    def manifest(self):
+        """Manifest entries by model name (read once)"""
+        if self._manifest is None:
+            try:
+                with open(self.manifest_path) as f:
+                    self._manifest = json.load(f).get('models', {})
+            except FileNotFoundError:
+                self._manifest = {}
+            except ValueError:
+                print(f"Warning: ignoring unreadable model manifest {self.manifest_path}")
+                self._manifest = {}
+        return self._manifest
+
+    def _save_manifest(self):
+        os.makedirs(self.models_dir, exist_ok=True)
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'version': 1, 'models': self.manifest()}, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+
+    def _record(self, name, sha256, source):
+        stat = os.stat(self.path(name))
+        self.manifest()[name] = {
+            'size': stat.st_size,
+            'sha256': sha256,
+            'source': source,
+            'mtime_ns': stat.st_mtime_ns,
+            'installed_at': time.time()
+        }
+        self._save_manifest()
+
+    def is_installed(self, name):
+        """
+        Fast startup check: the file exists and its size and mtime match the manifest
+
+        No file contents are read; use verify() to detect changes that
+        keep size and mtime.
+        """
+        entry = self.manifest().get(name)
+        if entry is None:
+            return False
+        try:
+            stat = os.stat(self.path(name))
+        except FileNotFoundError:
+            return False
+        return stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']
+
+    def check(self, name):
+        """
+        Startup check that never accepts a changed model
+
+        Uses the stat() fast path of is_installed(); only when size or mtime
+        differ from the manifest is the file re-hashed. A file whose contents
+        still match (e.g. copied with a new mtime) gets its stat refreshed in
+        the manifest, anything else is reported as modified.
+
+        Returns:
+            'ok', 'missing', 'modified', or 'unknown' (file present but not in
+            the manifest)
+        """
+        entry = self.manifest().get(name)
+        if not os.path.exists(self.path(name)):
+            return 'missing'
+        if entry is None:
+            return 'unknown'
+        if self.is_installed(name):
+            return 'ok'
+        if file_sha256(self.path(name)) != entry['sha256']:
+            return 'modified'
+        self._record(name, entry['sha256'], entry['source'])
+        return 'ok'
+
+    def verify(self, names=None):
+        """
+        Re-hash the installed models and compare them with the manifest
+
+        Args:
+            names: models to check (default: every model in the manifest)
+
+        Returns:
+            dict name -> 'ok', 'missing', 'modified' or 'unknown' (not in the manifest)
+        """
+        manifest = self.manifest()
+        results = {}
+        for name in (names if names is not None else sorted(manifest)):
+            entry = manifest.get(name)
+            if entry is None:
+                results[name] = 'unknown'
+            elif not os.path.exists(self.path(name)):
+                results[name] = 'missing'
+            elif file_sha256(self.path(name)) != entry['sha256']:
+                results[name] = 'modified'
+            else:
+                results[name] = 'ok'
+        return results
+
+    def adopt(self, name, source=None):
+        """Add a model file that is already in the directory to the manifest (hashes it once)"""
+        self._record(name, file_sha256(self.path(name)), source)
+
+    def install_archive(self, name, archive_path, source=None, compression='auto',
+                        expected_sha256=None, chunk_size=CHUNK_SIZE):
+        """
+        Install a model from a local file, decompressing while streaming
+
+        The model is written to a temporary file and hashed on the way, then
+        moved into place, so an interrupted install never leaves a partial
+        model behind.
+
+        Args:
+            name: model file name in the store
+            archive_path: .bz2 archive or uncompressed model file
+            source: recorded in the manifest (default: archive_path)
+            compression: 'bz2', None, or 'auto' to go by the file extension
+            expected_sha256: SHA-256 the installed model must have
+
+        Returns:
+            path of the installed model
+
+        Raises:
+            ValueError: the archive is truncated or the checksum does not match
+        """
+        if compression == 'auto':
+            compression = 'bz2' if archive_path.endswith('.bz2') else None
+        os.makedirs(self.models_dir, exist_ok=True)
+        target_path = self.path(name)
+        temp_path = target_path + '.tmp'
+        digest = hashlib.sha256()
+        try:
+            with open(archive_path, 'rb') as source_file, open(temp_path, 'wb') as target_file:
+                if compression == 'bz2':
+                    chunks = _bz2_chunks(source_file, chunk_size)
+                else:
+                    chunks = iter(lambda: source_file.read(chunk_size), b'')
+                for chunk in chunks:
+                    digest.update(chunk)
+                    target_file.write(chunk)
+                target_file.flush()
+                os.fsync(target_file.fileno())
+            sha256 = digest.hexdigest()
+            if expected_sha256 is not None and sha256 != expected_sha256.lower():
+                raise ValueError(f"Checksum mismatch for {name}: expected {expected_sha256}, got {sha256}")
+            os.replace(temp_path, target_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._record(name, sha256, source or os.path.abspath(archive_path))
+        return target_path
+
+    def fetch(self, name, url, compression='auto', expected_sha256=None, retries=3,
+              retry_delay=1.0, timeout=30, chunk_size=CHUNK_SIZE, progress=None):
+        """
+        Download and install a model, resuming interrupted downloads
+
+        The download goes to <name>[.bz2].part in the store. If that file
+        exists (from an earlier interrupted run, or a failed attempt of this
+        one) the download continues from its end with a Range request; a
+        server that ignores Range sends the whole file and the download
+        starts over.
+
+        Args:
+            name: model file name in the store
+            url: download URL (.bz2 URLs are decompressed)
+            compression: 'bz2', None, or 'auto' to go by the URL
+            expected_sha256: SHA-256 the installed model must have
+            retries: attempts to resume after a connection error
+            retry_delay: seconds before the first retry, doubled each time
+            timeout: socket timeout in seconds
+            progress: optional callable(bytes done, total bytes or None)
+
+        Returns:
+            path of the installed model
+        """
+        if compression == 'auto':
+            compression = 'bz2' if url.split('?')[0].endswith('.bz2') else None
+        os.makedirs(self.models_dir, exist_ok=True)
+        part_path = self.path(name) + ('.bz2' if compression == 'bz2' else '') + '.part'
+
+        attempt = 0
+        while True:
+            try:
+                self._download(url, part_path, timeout, chunk_size, progress)
+                break
+            except (OSError, http.client.HTTPException) as e:
+                if isinstance(e, urllib.error.HTTPError) and e.code < 500:
+                    raise  # not found, forbidden, ...: retrying will not help
+                attempt += 1
+                if attempt > retries:
+                    raise
+                print(f"Download of {name} interrupted ({str(e)}), resuming ({attempt}/{retries})")
+                time.sleep(retry_delay * 2 ** (attempt - 1))
+
+        try:
+            path = self.install_archive(name, part_path, source=url, compression=compression,
+                                        expected_sha256=expected_sha256, chunk_size=chunk_size)
+        except ValueError:
+            # A corrupt download must not be resumed next time
+            os.remove(part_path)
+            raise
+        os.remove(part_path)
+        return path
+
+    def _download(self, url, part_path, timeout, chunk_size, progress):
+        """Download url into part_path, continuing from its current size"""
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        request = urllib.request.Request(url)
+        if offset:
+            request.add_header('Range', f'bytes={offset}-')
+        try:
+            response = urllib.request.urlopen(request, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:
+                return  # nothing left to download
+            raise
+
+        with response:
+            if offset and response.status != 206:
+                offset = 0  # Range ignored: the whole file follows
+            total = None
+            content_range = response.headers.get('Content-Range')
+            if offset and content_range and '/' in content_range:
+                length = content_range.rsplit('/', 1)[1]
+                total = int(length) if length.isdigit() else None
+            elif response.headers.get('Content-Length'):
+                total = offset + int(response.headers['Content-Length'])
+
+            done = offset
+            with open(part_path, 'ab' if offset else 'wb') as f:
+                while True:
+                    chunk = response.read(chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    done += len(chunk)
+                    if progress is not None:
+                        progress(done, total)
+            if total is not None and done < total:
+                raise IOError(f"connection closed after {done} of {total} bytes")
@@ -1,8 +1,7 @@
 import os
-import shutil
 import cv2
-import urllib.request
 from pathlib import Path
+from src.utils.model_store import ModelStore
 
 class OpenCVSetup:
     def __init__(self):
@@ -13,16 +12,17 @@ class OpenCVSetup:
             self.opencv_data_dir = os.path.join(os.path.dirname(os.path.dirname(cv2.__file__)), 'data')
         
         self.target_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'models', 'opencv')
+        self.store = ModelStore(self.target_dir)
         self.cascade_urls = {
             'haarcascade_frontalface_default.xml': 'https://raw.githubusercontent.com/opencv/opencv/master/data/haarcascades/haarcascade_frontalface_default.xml',
             'haarcascade_eye.xml': 'https://raw.githubusercontent.com/opencv/opencv/master/data/haarcascades/haarcascade_eye.xml'
         }
         
-    def download_cascade_file(self, url, target_path):
+    def download_cascade_file(self, url, cascade_file):
         """Download the Haar Cascade file from OpenCV's GitHub repository"""
         try:
             print(f"Downloading Haar Cascade file from {url}")
-            urllib.request.urlretrieve(url, target_path)
+            self.store.fetch(cascade_file, url)
             return True
         except Exception as e:
             print(f"Error downloading Haar Cascade file: {str(e)}")
@@ -36,18 +36,26 @@ class OpenCVSetup:
             
             # Set up Haar Cascade files
             for cascade_file, url in self.cascade_urls.items():
+                # Fast path: size and mtime match the manifest
+                state = self.store.check(cascade_file)
+                if state == 'ok':
+                    continue
                 source_path = os.path.join(self.opencv_data_dir, cascade_file)
-                target_path = os.path.join(self.target_dir, cascade_file)
                 
-                if not os.path.exists(target_path):
+                if state == 'unknown':
+                    # Copied before the manifest existed
+                    self.store.adopt(cascade_file, source=source_path)
+                    continue
+                if state == 'modified':
+                    print(f"{cascade_file} does not match its manifest checksum, installing it again")
+                if os.path.exists(source_path):
                     # Try to copy from OpenCV installation first
-                    if os.path.exists(source_path):
-                        print(f"Copying {cascade_file} to {self.target_dir}")
-                        shutil.copy2(source_path, target_path)
-                    else:
-                        # If not found locally, download from GitHub
-                        if not self.download_cascade_file(url, target_path):
-                            raise FileNotFoundError(f"Could not obtain {cascade_file}")
+                    print(f"Copying {cascade_file} to {self.target_dir}")
+                    self.store.install_archive(cascade_file, source_path, compression=None)
+                else:
+                    # If not found locally, download from GitHub
+                    if not self.download_cascade_file(url, cascade_file):
+                        raise FileNotFoundError(f"Could not obtain {cascade_file}")
                 
             # Set environment variable for OpenCV
             os.environ['OPENCV_DATA_PATH'] = self.target_dir
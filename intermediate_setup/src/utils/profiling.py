@@ -0,0 +1,237 @@
+import cProfile
+import functools
+import io
+import os
+import pstats
+import signal
+import threading
+import time
+import tracemalloc
+
+PROFILE_ENV = 'FACE_PROFILE'                   # "1" enables profiling
+PROFILE_DIR_ENV = 'FACE_PROFILE_DIR'           # where dumps are written (default: profiles)
+PROFILE_SECONDS_ENV = 'FACE_PROFILE_SECONDS'   # length of a cProfile window
+SNAPSHOT_INTERVAL_ENV = 'FACE_PROFILE_SNAPSHOT_INTERVAL'  # seconds between tracemalloc snapshots
+
+class Profiler:
+    def __init__(self, output_dir="profiles", profile_seconds=30.0, snapshot_interval=300.0,
+                 profile_on_start=True, top=30, trace_frames=10):
+        """
+        cProfile windows and tracemalloc snapshots for long-running loops
+
+        The main loop calls tick() once per iteration. A profiling window
+        runs cProfile for `profile_seconds`, then writes a .prof file (for
+        snakeviz/pstats) and a text summary. Windows start at start() and
+        whenever a capture is requested by SIGUSR1 or a key binding
+        (request_capture()). Every `snapshot_interval` seconds a tracemalloc
+        snapshot is compared with the first one and the previous one, so
+        slow growth (e.g. of result lists or caches) shows up by source line.
+
+        Work on other threads is included by wrapping the function they run
+        with profiled(). Python 3.12+ allows only one active cProfile, so
+        there the main loop's profile leaves the other threads out (with a
+        warning).
+
+        Args:
+            output_dir: directory for the dumps
+            profile_seconds: length of a cProfile window
+            snapshot_interval: seconds between memory snapshots (0 disables
+                tracemalloc, which slows allocations down noticeably)
+            profile_on_start: open a window as soon as start() is called
+                (otherwise the caller opens it with open_window())
+            top: rows in the text summaries
+            trace_frames: stack depth recorded by tracemalloc
+        """
+        self.output_dir = output_dir
+        self.profile_seconds = profile_seconds
+        self.snapshot_interval = snapshot_interval
+        self.profile_on_start = profile_on_start
+        self.top = top
+        self.trace_frames = trace_frames
+
+        self.capture_requested = False
+        self.window_started_at = None
+        self.window_id = 0
+        self.profiles = []  # one cProfile.Profile per thread in the current window
+        self.profiles_lock = threading.Lock()
+        self.local = threading.local()
+        self.main_profile = None  # profile of the thread calling tick()
+        self.first_snapshot = None
+        self.last_snapshot = None
+        self.next_snapshot_at = None
+        self.dumps = []  # paths written so far
+        self.warned_single_profiler = False
+
+    @property
+    def window_active(self):
+        return self.window_started_at is not None
+
+    def start(self):
+        """Start memory tracing, install the SIGUSR1 handler and open the first window"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.snapshot_interval:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.trace_frames)
+            self.first_snapshot = self.last_snapshot = self._take_snapshot()
+            self.next_snapshot_at = time.perf_counter() + self.snapshot_interval
+        # Signal handlers can only be installed from the main thread
+        if hasattr(signal, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.request_capture())
+        if self.profile_on_start:
+            self._start_window()
+        print(f"Profiling enabled, writing to {os.path.abspath(self.output_dir)} "
+              f"(send SIGUSR1 or press the capture key for a new window)")
+        return self
+
+    def stop(self):
+        """Close an open window and write a last memory report"""
+        if self.window_active:
+            self._finish_window()
+        if self.first_snapshot is not None:
+            self._memory_report()
+            tracemalloc.stop()
+            self.first_snapshot = self.last_snapshot = None
+
+    def open_window(self):
+        """Open a profiling window now, e.g. when the main loop starts, unless one is open"""
+        if not self.window_active:
+            self._start_window()
+
+    def request_capture(self):
+        """Ask for a new profiling window and memory report (safe to call from a signal handler)"""
+        self.capture_requested = True
+
+    def tick(self):
+        """Call once per main-loop iteration; cheap unless a window opens or closes"""
+        now = time.perf_counter()
+        if self.capture_requested:
+            self.capture_requested = False
+            if not self.window_active:
+                self._start_window()
+            if self.first_snapshot is not None:
+                self._memory_report()
+        elif self.window_active and now - self.window_started_at >= self.profile_seconds:
+            self._finish_window()
+        if self.next_snapshot_at is not None and now >= self.next_snapshot_at:
+            self.next_snapshot_at = now + self.snapshot_interval
+            self._memory_report()
+
+    def profiled(self, function):
+        """Wrap a function run on another thread so its calls are profiled during windows"""
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not self.window_active:
+                return function(*args, **kwargs)
+            profile = self._thread_profile()
+            if profile is self.main_profile:
+                # Already profiled as part of the main loop
+                return function(*args, **kwargs)
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows only one active profiler at a time
+                self._warn_single_profiler()
+                return function(*args, **kwargs)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profile.disable()
+        return wrapper
+
+    def _thread_profile(self):
+        """This thread's profile for the current window, created on first use"""
+        if getattr(self.local, 'window', None) != self.window_id:
+            self.local.window = self.window_id
+            self.local.profile = cProfile.Profile()
+            with self.profiles_lock:
+                self.profiles.append(self.local.profile)
+        return self.local.profile
+
+    def _start_window(self):
+        with self.profiles_lock:
+            self.profiles = []
+        self.window_id += 1
+        self.main_profile = self._thread_profile()
+        try:
+            self.main_profile.enable()
+        except ValueError:
+            self.main_profile = None
+            self._warn_single_profiler()
+        self.window_started_at = time.perf_counter()
+        print(f"Profiling for {self.profile_seconds:.0f} s...")
+
+    def _warn_single_profiler(self):
+        if not self.warned_single_profiler:
+            self.warned_single_profiler = True
+            print("Warning: another profiler is already active (Python 3.12+ allows only one), "
+                  "so some threads are missing from the CPU profiles")
+
+    def _finish_window(self):
+        if self.main_profile is not None:
+            self.main_profile.disable()
+            self.main_profile = None
+        self.window_started_at = None
+        with self.profiles_lock:
+            profiles, self.profiles = self.profiles, []
+        profiles = [profile for profile in profiles if profile.getstats()]
+        if not profiles:
+            return
+
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        base = os.path.join(self.output_dir, f"cpu_{time.strftime('%Y%m%d_%H%M%S')}_{self.window_id}")
+        stats.dump_stats(base + ".prof")
+        text = io.StringIO()
+        stats.stream = text
+        stats.sort_stats('cumulative').print_stats(self.top)
+        with open(base + ".txt", 'w') as f:
+            f.write(text.getvalue())
+        self.dumps.extend([base + ".prof", base + ".txt"])
+        print(f"Saved CPU profile to {base}.prof")
+
+    def _take_snapshot(self):
+        # Leave out our own bookkeeping
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+
+    def _memory_report(self):
+        snapshot = self._take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"Traced memory: current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB", ""]
+        for title, reference in (("Growth since start", self.first_snapshot),
+                                 ("Growth since previous snapshot", self.last_snapshot)):
+            lines.append(f"{title}:")
+            for stat in snapshot.compare_to(reference, 'lineno')[:self.top]:
+                lines.append(f"  {stat}")
+            lines.append("")
+        self.last_snapshot = snapshot
+
+        path = os.path.join(self.output_dir, f"memory_{time.strftime('%Y%m%d_%H%M%S')}_{len(self.dumps)}.txt")
+        with open(path, 'w') as f:
+            f.write("\n".join(lines))
+        self.dumps.append(path)
+        print(f"Saved memory report to {path} ({current / 1e6:.1f} MB traced)")
+
+def create_profiler(enabled=False, output_dir=None):
+    """
+    Profiler configured from a CLI flag and the FACE_PROFILE* variables
+
+    Args:
+        enabled: enable even if FACE_PROFILE is not set
+        output_dir: dump directory (default: $FACE_PROFILE_DIR or ./profiles)
+
+    The first window is not opened yet, so that it does not cover model
+    loading and setup: call open_window() when the main loop starts.
+
+    Returns:
+        started Profiler, or None when profiling is disabled
+    """
+    if not enabled and os.environ.get(PROFILE_ENV, '') in ('', '0', 'false'):
+        return None
+    return Profiler(output_dir=output_dir or os.environ.get(PROFILE_DIR_ENV, 'profiles'),
+                    profile_seconds=float(os.environ.get(PROFILE_SECONDS_ENV, 30.0)),
+                    snapshot_interval=float(os.environ.get(SNAPSHOT_INTERVAL_ENV, 300.0)),
+                    profile_on_start=False).start()
@@ -0,0 +1,63 @@
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """Collect wall-clock timings of the start-up steps of an application"""
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.stages = []      # list of (name, seconds) in completion order
+        self.milestones = {}  # name -> seconds since start, e.g. 'first_frame'
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a block of start-up work
+
+        Args:
+            name: label shown in the report (e.g. 'face_aligner')
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def mark(self, name):
+        """
+        Record a milestone (e.g. 'first_frame') the first time it is reached
+
+        Returns:
+            True if this call recorded it, False if it was already reached
+        """
+        if name in self.milestones:
+            return False
+        # setdefault is atomic, so two threads cannot both record it
+        seconds = time.perf_counter() - self.start_time
+        return self.milestones.setdefault(name, seconds) == seconds
+
+    def total(self):
+        """Seconds elapsed since the timer was created"""
+        return time.perf_counter() - self.start_time
+
+    def report(self):
+        """
+        Format the timings as a table
+
+        Stages that ran in parallel overlap, so they can add up to more
+        than the total. Milestones are times since the timer was created.
+
+        Returns:
+            multi-line string with one row per stage, the total and the milestones
+        """
+        lines = ["Startup timing:"]
+        stages = list(self.stages)
+        milestones = sorted(self.milestones.items(), key=lambda item: item[1])
+        width = max([len(name) for name, _ in stages + milestones] + [5])
+        for name, seconds in stages:
+            lines.append(f"  {name:<{width}}  {seconds * 1000:9.1f} ms")
+        lines.append(f"  {'total':<{width}}  {self.total() * 1000:9.1f} ms")
+        for name, seconds in milestones:
+            lines.append(f"  {name:<{width}}  {seconds * 1000:9.1f} ms after start")
+        return "\n".join(lines)
@@ -0,0 +1,63 @@
+import threading
+import cv2
+import numpy as np
+import pytest
+from src.utils.buffer_pool import BufferPool
+
+@pytest.fixture
+def pool():
+    return BufferPool(max_buffers=3)
+
+def test_buffers_are_reused_per_shape_dtype_and_tag(pool):
+    """Test that the same request returns the same array and different ones do not"""
+    buffer = pool.get((480, 640, 3))
+    assert pool.get((480, 640, 3)) is buffer
+    assert pool.get((480, 640, 3), np.float32) is not buffer
+    assert pool.get((480, 640, 3), tag='other') is not buffer
+    assert pool.stats() == {'allocations': 3, 'reuses': 1}
+
+def test_least_recently_used_buffer_is_dropped(pool):
+    """Test that the pool stays bounded when shapes change"""
+    first = pool.get((10, 10))
+    pool.get((20, 20))
+    pool.get((30, 30))
+    pool.get((10, 10))  # refresh the first one
+    pool.get((40, 40))
+    assert pool.get((10, 10)) is first
+    assert pool.allocations == 4
+    pool.get((20, 20))
+    assert pool.allocations == 5
+
+def test_buffers_are_per_thread(pool):
+    """Test that threads never share a buffer"""
+    buffers = []
+    def worker():
+        buffers.append(pool.get((4, 4)))
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert buffers[0] is not buffers[1]
+
+def test_opencv_writes_into_pooled_buffers(pool):
+    """Test that cvtColor and warpAffine fill the buffer instead of allocating"""
+    frame = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=pool.like(frame, tag='rgb'))
+    assert rgb is pool.like(frame, tag='rgb')
+    assert np.array_equal(rgb, frame[:, :, ::-1])
+    gray = pool.like(frame, channels=1)
+    assert gray.shape == (120, 160)
+    assert cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray) is gray
+
+    dst = pool.get((50, 50, 3))
+    M = np.float64([[0.5, 0, 0], [0, 0.5, 0]])
+    assert cv2.warpAffine(frame, M, (50, 50), dst=dst) is dst
+
+    copy = pool.copy(frame, tag='display')
+    assert copy is not frame and np.array_equal(copy, frame)
+
+def test_disabled_pool_always_allocates():
+    pool = BufferPool(enabled=False)
+    assert pool.get((4, 4)) is not pool.get((4, 4))
+    assert pool.stats() == {'allocations': 2, 'reuses': 0}
@@ -0,0 +1,73 @@
+import threading
+import time
+import pytest
+import src.pipeline.components as components_module
+from src.pipeline.components import RecognitionComponents
+from src.utils.startup_timer import StartupTimer
+
+LOAD_SECONDS = 0.2
+
+class SlowComponent:
+    """Stand-in for a component whose constructor loads a model"""
+    def __init__(self, *args, **kwargs):
+        time.sleep(LOAD_SECONDS)
+
+    def warm_up(self):
+        pass
+
+class FailingComponent:
+    def __init__(self, *args, **kwargs):
+        raise IOError("model file missing")
+
+@pytest.fixture
+def slow_components(monkeypatch):
+    for name in ('FaceDetector', 'FaceAligner', 'FeatureExtractor', 'FaceDatabase'):
+        monkeypatch.setattr(components_module, name, SlowComponent)
+
+def test_components_load_in_parallel(slow_components):
+    """Test that start-up takes about as long as one component, not all four"""
+    started = time.perf_counter()
+    components = RecognitionComponents()
+    elapsed = time.perf_counter() - started
+
+    assert components.ready()
+    assert isinstance(components.face_aligner, SlowComponent)
+    assert elapsed < 3 * LOAD_SECONDS
+    assert components.status_text() == "Models ready"
+
+def test_components_load_serially_on_request(slow_components):
+    started = time.perf_counter()
+    RecognitionComponents(parallel=False)
+    assert time.perf_counter() - started >= 4 * LOAD_SECONDS
+
+def test_background_loading_reports_progress(slow_components):
+    """Test that the constructor returns at once and the state can be polled"""
+    components = RecognitionComponents(background=True)
+    assert not components.ready()
+    assert components.face_detector is None
+    assert components.status_text().startswith("Loading")
+
+    assert components.wait(timeout=5)
+    assert set(components.status().values()) == {'ready'}
+
+def test_load_failure_is_raised_by_wait(slow_components, monkeypatch):
+    monkeypatch.setattr(components_module, 'FaceAligner', FailingComponent)
+    components = RecognitionComponents(background=True)
+    with pytest.raises(IOError):
+        components.wait(timeout=5)
+    assert components.status()['face_aligner'] == 'failed'
+    assert "face_aligner" in components.status_text()
+    assert not components.ready()
+
+def test_startup_timer_milestones_are_recorded_once():
+    timer = StartupTimer()
+    recorded = []
+    def mark():
+        recorded.append(timer.mark('first_frame'))
+    threads = [threading.Thread(target=mark) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert recorded.count(True) == 1
+    assert 'first_frame' in timer.report()
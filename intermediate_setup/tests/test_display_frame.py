@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from src.gui.display_frame import fit_size, render_display
+
+@pytest.fixture
+def frame():
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    frame[:, :, 0] = 255  # blue in BGR
+    return frame
+
+def test_fit_size_keeps_aspect_ratio():
+    assert fit_size(1920, 1080, 800, 600) == (800, 450)
+    assert fit_size(640, 480, 1600, 600) == (800, 600)
+    assert fit_size(640, 480, 0, 0) == (1, 1)
+
+def test_render_display_scales_and_converts_to_rgb(frame):
+    """Test that the GUI gets an RGB image at the view size, ready to wrap"""
+    image = render_display(frame, None, (800, 600))
+    assert image.shape == (450, 800, 3)
+    assert image.flags['C_CONTIGUOUS']
+    assert np.all(image[:, :, 2] == 255) and np.all(image[:, :, :2] == 0)
+    assert np.all(frame[:, :, 0] == 255)  # camera frame untouched
+
+def test_render_display_draws_boxes_at_display_scale(frame):
+    results = [{'box': (960, 540, 200, 200), 'person_id': 1, 'name': 'Alice', 'similarity': 0.9}]
+    image = render_display(frame, results, (960, 540))
+    # Box corner moves from (960, 540) to (480, 270); the recognized color is green
+    assert tuple(image[270, 480]) == (0, 255, 0)
+    assert tuple(image[10, 10]) == (0, 0, 255)
+
+def test_render_display_alternates_buffers_by_tag(frame):
+    """Test that the image on screen is not overwritten by the next frame"""
+    first = render_display(frame, None, (800, 600), tag='view_rgb0')
+    second = render_display(frame, None, (800, 600), tag='view_rgb1')
+    assert first is not second
+    assert render_display(frame, None, (800, 600), tag='view_rgb0') is first
+
+class ScriptedCapture:
+    """Camera that runs a callback before returning each scripted frame"""
+    def __init__(self, steps):
+        self.steps = list(steps)
+
+    def read(self):
+        if not self.steps:
+            return False, None
+        before, frame = self.steps.pop(0)
+        before()
+        return frame is not None, frame
+
+def test_capture_thread_never_reuses_the_buffer_on_screen():
+    """Test that a dropped frame does not make two rendered frames share a buffer"""
+    pytest.importorskip("PyQt5")
+    from PyQt5.QtCore import Qt
+    from src.gui.video_worker import CaptureThread
+    from src.pipeline.latest_frame_queue import LatestFrameQueue
+    from src.pipeline.stream_stats import StreamStats
+
+    frames = [np.full((60, 80, 3), value, dtype=np.uint8) for value in (10, 20, 30)]
+    shown = []
+    capture = ScriptedCapture([
+        (lambda: None, frames[0]),
+        (lambda: None, frames[1]),                 # dropped: frame 1 is still on screen
+        (lambda: thread.frame_shown(), frames[2]),
+        (lambda: thread.requestInterruption(), None),
+    ])
+    thread = CaptureThread(capture, LatestFrameQueue(), StreamStats(), display_size=(80, 60))
+    thread.frame_ready.connect(lambda frame_id, captured_at, image: shown.append((frame_id, image)),
+                               Qt.DirectConnection)
+    thread.start()
+    assert thread.wait(10000)
+
+    assert [frame_id for frame_id, _ in shown] == [1, 3]
+    assert thread.display_dropped == 1
+    (_, first), (_, second) = shown
+    assert first is not second
+    assert np.all(first == 10) and np.all(second == 30)
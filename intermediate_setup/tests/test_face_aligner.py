@@ -31,6 +31,12 @@ def test_face_aligner_initialization(face_aligner):
     assert face_aligner.predictor is not None
     assert face_aligner.desired_size == (150, 150)
 
+def test_face_aligner_lazy_initialization():
+    """Test that the predictor is not loaded until it is needed"""
+    face_aligner = FaceAligner(MODEL_PATH, preload=False)
+    assert not face_aligner.is_loaded
+    assert face_aligner.predictor_path == MODEL_PATH
+
 @pytest.mark.skipif(not os.path.exists(MODEL_PATH), reason="Model file not found")
 def test_get_landmarks(face_aligner, sample_image, sample_face):
     """Test facial landmark detection"""
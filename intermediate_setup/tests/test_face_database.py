@@ -72,4 +72,46 @@ def test_search_face(face_database, sample_features):
     assert len(match) == 3  # person_id, name, similarity
     assert match[0] == person_id
     assert match[1] == "Test Person"
-    assert 0 <= match[2] <= 1 
\ No newline at end of file
+    assert 0 <= match[2] <= 1
+
+def test_add_face_records_model(face_database, sample_features):
+    """Test that the embedding model and dimension are stored with each face"""
+    person_id = face_database.add_person("Test Person")
+    face_database.add_face(person_id, sample_features, None, model_name="Facenet512")
+    
+    assert face_database.get_models() == [("Facenet512", 512, 1)]
+
+def test_search_face_ignores_other_models(face_database, sample_features):
+    """Test that search never compares embeddings from different models"""
+    person_id = face_database.add_person("Test Person")
+    face_database.add_face(person_id, sample_features, None, model_name="Facenet512")
+    
+    assert face_database.search_face(sample_features, model_name="ArcFace") is None
+    assert face_database.search_face(sample_features, model_name="Facenet512") is not None
+
+def test_search_face_dimension_mismatch(face_database, sample_features):
+    """Test that a query with the wrong dimension for its model is refused"""
+    person_id = face_database.add_person("Test Person")
+    face_database.add_face(person_id, sample_features, None, model_name="Facenet512")
+    
+    with pytest.raises(ValueError):
+        face_database.search_face(np.random.rand(128), model_name="Facenet512")
+
+def test_migrate_legacy_database(tmp_path, sample_features):
+    """Test that rows written before model tracking are tagged as VGG-Face"""
+    import pickle
+    import sqlite3
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE persons (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, '
+                 'created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)')
+    conn.execute('CREATE TABLE faces (id INTEGER PRIMARY KEY AUTOINCREMENT, person_id INTEGER, '
+                 'features BLOB, image_path TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)')
+    conn.execute("INSERT INTO persons (name) VALUES ('Legacy Person')")
+    conn.execute('INSERT INTO faces (person_id, features) VALUES (1, ?)', (pickle.dumps(sample_features),))
+    conn.commit()
+    conn.close()
+    
+    face_database = FaceDatabase(db_path)
+    assert face_database.get_models() == [("VGG-Face", 512, 1)]
+    assert face_database.search_face(sample_features)[1] == "Legacy Person"
@@ -26,6 +26,11 @@ def test_face_detector_initialization(face_detector):
     assert face_detector is not None
     assert face_detector.detector is not None
 
+def test_face_detector_lazy_initialization():
+    """Test that the detector is only loaded on first use"""
+    face_detector = FaceDetector(preload=False)
+    assert not face_detector.is_loaded
+
 def test_detect_faces(face_detector, sample_image):
     """Test face detection on a sample image"""
     faces = face_detector.detect_faces(sample_image)
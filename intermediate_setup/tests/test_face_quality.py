@@ -0,0 +1,63 @@
+import pytest
+import numpy as np
+from src.quality.face_quality import FaceQualityGate
+
+@pytest.fixture
+def quality_gate():
+    return FaceQualityGate()
+
+@pytest.fixture
+def sharp_image():
+    # High-contrast random texture: bright enough and very sharp
+    rng = np.random.default_rng(0)
+    return rng.integers(60, 200, (480, 640, 3), dtype=np.uint8)
+
+@pytest.fixture
+def frontal_landmarks():
+    # Only the eyes (36-47) and nose tip (30) are used for pose
+    landmarks = np.zeros((68, 2))
+    landmarks[36:42] = (100, 100)
+    landmarks[42:48] = (160, 100)
+    landmarks[30] = (130, 140)
+    return landmarks
+
+def test_good_face_passes(quality_gate, sharp_image, frontal_landmarks):
+    """Test that a large, sharp, well-lit frontal face passes"""
+    results = quality_gate.assess(sharp_image, [(80, 60, 120, 120)], [frontal_landmarks])
+    assert len(results) == 1
+    assert results[0]['passed']
+    assert results[0]['reasons'] == []
+    assert abs(results[0]['yaw']) < 1e-6
+
+def test_small_face_rejected(quality_gate, sharp_image):
+    """Test that faces below the minimum size are skipped"""
+    results = quality_gate.assess(sharp_image, [(10, 10, 30, 30)])
+    assert not results[0]['passed']
+    assert "too small" in results[0]['reasons']
+
+def test_dark_and_blurry_face_rejected(quality_gate):
+    """Test brightness and blur checks on a flat dark image"""
+    dark_image = np.full((480, 640, 3), 10, dtype=np.uint8)
+    results = quality_gate.assess(dark_image, [(80, 60, 120, 120)])
+    assert "too dark" in results[0]['reasons']
+    assert "too blurry" in results[0]['reasons']
+
+def test_turned_head_rejected(quality_gate, sharp_image, frontal_landmarks):
+    """Test that a face in profile is skipped"""
+    profile_landmarks = frontal_landmarks.copy()
+    profile_landmarks[30] = (175, 140)  # nose well beyond the right eye
+    results = quality_gate.assess(sharp_image, [(80, 60, 120, 120)], [profile_landmarks])
+    assert "head turned" in results[0]['reasons']
+
+def test_batch_scoring_and_counters(quality_gate, sharp_image):
+    """Test that several faces are scored together and skips are counted"""
+    boxes = [(80, 60, 120, 120), (10, 10, 30, 30), (300, 200, 100, 100)]
+    results = quality_gate.assess(sharp_image, boxes)
+    assert [r['passed'] for r in results] == [True, False, True]
+    assert quality_gate.faces_seen == 3
+    assert quality_gate.cnn_calls_saved == 1
+    assert "1 embedding calls saved" in quality_gate.report()
+
+def test_no_faces(quality_gate, sharp_image):
+    """Test that an empty detection list is handled"""
+    assert quality_gate.assess(sharp_image, []) == []
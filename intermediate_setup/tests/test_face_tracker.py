@@ -0,0 +1,67 @@
+import numpy as np
+from src.tracking.face_tracker import FaceTracker, box_iou
+from src.tracking.recognition_cache import RecognitionCache
+
+def test_box_iou():
+    """Test IoU of identical, disjoint and half-overlapping boxes"""
+    iou = box_iou([(0, 0, 10, 10)], [(0, 0, 10, 10), (20, 20, 10, 10), (5, 0, 10, 10)])
+    assert iou.shape == (1, 3)
+    assert np.isclose(iou[0, 0], 1.0)
+    assert iou[0, 1] == 0.0
+    assert np.isclose(iou[0, 2], 50 / 150)
+
+def test_tracker_keeps_ids_for_moving_faces():
+    """Test that slightly moved boxes keep their track IDs"""
+    tracker = FaceTracker()
+    first_ids, _ = tracker.update([(0, 0, 100, 100), (300, 0, 100, 100)])
+    second_ids, ended = tracker.update([(305, 5, 100, 100), (5, 5, 100, 100)])
+    assert second_ids == [first_ids[1], first_ids[0]]
+    assert ended == []
+
+def test_tracker_new_face_gets_new_id():
+    """Test that a box with no overlap starts a new track"""
+    tracker = FaceTracker()
+    first_ids, _ = tracker.update([(0, 0, 100, 100)])
+    second_ids, _ = tracker.update([(0, 0, 100, 100), (400, 300, 80, 80)])
+    assert second_ids[0] == first_ids[0]
+    assert second_ids[1] not in first_ids
+
+def test_tracker_ends_missing_tracks():
+    """Test that tracks end after max_missed updates without a match"""
+    tracker = FaceTracker(max_missed=2)
+    track_ids, _ = tracker.update([(0, 0, 100, 100)])
+    assert tracker.update([])[1] == []
+    assert tracker.update([])[1] == []
+    assert tracker.update([])[1] == track_ids
+
+def test_cache_reuses_identity_until_refresh():
+    """Test that a confident identity is reused until the refresh interval"""
+    cache = RecognitionCache(refresh_interval=10)
+    assert cache.lookup(1, frame_index=1) is None
+    cache.update(1, 1, (7, "Alice", 0.9))
+
+    assert cache.lookup(1, frame_index=5)['name'] == "Alice"
+    assert cache.lookup(1, frame_index=11) is None
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+def test_cache_rechecks_low_confidence_sooner():
+    """Test that unknown or uncertain identities are re-embedded more often"""
+    cache = RecognitionCache(refresh_interval=30, low_confidence_interval=5)
+    cache.update(1, 1, None)
+    assert not cache.needs_refresh(1, frame_index=3)
+    assert cache.needs_refresh(1, frame_index=6)
+
+def test_cache_refreshes_on_better_quality():
+    """Test that a clearly better crop triggers a re-embed"""
+    cache = RecognitionCache(quality_margin=0.1)
+    cache.update(1, 1, (7, "Alice", 0.9), quality_score=0.5)
+    assert not cache.needs_refresh(1, frame_index=2, quality_score=0.55)
+    assert cache.needs_refresh(1, frame_index=2, quality_score=0.7)
+
+def test_cache_expire():
+    """Test that entries of ended tracks are dropped"""
+    cache = RecognitionCache()
+    cache.update(1, 1, (7, "Alice", 0.9))
+    cache.expire([1])
+    assert cache.get(1) is None
@@ -1,10 +1,12 @@
 import pytest
 import numpy as np
 from src.recognition.feature_extractor import FeatureExtractor
+from src.recognition.backends import available_backends, get_backend
 
 @pytest.fixture
 def feature_extractor():
-    return FeatureExtractor()
+    # Don't build the DeepFace model; extract_features() loads it on first use
+    return FeatureExtractor(preload=False)
 
 @pytest.fixture
 def sample_face():
@@ -16,6 +18,42 @@ def test_feature_extractor_initialization(feature_extractor):
     assert feature_extractor is not None
     assert feature_extractor.model_name == "VGG-Face"
 
+def test_feature_extractor_lazy_initialization(feature_extractor):
+    """Test that construction does not load the model weights"""
+    assert not feature_extractor.is_loaded
+
+def test_backend_registry():
+    """Test the registry of selectable embedding models"""
+    assert "VGG-Face" in available_backends()
+    assert "Dlib-ResNet" in available_backends()
+    assert get_backend("VGG-Face").dimension == 4096
+    assert get_backend("Dlib-ResNet").dimension == 128
+    with pytest.raises(ValueError):
+        get_backend("Unknown-Model")
+
+def test_feature_extractor_model_selection():
+    """Test choosing a lighter embedding model"""
+    feature_extractor = FeatureExtractor(model_name="Facenet", preload=False)
+    assert feature_extractor.model_name == "Facenet"
+    assert feature_extractor.embedding_dim == 128
+
+def test_onnx_engine_selection():
+    """Test that the ONNX engine wraps the same model without loading it"""
+    feature_extractor = FeatureExtractor(model_name="Facenet", preload=False, engine="onnx",
+                                         onnx_threads=2, quantize=True)
+    assert feature_extractor.engine == "onnx"
+    assert feature_extractor.embedding_dim == 128
+    assert feature_extractor.backend.intra_op_threads == 2
+    assert feature_extractor.backend.model_path.endswith("Facenet.int8.onnx")
+    assert not feature_extractor.is_loaded
+
+def test_onnx_engine_rejects_non_deepface_models():
+    """Test that only DeepFace networks can be exported to ONNX"""
+    with pytest.raises(ValueError):
+        FeatureExtractor(model_name="Dlib-ResNet", preload=False, engine="onnx")
+    with pytest.raises(ValueError):
+        FeatureExtractor(preload=False, engine="tensorrt")
+
 def test_extract_features(feature_extractor, sample_face):
     """Test feature extraction"""
     features = feature_extractor.extract_features(sample_face)
@@ -0,0 +1,74 @@
+import pytest
+import numpy as np
+from src.pipeline.frame_recognizer import FrameRecognizer
+from src.tracking.face_tracker import FaceTracker
+from src.tracking.recognition_cache import RecognitionCache
+
+class Rect:
+    """Minimal stand-in for dlib.rectangle"""
+    def __init__(self, left, top, right, bottom):
+        self._box = (left, top, right, bottom)
+    def left(self): return self._box[0]
+    def top(self): return self._box[1]
+    def right(self): return self._box[2]
+    def bottom(self): return self._box[3]
+
+class StaticDetector:
+    def __init__(self, faces):
+        self.faces = faces
+    def detect_faces(self, image):
+        return list(self.faces)
+
+class CountingAligner:
+    desired_size = (150, 150)
+    def get_landmarks(self, image, face):
+        return None
+    def align_face(self, image, face, landmarks=None, dst=None):
+        return np.zeros((150, 150, 3), dtype=np.uint8)
+
+class CountingExtractor:
+    model_name = "VGG-Face"
+    def __init__(self):
+        self.calls = 0
+    def extract_features(self, face_image):
+        self.calls += 1
+        return np.ones(4)
+
+class StaticDatabase:
+    def search_face(self, features, threshold=0.6, model_name=None):
+        return (1, "Alice", 0.95)
+
+@pytest.fixture
+def frame():
+    return np.zeros((480, 640, 3), dtype=np.uint8)
+
+def make_recognizer(extractor, tracking):
+    return FrameRecognizer(StaticDetector([Rect(100, 100, 200, 200)]), CountingAligner(),
+                           extractor, StaticDatabase(),
+                           tracker=FaceTracker() if tracking else None,
+                           cache=RecognitionCache(refresh_interval=10) if tracking else None)
+
+def test_recognize_without_cache(frame):
+    """Test that every frame is embedded when tracking is off"""
+    extractor = CountingExtractor()
+    recognizer = make_recognizer(extractor, tracking=False)
+    for _ in range(5):
+        results = recognizer.recognize(frame)
+    assert extractor.calls == 5
+    assert results[0]['name'] == "Alice"
+    assert results[0]['box'] == (100, 100, 100, 100)
+
+def test_recognize_reuses_tracked_identity(frame):
+    """Test that a tracked face is only embedded on refresh"""
+    extractor = CountingExtractor()
+    recognizer = make_recognizer(extractor, tracking=True)
+    for _ in range(20):
+        results = recognizer.recognize(frame)
+    assert extractor.calls == 2  # first frame and one refresh after 10 frames
+    assert results[0]['name'] == "Alice"
+    assert results[0]['cached']
+
+def test_cache_requires_tracker():
+    """Test that a cache without a tracker is rejected"""
+    with pytest.raises(ValueError):
+        FrameRecognizer(None, None, None, None, cache=RecognitionCache())
@@ -0,0 +1,59 @@
+import pytest
+from src.pipeline.frame_skip_controller import AdaptiveFrameSkipController
+
+def feed(controller, count, busy, period, latency=None, start=0.0):
+    """Record `count` runs of `busy` seconds, one every `period` seconds"""
+    now = start
+    for _ in range(count):
+        captured_at = now - (latency - busy) if latency is not None else None
+        controller.record(now, now + busy, captured_at)
+        now += period
+    return now
+
+def test_fixed_interval():
+    """Test that a fixed controller processes every n-th frame and never adapts"""
+    controller = AdaptiveFrameSkipController.fixed(3)
+    assert [i for i in range(1, 11) if controller.should_process(i)] == [1, 4, 7, 10]
+    feed(controller, 50, busy=1.0, period=1.0)
+    assert controller.interval == 3
+    controller.reset()
+    assert controller.should_process(1)
+
+def test_overloaded_cpu_increases_interval():
+    """Test that a recognition thread busy all the time skips more frames"""
+    controller = AdaptiveFrameSkipController(target_cpu=0.5, initial_interval=2, window=5)
+    feed(controller, 5, busy=0.1, period=0.1)
+    assert controller.interval == 4
+    assert controller.adjustments == 1
+
+def test_idle_cpu_decreases_interval_to_minimum():
+    """Test that a mostly idle recognition thread processes more frames"""
+    controller = AdaptiveFrameSkipController(target_cpu=0.5, initial_interval=8, window=5)
+    now = 0.0
+    for _ in range(5):
+        now = feed(controller, 5, busy=0.01, period=0.1, start=now)
+    assert controller.interval == controller.min_interval
+
+def test_hysteresis_keeps_interval_near_target():
+    """Test that measurements inside the dead band do not change the interval"""
+    controller = AdaptiveFrameSkipController(target_cpu=0.5, initial_interval=4, window=5,
+                                             hysteresis=0.2)
+    feed(controller, 20, busy=0.05, period=0.1)
+    assert controller.interval == 4
+    assert controller.adjustments == 0
+
+def test_latency_target():
+    """Test that the latency target drives the interval in both directions"""
+    controller = AdaptiveFrameSkipController(target_latency_ms=100, initial_interval=3,
+                                             max_interval=6, window=4)
+    now = feed(controller, 4, busy=0.05, period=1.0, latency=0.3)
+    assert controller.interval == 6
+    feed(controller, 4, busy=0.01, period=1.0, latency=0.02, start=now)
+    assert controller.interval == 1
+    assert "target latency 100 ms" in controller.report()
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        AdaptiveFrameSkipController(target_latency_ms=None, target_cpu=None)
+    with pytest.raises(ValueError):
+        AdaptiveFrameSkipController(min_interval=5, max_interval=2)
@@ -0,0 +1,93 @@
+import time
+import numpy as np
+import pytest
+from src.capture.frame_source import (FrameRecorder, RecordingCapture, ReplaySource, open_capture,
+                                      read_timing_index)
+
+class ListCapture:
+    """Camera stand-in that returns a fixed list of frames"""
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.released = False
+    def read(self):
+        if not self.frames:
+            return False, None
+        return True, self.frames.pop(0)
+    def isOpened(self):
+        return True
+    def get(self, prop):
+        return 0.0
+    def set(self, prop, value):
+        return False
+    def release(self):
+        self.released = True
+
+@pytest.fixture
+def recording(tmp_path):
+    """Ten frames captured 50 ms apart, with a 200 ms gap before the last one"""
+    path = str(tmp_path / "recording.avi")
+    recorder = FrameRecorder(path, fps=20)
+    timestamps = [i * 0.05 for i in range(9)] + [0.6]
+    for i, timestamp in enumerate(timestamps):
+        recorder.write(np.full((48, 64, 3), i * 20, dtype=np.uint8), timestamp=100.0 + timestamp)
+    recorder.close()
+    return path, timestamps
+
+def read_all(source):
+    frames = []
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            return frames
+        frames.append(frame)
+
+def test_recorder_writes_video_and_timing_index(recording):
+    """Test that the index keeps the real capture times relative to the first frame"""
+    path, timestamps = recording
+    assert read_timing_index(path) == pytest.approx(timestamps)
+    frames = read_all(ReplaySource(path, speed=0))
+    assert len(frames) == 10
+    assert [int(round(f.mean() / 20)) for f in frames] == list(range(10))
+
+def test_recording_capture_passes_frames_through(tmp_path):
+    """Test that a wrapped capture returns its frames and records them"""
+    frames = [np.full((48, 64, 3), value, dtype=np.uint8) for value in (10, 200)]
+    path = str(tmp_path / "live.avi")
+    capture = RecordingCapture(ListCapture(frames), FrameRecorder(path))
+    assert len(read_all(capture)) == 2
+    capture.release()
+    assert capture.capture.released
+    assert len(read_timing_index(path)) == 2
+
+def test_replay_speed(recording):
+    """Test real-time, N-x and as-fast-as-possible pacing"""
+    path, timestamps = recording
+    start = time.perf_counter()
+    read_all(ReplaySource(path, speed=4.0))
+    fast_forward = time.perf_counter() - start
+    assert timestamps[-1] / 4 * 0.8 <= fast_forward < timestamps[-1]
+
+    start = time.perf_counter()
+    read_all(ReplaySource(path, speed=0))
+    assert time.perf_counter() - start < timestamps[-1] / 4
+
+def test_replay_loop_and_drop_late(recording):
+    """Test looping playback and camera-like dropping of late frames"""
+    path, _ = recording
+    source = ReplaySource(path, speed=0, loop=True)
+    assert all(source.read()[0] for _ in range(25))  # 2.5 passes over 10 frames
+
+    source = ReplaySource(path, speed=1.0, drop_late=True)
+    source.read()
+    time.sleep(0.5)  # frames 1-7 are overdue; frame 8 (0.4 s) is current until 0.6 s
+    ret, frame = source.read()
+    assert ret and int(round(frame.mean() / 20)) == 8
+    assert source.frames_dropped == 7
+
+def test_open_capture_replays_files(recording):
+    """Test that open_capture returns a replayer for files when asked to"""
+    path, _ = recording
+    assert isinstance(open_capture(path, replay_speed=0), ReplaySource)
+    assert not isinstance(open_capture(path), ReplaySource)
+    with pytest.raises(IOError):
+        ReplaySource(path + ".missing")
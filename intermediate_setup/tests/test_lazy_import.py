@@ -0,0 +1,33 @@
+import sys
+import pytest
+from src.utils.lazy_import import LazyModule
+from src.utils.startup_timer import StartupTimer
+
+def test_lazy_module_defers_import():
+    """Test that the module is imported on first attribute access"""
+    sys.modules.pop('colorsys', None)
+    colorsys = LazyModule('colorsys')
+    assert not colorsys.is_loaded
+    assert 'colorsys' not in sys.modules
+
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert colorsys.is_loaded
+
+def test_lazy_module_missing_module():
+    """Test that a missing module only fails when it is used"""
+    missing = LazyModule('module_that_does_not_exist')
+    with pytest.raises(ImportError):
+        missing.anything
+
+def test_startup_timer_report():
+    """Test the per-component start-up report"""
+    timer = StartupTimer()
+    with timer.stage('face_detector'):
+        pass
+    with timer.stage('face_database'):
+        pass
+
+    assert [name for name, _ in timer.stages] == ['face_detector', 'face_database']
+    report = timer.report()
+    assert 'face_detector' in report
+    assert 'total' in report
@@ -0,0 +1,72 @@
+import os
+import pytest
+from src.utils.metrics import MetricsRegistry, MetricsReporter, Histogram
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry(enabled=True)
+
+def test_histogram_percentiles():
+    """Test that percentiles land within one bucket (50%) of the true value"""
+    histogram = Histogram('detect')
+    for i in range(1, 1001):
+        histogram.observe(i / 1000.0)  # 1 ms .. 1 s, uniform
+    assert histogram.count == 1000
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=0.5)
+    assert histogram.percentile(99) == pytest.approx(0.99, rel=0.5)
+    assert histogram.percentile(50) < histogram.percentile(95) <= histogram.percentile(99)
+    assert Histogram('empty').percentile(50) == 0.0
+
+def test_disabled_registry_records_nothing():
+    """Test that instrumentation is a no-op while disabled"""
+    registry = MetricsRegistry(enabled=False)
+
+    @registry.timed('stage')
+    def work(x):
+        return x * 2
+
+    assert work(21) == 42
+    registry.inc('frames')
+    with registry.timer('block'):
+        pass
+    assert registry.histograms == {} and registry.counters == {}
+
+def test_timed_and_counters(registry):
+    """Test that decorated calls, timers, counters and gauges are recorded"""
+    @registry.timed('embed')
+    def embed():
+        return "features"
+
+    for _ in range(3):
+        assert embed() == "features"
+    with registry.timer('search'):
+        pass
+    registry.inc('faces', 5)
+    registry.set('frame_skip_interval', 4)
+
+    assert registry.histograms['embed'].count == 3
+    assert registry.histograms['search'].count == 1
+    lines = registry.log_lines()
+    assert any(line.startswith("[metrics] embed") and "p95=" in line for line in lines)
+    assert "faces=5" in lines[-1] and "frame_skip_interval=4" in lines[-1]
+
+def test_prometheus_file(registry, tmp_path):
+    """Test the exposition format and that the file is replaced atomically"""
+    registry.observe('detect', 0.02)
+    registry.observe('detect', 0.04)
+    registry.inc('frames', 2)
+    path = str(tmp_path / "face.prom")
+    reporter = MetricsReporter(registry, interval=60, prometheus_path=path, log=False)
+    reporter.start()
+    reporter.stop()  # writes a final report
+
+    text = open(path).read()
+    assert "# TYPE face_recognition_detect_seconds histogram" in text
+    assert 'face_recognition_detect_seconds_bucket{le="+Inf"} 2' in text
+    assert "face_recognition_detect_seconds_count 2" in text
+    assert "face_recognition_frames_total 2" in text
+    assert os.listdir(tmp_path) == ["face.prom"]
+
+    # Bucket counts are cumulative
+    buckets = [int(line.rsplit(" ", 1)[1]) for line in text.splitlines() if "_bucket{" in line]
+    assert buckets == sorted(buckets)
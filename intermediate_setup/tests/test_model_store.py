@@ -0,0 +1,150 @@
+import bz2
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.utils.model_store import ModelStore
+
+MODEL = os.urandom(200_000) + b'landmarks' * 50_000
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """Serves the server's payload with Range support, optionally cutting the first response short"""
+
+    def do_GET(self):
+        server = self.server
+        server.range_headers.append(self.headers.get('Range'))
+        data = server.payload
+        start = 0
+        if self.headers.get('Range') and server.honor_range:
+            start = int(self.headers['Range'].split('=')[1].split('-')[0])
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(data) - start))
+        self.end_headers()
+        body = data[start:]
+        if server.cut_after is not None:
+            body = body[:server.cut_after]
+            server.cut_after = None
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    httpd.payload = bz2.compress(MODEL)
+    httpd.range_headers = []
+    httpd.honor_range = True
+    httpd.cut_after = None
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def store(tmp_path):
+    return ModelStore(str(tmp_path / 'models'))
+
+def url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/model.dat.bz2"
+
+def test_install_archive_streams_and_records_manifest(store, tmp_path):
+    archive = tmp_path / 'model.dat.bz2'
+    archive.write_bytes(bz2.compress(MODEL))
+    path = store.install_archive('model.dat', str(archive), chunk_size=4096)
+
+    assert open(path, 'rb').read() == MODEL
+    entry = ModelStore(store.models_dir).manifest()['model.dat']
+    assert entry['size'] == len(MODEL)
+    assert entry['sha256'] == hashlib.sha256(MODEL).hexdigest()
+    assert entry['source'] == str(archive)
+    assert store.is_installed('model.dat')
+
+def test_fast_check_uses_stat_and_verify_hashes(store, tmp_path):
+    archive = tmp_path / 'model.dat'
+    archive.write_bytes(MODEL)
+    path = store.install_archive('model.dat', str(archive))
+    stat = os.stat(path)
+
+    # Same size and mtime: the stat check passes, only a full verify notices
+    with open(path, 'r+b') as f:
+        f.write(bytes([MODEL[0] ^ 0xFF]))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert store.is_installed('model.dat')
+    assert store.verify() == {'model.dat': 'modified'}
+
+    with open(path, 'ab') as f:
+        f.write(b'more')
+    assert not store.is_installed('model.dat')
+    os.remove(path)
+    assert store.verify() == {'model.dat': 'missing'}
+
+def test_truncated_archive_leaves_nothing_installed(store, tmp_path):
+    archive = tmp_path / 'model.dat.bz2'
+    archive.write_bytes(bz2.compress(MODEL)[:-200])
+    with pytest.raises(ValueError):
+        store.install_archive('model.dat', str(archive))
+    assert os.listdir(store.models_dir) == []
+    assert not store.is_installed('model.dat')
+
+def test_checksum_mismatch_is_rejected(store, tmp_path):
+    archive = tmp_path / 'model.dat'
+    archive.write_bytes(MODEL)
+    with pytest.raises(ValueError):
+        store.install_archive('model.dat', str(archive), expected_sha256='0' * 64)
+    assert not os.path.exists(store.path('model.dat'))
+
+def test_fetch_resumes_interrupted_download(store, server):
+    """Test that a dropped connection is continued with a Range request"""
+    server.cut_after = len(server.payload) // 3
+    path = store.fetch('model.dat', url(server), retry_delay=0, chunk_size=8192)
+
+    assert open(path, 'rb').read() == MODEL
+    assert server.range_headers == [None, f"bytes={len(server.payload) // 3}-"]
+    assert not os.path.exists(path + '.bz2.part')
+    assert store.is_installed('model.dat')
+
+def test_fetch_continues_partial_file_from_earlier_run(store, server):
+    os.makedirs(store.models_dir)
+    with open(store.path('model.dat') + '.bz2.part', 'wb') as f:
+        f.write(server.payload[:1000])
+    store.fetch('model.dat', url(server), expected_sha256=hashlib.sha256(MODEL).hexdigest())
+    assert server.range_headers == ["bytes=1000-"]
+    assert open(store.path('model.dat'), 'rb').read() == MODEL
+
+def test_fetch_restarts_when_range_is_ignored(store, server):
+    server.honor_range = False
+    os.makedirs(store.models_dir)
+    with open(store.path('model.dat') + '.bz2.part', 'wb') as f:
+        f.write(b'stale bytes')
+    store.fetch('model.dat', url(server))
+    assert open(store.path('model.dat'), 'rb').read() == MODEL
+
+def test_check_rehashes_when_stat_changes(store, tmp_path):
+    """Test that a changed stat is only accepted if the contents still match"""
+    archive = tmp_path / 'model.dat'
+    archive.write_bytes(MODEL)
+    path = store.install_archive('model.dat', str(archive))
+    assert store.check('model.dat') == 'ok'
+
+    # Same contents, new mtime: accepted and the manifest is refreshed
+    os.utime(path, ns=(0, 10**18))
+    assert store.check('model.dat') == 'ok'
+    assert ModelStore(store.models_dir).manifest()['model.dat']['mtime_ns'] == 10**18
+
+    # Truncated: rejected, and the manifest keeps the original checksum
+    with open(path, 'r+b') as f:
+        f.truncate(1000)
+    assert store.check('model.dat') == 'modified'
+    assert store.check('model.dat') == 'modified'
+    assert store.manifest()['model.dat']['sha256'] == hashlib.sha256(MODEL).hexdigest()
+
+    os.remove(path)
+    assert store.check('model.dat') == 'missing'
+    open(store.path('other.dat'), 'wb').close()
+    assert store.check('other.dat') == 'unknown'
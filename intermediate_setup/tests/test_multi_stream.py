@@ -0,0 +1,81 @@
+import threading
+import cv2
+import numpy as np
+import pytest
+from src.capture.frame_source import open_capture, parse_source, is_live_source
+from src.server import multi_stream
+from src.server.multi_stream import MultiStreamRunner
+
+class CountingRecognizer:
+    def __init__(self):
+        self.frames = 0
+    def recognize(self, frame):
+        self.frames += 1
+        return []
+
+class SharedComponents:
+    """Stand-in for RecognitionComponents that counts recognizers"""
+    def __init__(self):
+        self.recognizers = []
+    def create_recognizer(self, **kwargs):
+        recognizer = CountingRecognizer()
+        self.recognizers.append(recognizer)
+        return recognizer
+
+@pytest.fixture
+def video_files(tmp_path):
+    paths = []
+    for index in range(3):
+        path = str(tmp_path / f"video{index}.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+        for frame_id in range(20):
+            writer.write(np.full((48, 64, 3), frame_id * 10, dtype=np.uint8))
+        writer.release()
+        paths.append(path)
+    return paths
+
+def test_parse_source():
+    """Test that device indexes, files and URLs are told apart"""
+    assert parse_source("0") == 0
+    assert parse_source("video.mp4") == "video.mp4"
+    assert is_live_source("1")
+    assert is_live_source("rtsp://camera/stream")
+    assert not is_live_source("video.mp4")
+
+def test_runner_processes_all_streams(video_files):
+    """Test that every stream gets its own recognizer and all are served"""
+    components = SharedComponents()
+    results = []
+    lock = threading.Lock()
+    def on_result(stream_name, frame_id, captured_at, faces):
+        with lock:
+            results.append((stream_name, frame_id))
+
+    runner = MultiStreamRunner(video_files, components, num_workers=2, on_result=on_result,
+                               realtime=False)
+    runner.run(stats_interval=60, duration=10)
+
+    assert runner.finished
+    assert len(components.recognizers) == 3
+    assert all(recognizer.frames > 0 for recognizer in components.recognizers)
+    assert {name for name, _ in results} == {stream.name for stream in runner.streams}
+
+    # Frames of one stream are reported in capture order
+    for stream in runner.streams:
+        frame_ids = [frame_id for name, frame_id in results if name == stream.name]
+        assert frame_ids == sorted(frame_ids)
+    assert len(runner.stats_lines()) == 3
+
+def test_runner_rejects_missing_source(tmp_path, video_files, monkeypatch):
+    """Test that an unreadable source fails early and releases the sources opened before it"""
+    opened = []
+    def open_and_record(source, **kwargs):
+        capture = open_capture(source, **kwargs)
+        opened.append(capture)
+        return capture
+    monkeypatch.setattr(multi_stream, 'open_capture', open_and_record)
+
+    with pytest.raises(IOError):
+        MultiStreamRunner(video_files[:2] + [str(tmp_path / "missing.mp4")], SharedComponents())
+    assert len(opened) == 2
+    assert not any(capture.isOpened() for capture in opened)
@@ -0,0 +1,126 @@
+import os
+import time
+import numpy as np
+import pytest
+from src.server.process_pool import SharedFrameRing, RecognitionWorkerPool
+
+class MeanRecognizer:
+    """Reports the mean pixel value and process ID instead of faces"""
+    def recognize(self, frame):
+        return [{'box': (0, 0, frame.shape[1], frame.shape[0]), 'track_id': os.getpid(),
+                 'person_id': None, 'name': str(float(frame.mean())), 'similarity': None,
+                 'cached': False}]
+
+class MeanComponents:
+    def create_recognizer(self, **kwargs):
+        return MeanRecognizer()
+
+class CrashingRecognizer(MeanRecognizer):
+    """Exits the worker process on an all-255 frame"""
+    def recognize(self, frame):
+        if frame.min() == 255:
+            os._exit(3)
+        return super().recognize(frame)
+
+class CrashingComponents:
+    def create_recognizer(self, **kwargs):
+        return CrashingRecognizer()
+
+def create_mean_components(component_options):
+    # Module-level so spawned worker processes can unpickle it
+    return MeanComponents()
+
+def create_crashing_components(component_options):
+    return CrashingComponents()
+
+def create_slow_components(component_options):
+    time.sleep(60)
+    return MeanComponents()
+
+def test_ring_slots_share_memory():
+    """Test that a frame written by the owner is visible through an attached ring"""
+    ring = SharedFrameRing(2, (4, 6, 3))
+    try:
+        frame = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+        ring.write(1, frame)
+        attached = SharedFrameRing(2, (4, 6, 3), name=ring.name)
+        assert np.array_equal(attached.view(1, frame.shape), frame)
+        assert not attached.view(0, frame.shape).any()
+        attached.close()
+    finally:
+        ring.close()
+        ring.unlink()
+
+def test_ring_smaller_and_oversized_frames():
+    """Test that smaller frames fit a slot and larger ones are rejected"""
+    ring = SharedFrameRing(1, (8, 8, 3))
+    try:
+        small = np.full((2, 3, 3), 7, dtype=np.uint8)
+        assert ring.write(0, small) == (2, 3, 3)
+        assert np.array_equal(ring.view(0, (2, 3, 3)), small)
+        with pytest.raises(ValueError):
+            ring.write(0, np.zeros((9, 8, 3), dtype=np.uint8))
+    finally:
+        ring.close()
+        ring.unlink()
+
+def test_pool_returns_results_per_frame():
+    """Test that frames reach the workers through shared memory and results come back"""
+    pool = RecognitionWorkerPool(2, (16, 16, 3), num_slots=2, factory=create_mean_components)
+    pool.start(timeout=60)
+    try:
+        frames = [np.full((16, 16, 3), value, dtype=np.uint8) for value in range(10)]
+        futures = [pool.submit(frame, stream_id=i % 2) for i, frame in enumerate(frames)]
+        results = [future.result(timeout=30) for future in futures]
+        assert [float(r[0]['name']) for r in results] == list(range(10))
+
+        # Frames of a stream always go to the same worker process
+        pids = {}
+        for i, r in enumerate(results):
+            pids.setdefault(i % 2, set()).add(r[0]['track_id'])
+        assert all(len(p) == 1 for p in pids.values())
+
+        recognizer = pool.create_recognizer(tracking=False)
+        assert recognizer.recognize(frames[3])[0]['name'] == '3.0'
+    finally:
+        pool.stop()
+    assert pool.ring is None
+
+def test_rejected_frames_do_not_leak_slots():
+    """Test that frames the ring cannot hold are refused without using up slots"""
+    pool = RecognitionWorkerPool(1, (8, 8, 3), num_slots=2, factory=create_mean_components)
+    pool.start(timeout=60)
+    try:
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                pool.submit(np.zeros((9, 8, 3), dtype=np.uint8), timeout=1)
+            with pytest.raises(TypeError):
+                pool.submit(np.zeros((8, 8, 3), dtype=np.float32), timeout=1)
+        frame = np.full((8, 8, 3), 5, dtype=np.uint8)
+        assert pool.submit(frame, timeout=1).result(timeout=30)[0]['name'] == '5.0'
+    finally:
+        pool.stop()
+
+def test_start_times_out_when_workers_are_not_ready():
+    pool = RecognitionWorkerPool(1, (8, 8, 3), factory=create_slow_components)
+    with pytest.raises(RuntimeError):
+        pool.start(timeout=1)
+    assert pool.ring is None
+
+def test_dead_worker_fails_its_pending_frames():
+    """Test that frames of a worker that died fail instead of waiting forever"""
+    pool = RecognitionWorkerPool(2, (8, 8, 3), num_slots=4, factory=create_crashing_components)
+    pool.start(timeout=60)
+    try:
+        crash = pool.submit(np.full((8, 8, 3), 255, dtype=np.uint8), stream_id=0)
+        with pytest.raises(RuntimeError):
+            crash.result(timeout=30)
+        with pytest.raises(RuntimeError):
+            pool.submit(np.zeros((8, 8, 3), dtype=np.uint8), stream_id=0)
+
+        # The other worker keeps going and the dead worker's slot is free again
+        futures = [pool.submit(np.full((8, 8, 3), i, dtype=np.uint8), stream_id=1, timeout=5)
+                   for i in range(4)]
+        assert [f.result(timeout=30)[0]['name'] for f in futures] == ['0.0', '1.0', '2.0', '3.0']
+    finally:
+        pool.stop()
@@ -0,0 +1,103 @@
+import os
+import signal
+import threading
+import time
+import tracemalloc
+import pytest
+from src.utils.profiling import Profiler, create_profiler
+
+def busy_work():
+    return sum(i * i for i in range(20000))
+
+@pytest.fixture
+def profiler(tmp_path):
+    profiler = Profiler(output_dir=str(tmp_path), profile_seconds=0.05, snapshot_interval=0)
+    yield profiler
+    profiler.stop()
+
+def files(directory, prefix):
+    return sorted(name for name in os.listdir(directory) if name.startswith(prefix))
+
+def test_window_closes_after_profile_seconds(profiler, tmp_path):
+    """Test that a bounded window writes a .prof and a text summary, then stops profiling"""
+    profiler.start()
+    assert profiler.window_active
+    busy_work()
+    time.sleep(0.06)
+    profiler.tick()
+    assert not profiler.window_active
+    assert [name.split('.')[-1] for name in files(tmp_path, 'cpu_')] == ['prof', 'txt']
+    with open(os.path.join(tmp_path, files(tmp_path, 'cpu_')[1])) as f:
+        assert 'busy_work' in f.read()
+
+def test_profiled_includes_other_threads(profiler, tmp_path):
+    """Test that wrapped functions on worker threads end up in the same dump"""
+    profiler.start()
+    thread = threading.Thread(target=profiler.profiled(busy_work))
+    thread.start()
+    thread.join()
+    profiler.stop()
+    with open(os.path.join(tmp_path, files(tmp_path, 'cpu_')[1])) as f:
+        assert 'busy_work' in f.read()
+
+def test_capture_on_demand(profiler, tmp_path):
+    """Test that request_capture() and SIGUSR1 open a new window"""
+    profiler.profile_on_start = False
+    profiler.start()
+    profiler.tick()
+    assert not profiler.window_active
+    profiler.request_capture()
+    profiler.tick()
+    assert profiler.window_active
+    profiler.stop()
+
+    if hasattr(signal, 'SIGUSR1'):
+        profiler.start()
+        os.kill(os.getpid(), signal.SIGUSR1)
+        profiler.tick()
+        assert profiler.window_active
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+
+def test_memory_report_shows_growth(tmp_path):
+    """Test that tracemalloc snapshots point at the line that keeps allocating"""
+    profiler = Profiler(output_dir=str(tmp_path), profile_on_start=False, snapshot_interval=3600)
+    profiler.start()
+    leak = [bytes(1000) for _ in range(2000)]
+    profiler.request_capture()
+    profiler.tick()
+    profiler.stop()
+    assert not tracemalloc.is_tracing()
+    reports = files(tmp_path, 'memory_')
+    assert len(reports) == 2  # on demand and at stop
+    with open(os.path.join(tmp_path, reports[0])) as f:
+        assert 'test_profiling.py' in f.read()
+    del leak
+
+def test_create_profiler_is_off_by_default(monkeypatch, tmp_path):
+    """Test that profiling only starts when asked for by flag or environment"""
+    monkeypatch.delenv('FACE_PROFILE', raising=False)
+    assert create_profiler() is None
+    monkeypatch.setenv('FACE_PROFILE', '1')
+    monkeypatch.setenv('FACE_PROFILE_SNAPSHOT_INTERVAL', '0')
+    profiler = create_profiler(output_dir=str(tmp_path))
+    try:
+        # The first window waits for the main loop, not model loading
+        assert not profiler.window_active and profiler.output_dir == str(tmp_path)
+        profiler.open_window()
+        assert profiler.window_active
+    finally:
+        profiler.stop()
+        signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+
+def test_single_profiler_limit_is_reported(profiler, monkeypatch, capsys):
+    """Test that a thread that cannot be profiled (Python 3.12+) is not dropped silently"""
+    class BusyProfile:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    profiler.start()
+    monkeypatch.setattr(profiler, '_thread_profile', lambda: BusyProfile())
+    wrapped = profiler.profiled(busy_work)
+    assert wrapped() == busy_work()
+    assert wrapped() == busy_work()
+    assert capsys.readouterr().out.count("Warning: another profiler is already active") == 1
@@ -0,0 +1,29 @@
+from benchmarks.run_benchmarks import compare
+
+BASELINE = {
+    'search/1000': {'p50_ms': 2.0},
+    'search/10000': {'p50_ms': 20.0},
+    'detector/480p': {'p50_ms': 10.0},
+    'extractor/VGG-Face': {'skipped': "deepface not installed"},
+}
+
+def test_compare_flags_slowdowns_beyond_tolerance():
+    results = {'search/1000': {'p50_ms': 2.3}, 'search/10000': {'p50_ms': 25.0},
+               'detector/480p': {'p50_ms': 8.0}, 'search/100000': {'p50_ms': 200.0}}
+    lines, regressions, missing = compare(results, BASELINE, tolerance=0.2)
+    assert regressions == ['search/10000']
+    assert missing == []
+    assert any('REGRESSION' in line and 'search/10000' in line for line in lines)
+    assert not any('search/100000' in line for line in lines)  # nothing to compare with
+
+def test_compare_reports_baseline_benchmarks_without_result():
+    """Test that a benchmark that disappeared or was skipped is reported, not ignored"""
+    results = {'search/1000': {'p50_ms': 2.0}, 'search/10000': {'skipped': "out of memory"}}
+    lines, regressions, missing = compare(results, BASELINE, tolerance=0.2)
+    assert regressions == []
+    assert missing == ['detector/480p', 'search/10000']
+    assert sum('MISSING' in line for line in lines) == 2
+
+    # Suites that were not run are not expected
+    _, _, missing = compare(results, BASELINE, tolerance=0.2, suites=['search'])
+    assert missing == ['search/10000']
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from src.data.face_database import FaceDatabase
+from src.data.sharded_search import GalleryShard, ShardedFaceDatabase
+
+DIM = 16
+
+@pytest.fixture
+def gallery(tmp_path):
+    """Database with 60 random faces of 12 people, and the embeddings by face id"""
+    db_path = str(tmp_path / "faces.db")
+    database = FaceDatabase(db_path)
+    rng = np.random.default_rng(0)
+    embeddings = {}
+    person_ids = [database.add_person(f"person{i}") for i in range(12)]
+    for i in range(60):
+        features = rng.normal(size=DIM)
+        face_id = database.add_face(person_ids[i % 12], features, None)
+        embeddings[face_id] = features
+    return db_path, embeddings
+
+@pytest.fixture
+def sharded(gallery):
+    database = ShardedFaceDatabase(gallery[0], num_shards=3, sync_interval=0)
+    database.start(timeout=60)
+    yield database
+    database.stop()
+
+def brute_force(embeddings, query, k):
+    ids = list(embeddings)
+    matrix = np.array([embeddings[i] / np.linalg.norm(embeddings[i]) for i in ids])
+    similarities = matrix @ (query / np.linalg.norm(query))
+    order = np.argsort(-similarities)[:k]
+    return [ids[i] for i in order], similarities[order]
+
+def test_shard_loads_its_partition_and_searches(gallery):
+    db_path, embeddings = gallery
+    shard = GalleryShard(1, 3, db_path)
+    assert shard.sync() == 20
+    assert set(shard.face_ids[:len(shard)]) == {i for i in embeddings if i % 3 == 1}
+
+    query = np.random.default_rng(1).normal(size=(2, DIM))
+    query /= np.linalg.norm(query, axis=1, keepdims=True)
+    similarities, face_ids, _ = shard.search(query, k=4)
+    assert face_ids.shape == (2, 4)
+    part = {i: e for i, e in embeddings.items() if i % 3 == 1}
+    expected_ids, expected_similarities = brute_force(part, query[0], 4)
+    assert list(face_ids[0]) == expected_ids
+    assert np.allclose(similarities[0], expected_similarities, atol=1e-5)
+
+def test_merged_top_k_matches_brute_force(sharded, gallery):
+    """Test that merging the shards' top-k gives the global top-k"""
+    _, embeddings = gallery
+    assert sorted(sharded.size()) == [20, 20, 20]
+    queries = np.random.default_rng(2).normal(size=(5, DIM))
+    results = sharded.search_batch(queries, k=5)
+    for query, matches in zip(queries, results):
+        expected_ids, expected_similarities = brute_force(embeddings, query, 5)
+        assert [face_id for _, _, _, face_id in matches] == expected_ids
+        assert np.allclose([s for _, _, s, _ in matches], np.clip(expected_similarities, 0, 1), atol=1e-5)
+        assert all(name.startswith("person") for _, name, _, _ in matches)
+
+def test_search_face_agrees_with_face_database(sharded, gallery):
+    db_path, embeddings = gallery
+    database = FaceDatabase(db_path)
+    query = embeddings[7] + np.random.default_rng(3).normal(scale=0.1, size=DIM)
+    expected = database.search_face(query, 0.6)
+    person_id, name, similarity = sharded.search_face(query, 0.6)
+    assert (person_id, name) == expected[:2]
+    assert similarity == pytest.approx(expected[2], abs=1e-5)
+    assert sharded.search_face(-embeddings[7], 0.99) is None
+
+def test_shards_follow_inserts(sharded, gallery):
+    """Test that rows added here or by another process are searchable"""
+    db_path, _ = gallery
+    rng = np.random.default_rng(4)
+
+    features = rng.normal(size=DIM)
+    person_id = sharded.add_person("newcomer")
+    sharded.add_face(person_id, features, None)
+    assert sharded.search_face(features, 0.99)[1] == "newcomer"
+
+    other_process = FaceDatabase(db_path)
+    features = rng.normal(size=DIM)
+    other_process.add_face(other_process.add_person("visitor"), features, None)
+    assert sharded.search_face(features, 0.99)[1] == "visitor"
+    assert sum(sharded.size()) == 62
+
+def test_dimension_mismatch_is_reported(sharded):
+    with pytest.raises(ValueError):
+        sharded.search_face(np.ones(DIM + 1))
+    with pytest.raises(ValueError):
+        sharded.search_face(np.ones(DIM), model_name="Facenet")
@@ -0,0 +1,104 @@
+import threading
+import time
+import numpy as np
+from src.pipeline.latest_frame_queue import LatestFrameQueue
+from src.pipeline.threaded_pipeline import ThreadedPipeline
+
+class FakeCapture:
+    """Frame source that delivers numbered frames at a fixed rate"""
+    def __init__(self, fps=200):
+        self.interval = 1.0 / fps
+        self.count = 0
+    def read(self):
+        time.sleep(self.interval)
+        self.count += 1
+        return True, np.full((4, 4, 3), self.count % 256, dtype=np.uint8)
+
+def test_queue_drops_oldest():
+    """Test that a full queue keeps only the newest items"""
+    queue = LatestFrameQueue(maxsize=2)
+    assert not queue.put(1)
+    assert not queue.put(2)
+    assert queue.put(3)
+    assert queue.dropped == 1
+    assert queue.get() == 2
+    assert queue.get() == 3
+
+def test_queue_get_timeout_and_close():
+    """Test that get() returns None on timeout and after close()"""
+    queue = LatestFrameQueue()
+    assert queue.get(timeout=0.01) is None
+
+    results = []
+    consumer = threading.Thread(target=lambda: results.append(queue.get()))
+    consumer.start()
+    queue.close()
+    consumer.join(1.0)
+    assert not consumer.is_alive()
+    assert results == [None]
+
+def test_pipeline_slow_recognition_does_not_stall_display():
+    """Test that display keeps up with capture while recognition lags"""
+    def slow_recognition(frame):
+        time.sleep(0.05)
+        return ["result"]
+
+    pipeline = ThreadedPipeline(FakeCapture(), slow_recognition)
+    pipeline.start()
+    displayed = 0
+    results = None
+    deadline = time.perf_counter() + 0.5
+    while time.perf_counter() < deadline:
+        item = pipeline.next_frame(timeout=0.1)
+        if item is None:
+            continue
+        frame_id, captured_at, frame, results = item
+        pipeline.frame_displayed(captured_at)
+        displayed += 1
+    pipeline.stop()
+
+    recognized = pipeline.stats.count('recognized')
+    assert results == ["result"]
+    assert 0 < recognized < displayed
+    assert pipeline.recognition_queue.dropped > 0
+    assert pipeline.stats.latency_ms('end_to_end') > 0
+    assert "end-to-end latency" in pipeline.report()
+
+def test_pipeline_clean_restart():
+    """Test that the pipeline can be stopped and started again"""
+    pipeline = ThreadedPipeline(FakeCapture(), lambda frame: [])
+    pipeline.start()
+    pipeline.stop()
+    assert not pipeline.running
+    pipeline.start()
+    assert pipeline.next_frame(timeout=1.0) is not None
+    pipeline.stop()
+    assert pipeline.threads == []
+
+class BlockingCapture(FakeCapture):
+    """Capture whose read() hangs while `blocked` is set"""
+    def __init__(self):
+        super().__init__()
+        self.blocked = threading.Event()
+        self.released = threading.Event()
+    def read(self):
+        if self.blocked.is_set():
+            self.released.wait()
+        return super().read()
+
+def test_stop_does_not_hand_back_a_capture_still_in_use():
+    """Test that stop() reports a capture thread stuck in read() instead of forgetting it"""
+    capture = BlockingCapture()
+    pipeline = ThreadedPipeline(capture, lambda frame: [])
+    pipeline.start()
+    assert pipeline.next_frame(timeout=1.0) is not None
+    capture.blocked.set()
+    time.sleep(0.05)
+
+    assert pipeline.stop(timeout=0.1) is False
+    assert [thread.name for thread in pipeline.threads] == ["capture"]
+    assert not pipeline.running
+
+    capture.released.set()
+    assert pipeline.stop(timeout=1.0) is True
+    assert pipeline.threads == []
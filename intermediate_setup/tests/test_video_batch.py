@@ -0,0 +1,110 @@
+import json
+import random
+import time
+import cv2
+import numpy as np
+import pytest
+from src.batch.video_batch import (VideoBatchProcessor, JsonlWriter, CsvWriter, collect_videos,
+                                   load_progress, sampling_stride)
+
+class BrightnessRecognizer:
+    """Reports one 'face' named after the frame brightness, after a random delay"""
+    def __init__(self):
+        self.stage_times = {'detect': 0.0}
+    def recognize(self, frame):
+        time.sleep(random.uniform(0, 0.005))
+        value = int(round(frame.mean() / 10))
+        return [{'box': (0, 0, 8, 8), 'person_id': value, 'name': f"frame{value}",
+                 'similarity': 0.9}]
+
+class StubComponents:
+    def create_recognizer(self, **kwargs):
+        return BrightnessRecognizer()
+
+@pytest.fixture
+def video_dir(tmp_path):
+    directory = tmp_path / "videos"
+    directory.mkdir()
+    writer = cv2.VideoWriter(str(directory / "clip.avi"), cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+    for frame_id in range(20):
+        writer.write(np.full((48, 64, 3), frame_id * 10, dtype=np.uint8))
+    writer.release()
+    (directory / "notes.txt").write_text("not a video")
+    return directory
+
+def run_batch(video, output, writer_class, append=False, progress=None, stride=1, interval=None):
+    writer = writer_class(str(output), append=append)
+    processor = VideoBatchProcessor(StubComponents(), writer, num_workers=3, stride=stride,
+                                    interval=interval)
+    processor.run([video], progress)
+    writer.close()
+    return processor
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+def test_collect_videos(video_dir):
+    """Test that directories are expanded to their video files"""
+    assert collect_videos([str(video_dir)]) == [str(video_dir / "clip.avi")]
+
+def test_sampling_stride():
+    assert sampling_stride(30, stride=5) == 5
+    assert sampling_stride(30, interval=0.5) == 15
+    assert sampling_stride(0, interval=0.5) == 1
+
+def test_records_are_written_in_frame_order(video_dir, tmp_path):
+    """Test that out-of-order workers still produce an ordered output"""
+    video = str(video_dir / "clip.avi")
+    processor = run_batch(video, tmp_path / "out.jsonl", JsonlWriter, stride=3)
+    records = read_jsonl(tmp_path / "out.jsonl")
+    assert [r['frame'] for r in records] == list(range(0, 20, 3))
+    assert [r['faces'][0]['person_id'] for r in records] == list(range(0, 20, 3))
+    assert records[1]['timestamp'] == pytest.approx(0.3)
+    assert processor.frames_processed == 7
+    assert "frames/s" in processor.summary()
+
+def test_interval_sampling(video_dir, tmp_path):
+    """Test that time-based sampling uses the video frame rate"""
+    run_batch(str(video_dir / "clip.avi"), tmp_path / "out.jsonl", JsonlWriter, interval=0.5)
+    assert [r['frame'] for r in read_jsonl(tmp_path / "out.jsonl")] == [0, 5, 10, 15]
+
+@pytest.mark.parametrize("writer_class,name", [(JsonlWriter, "out.jsonl"), (CsvWriter, "out.csv")])
+def test_resume_continues_after_last_frame(video_dir, tmp_path, writer_class, name):
+    """Test that a resumed run skips written frames and ignores a cut-off last line"""
+    video = str(video_dir / "clip.avi")
+    full = tmp_path / f"full_{name}"
+    run_batch(video, full, writer_class, stride=2)
+    lines = full.read_text().splitlines(keepends=True)
+
+    # Simulate an interrupted run: a few complete lines and half of the next one
+    cut = 4 if writer_class is JsonlWriter else 5  # the CSV file has a header line
+    partial = tmp_path / name
+    partial.write_text("".join(lines[:cut]) + lines[cut][:7])
+
+    fmt = 'jsonl' if writer_class is JsonlWriter else 'csv'
+    progress = load_progress(str(partial), fmt)
+    # A CSV row does not tell whether it was the frame's last one, so the frame
+    # the cut-off row belongs to (here possibly frame 6) is done again
+    last_frame = 6 if writer_class is JsonlWriter else 4
+    assert progress == {video: last_frame}
+    processor = run_batch(video, partial, writer_class, append=True, progress=progress, stride=2)
+    assert processor.frames_processed == 10 - (last_frame // 2 + 1)
+    assert partial.read_text() == full.read_text()
+
+def test_csv_resume_drops_frame_with_missing_faces(tmp_path):
+    """Test that a frame whose face rows were only partly written is not counted as done"""
+    path = str(tmp_path / "out.csv")
+    writer = CsvWriter(path)
+    face = {'box': [0, 0, 8, 8], 'person_id': 1, 'name': "Ann, Lee", 'similarity': 0.9}
+    for frame in (0, 3):
+        writer.write({'video': "a.mp4", 'frame': frame, 'timestamp': frame / 10, 'faces': [face, face]})
+    writer.close()
+    lines = open(path).read().splitlines(keepends=True)
+    assert len(lines) == 5
+
+    # Interrupted in the middle of frame 3's second face
+    with open(path, 'w') as f:
+        f.write("".join(lines[:4]) + lines[4][:12])
+    assert load_progress(path, 'csv') == {"a.mp4": 0}
+    assert open(path).read() == "".join(lines[:3])
@@ -0,0 +1,50 @@
+import threading
+import numpy as np
+import pytest
+
+pytest.importorskip("PyQt5")
+from PyQt5.QtCore import Qt
+from src.gui.video_worker import RecognitionThread
+from src.pipeline.latest_frame_queue import LatestFrameQueue
+from src.pipeline.stream_stats import StreamStats
+
+def test_jobs_run_on_the_recognition_thread_between_frames():
+    """Test that enrolment-style jobs run on the thread that recognizes, not the caller's"""
+    calls = []
+    done = threading.Event()
+
+    def recognize(frame):
+        calls.append(('recognize', threading.get_ident()))
+        return []
+
+    def enrol():
+        calls.append(('job', threading.get_ident()))
+        return True, "added"
+
+    def failing_job():
+        raise ValueError("no face")
+
+    finished = []
+    def collect(callback, result, error):
+        finished.append((callback, result, error))
+        if len(finished) == 2:
+            done.set()
+
+    frames = LatestFrameQueue(1)
+    thread = RecognitionThread(recognize, frames, StreamStats())
+    thread.job_done.connect(collect, Qt.DirectConnection)
+    frames.put((1, 0.0, np.zeros((4, 4, 3), dtype=np.uint8)))
+    thread.submit_job(enrol, 'enrolled')
+    thread.submit_job(failing_job, 'failed')
+    thread.start()
+    try:
+        assert done.wait(10)
+    finally:
+        thread.requestInterruption()
+        frames.close()
+        assert thread.wait(5000)
+
+    assert calls[0][0] == 'job'
+    assert {ident for _, ident in calls} == {calls[0][1]} != {threading.get_ident()}
+    assert finished[0] == ('enrolled', (True, "added"), None)
+    assert finished[1][0] == 'failed' and isinstance(finished[1][2], ValueError)